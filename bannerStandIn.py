@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+
+# Local stand-in for the Banner pages retrieveEnrollments drives: the
+# Navigator login, the SWRCGSR form, the GJIREVO job output and its csv
+# export. The pages carry the titles and busy overlay bannerWait looks for
+# and react to the keystrokes run_query sends, and every step answers after a
+# configurable latency, so the retrieval can be run and timed offline.
+
+import glob
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from snapshotCollector import report_term
+
+# seconds Banner takes for every page, the login, the SWRCGSR query, the
+# GJIREVO job listing its output and the csv export
+Latency = namedtuple("Latency", ["page", "login", "query", "job", "download"])
+LATENCY = Latency(page=0.2, login=0.5, query=2.0, job=5.0, download=1.0)
+
+NAVIGATOR_PATH = "/applicationNavigator/seamless"
+
+# the SWRCGSR parameters in the order run_query types them
+PARAMETERS = ["term", "subject", "school", "department", "campus", "status",
+              "session", "createmergefile", "scheduletype", "level"]
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<title>{title}</title>
+<style>
+.loading {{ display: none; position: fixed; inset: 0; background: rgba(0, 0, 0, 0.2); }}
+.section {{ margin: 1em 0; padding: 0.5em; border: 1px solid #ccc; }}
+.current {{ border-color: #000; }}
+.selected {{ background: #ddd; }}
+</style>
+</head>
+<body>
+<div class="loading"></div>
+{body}
+</body>
+</html>
+"""
+
+LOGIN = """<h1>Authentication</h1>
+<form method="post" action="/login">
+<input name="username" autofocus>
+<input name="password" type="password">
+<button type="submit">Sign In</button>
+</form>
+"""
+
+NAVIGATOR = """<h1>Application Navigator</h1>
+<form method="get" action="/navigate">
+<input name="page" autofocus>
+</form>
+"""
+
+SWRCGSR = """<h1>SWRCGSR</h1>
+<div class="section" id="key">Key block</div>
+<div class="section" id="printer">Printer <input id="printer-input"></div>
+<div class="section" id="parameters">
+{parameters}
+</div>
+<div class="section" id="submission">Submission</div>
+<ul id="related" style="display: none"><li>GJIREVO</li></ul>
+<p id="message"></p>
+<script>
+var sections = ["key", "printer", "parameters", "submission"];
+var section = 0;
+var parameters = {names};
+var parameter = -1;
+var job = null;
+var menu = false;
+var related = -1;
+
+function show(n) {{
+    section = Math.min(n, sections.length - 1);
+    sections.forEach(function (id, i) {{
+        document.getElementById(id).className = i == section ? "section current" : "section";
+    }});
+    document.activeElement.blur();
+    if (sections[section] == "printer") {{
+        document.getElementById("printer-input").focus();
+    }}
+}}
+
+function focusParameter(n) {{
+    parameter = Math.min(n, parameters.length - 1);
+    document.getElementById(parameters[parameter]).focus();
+}}
+
+function save() {{
+    var values = {{printer: document.getElementById("printer-input").value}};
+    parameters.forEach(function (name) {{
+        values[name] = document.getElementById(name).value.trim();
+    }});
+    var overlay = document.querySelector(".loading");
+    overlay.style.display = "block";
+    fetch("/SWRCGSR/submit", {{method: "POST", body: JSON.stringify(values)}})
+        .then(function (response) {{ return response.json(); }})
+        .then(function (result) {{
+            job = result.job;
+            document.getElementById("message").textContent = result.message;
+        }})
+        .finally(function () {{ overlay.style.display = "none"; }});
+}}
+
+document.addEventListener("keydown", function (e) {{
+    if (e.key == "PageDown") {{
+        e.preventDefault();
+        show(section + 1);
+    }} else if (e.key == "Tab" && sections[section] == "parameters") {{
+        e.preventDefault();
+        focusParameter(0);
+    }} else if (e.key == "ArrowDown" && menu) {{
+        e.preventDefault();
+        related = 0;
+        document.querySelector("#related li").className = "selected";
+    }} else if (e.key == "ArrowDown" && sections[section] == "parameters") {{
+        e.preventDefault();
+        focusParameter(parameter + 1);
+    }} else if (e.key == "F10") {{
+        e.preventDefault();
+        save();
+    }} else if (e.altKey && (e.key.toLowerCase() == "r" || e.code == "KeyR")) {{
+        e.preventDefault();
+        document.getElementById("related").style.display = "block";
+        menu = true;
+        related = -1;
+    }} else if (e.key == "Enter" && related == 0 && job !== null) {{
+        e.preventDefault();
+        window.location = "/GJIREVO?job=" + job;
+    }}
+}});
+
+show(0);
+</script>
+"""
+
+GJIREVO = """<h1>GJIREVO</h1>
+<ul id="files"></ul>
+<script>
+var job = {job};
+var ready = false;
+
+function poll() {{
+    fetch("/GJIREVO/status?job=" + job)
+        .then(function (response) {{ return response.json(); }})
+        .then(function (result) {{
+            if (result.file) {{
+                var item = document.createElement("li");
+                item.textContent = result.file;
+                document.getElementById("files").appendChild(item);
+                ready = true;
+            }} else {{
+                setTimeout(poll, 250);
+            }}
+        }});
+}}
+
+document.addEventListener("keydown", function (e) {{
+    if (e.key == "F1" || e.key == "F9" || e.key == "Tab") {{
+        e.preventDefault();
+    }}
+    if (e.key == "F1" && e.shiftKey && ready) {{
+        window.location = "/GJIREVO/download?job=" + job;
+    }}
+}});
+
+poll();
+</script>
+"""
+
+
+class BannerStandIn(ThreadingHTTPServer):
+    """HTTP server answering like the Banner pages used by retrieveEnrollments
+
+    Any username and password log in. The report of a query is the next csv
+    export of its term in the reports directory, in name order and starting
+    over after the last one.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, reports, latency=LATENCY, host="127.0.0.1", port=0):
+        """
+        Args:
+            reports: Directory of SWRCGSR csv exports.
+            latency: Latency of the Banner steps, in seconds.
+            host: Address to listen on.
+            port: Port to listen on, 0 for any free port.
+        """
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.sessions = set()
+        self.jobs = {}
+        self.job_ids = itertools.count(1)
+
+        exports = {}
+        for filename in sorted(glob.glob(os.path.join(reports, "*.csv"))):
+            exports.setdefault(report_term(filename), []).append(filename)
+        self.exports = {term: itertools.cycle(files) for term, files in exports.items()}
+
+    @property
+    def navigator(self):
+        """URL of the application navigator, for retrieveEnrollments.NAVIGATOR."""
+        return "http://{:s}:{:d}{:s}".format(self.server_address[0], self.server_address[1],
+                                             NAVIGATOR_PATH)
+
+    def submit(self, values):
+        """Queue the GJIREVO job of a SWRCGSR query
+
+        Args:
+            values: Dictionary of the form values.
+
+        Returns:
+            The job id, or None if there is no export for the term.
+        """
+        with self.lock:
+            exports = self.exports.get(values.get("term", ""))
+            if exports is None:
+                return None
+            job = next(self.job_ids)
+            self.jobs[job] = {"report": next(exports),
+                              "ready": time.monotonic() + self.latency.job,
+                              "values": values}
+        return job
+
+
+def serve(reports, latency=LATENCY, host="127.0.0.1", port=0):
+    """Start a Banner stand-in in a background thread
+
+    Args:
+        reports: Directory of SWRCGSR csv exports.
+        latency: Latency of the Banner steps, in seconds.
+        host: Address to listen on.
+        port: Port to listen on, 0 for any free port.
+
+    Returns:
+        The running BannerStandIn; call its shutdown method to stop it.
+    """
+    server = BannerStandIn(reports, latency, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def session(self):
+        for cookie in self.headers.get("Cookie", "").split(";"):
+            name, _, value = cookie.strip().partition("=")
+            if name == "session" and value in self.server.sessions:
+                return value
+        return None
+
+    def send(self, body, status=200, content_type="text/html", headers=()):
+        body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for header in headers:
+            self.send_header(*header)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def page(self, title, body):
+        time.sleep(self.server.latency.page)
+        self.send(PAGE.format(title=title, body=body))
+
+    def redirect(self, location, headers=()):
+        self.send_response(303)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        for header in headers:
+            self.send_header(*header)
+        self.end_headers()
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+
+        if url.path == "/login":
+            time.sleep(self.server.latency.login)
+            session = uuid.uuid4().hex
+            with self.server.lock:
+                self.server.sessions.add(session)
+            self.redirect(NAVIGATOR_PATH, [("Set-Cookie", "session={:s}; Path=/".format(session))])
+        elif url.path == "/SWRCGSR/submit" and self.session():
+            time.sleep(self.server.latency.query)
+            values = json.loads(body)
+            job = self.server.submit(values)
+            if job is None:
+                message = "No report for term {:s}".format(values.get("term", ""))
+            else:
+                message = "Job {:d} submitted".format(job)
+            self.send(json.dumps({"job": job, "message": message}), content_type="application/json")
+        else:
+            self.send("Not found", 404, "text/plain")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        # every page but the login needs a session
+        if url.path == NAVIGATOR_PATH:
+            if self.session():
+                self.page("Application Navigator", NAVIGATOR)
+            else:
+                self.page("Banner Authentication", LOGIN)
+            return
+        if not self.session():
+            self.redirect(NAVIGATOR_PATH)
+            return
+
+        if url.path == "/navigate":
+            page = query.get("page", [""])[0].strip().upper()
+            self.redirect("/" + page)
+        elif url.path == "/SWRCGSR":
+            inputs = "\n".join('{0:s} <input id="{0:s}">'.format(name) for name in PARAMETERS)
+            self.page("SWRCGSR Class Schedule", SWRCGSR.format(parameters=inputs, names=json.dumps(PARAMETERS)))
+        elif url.path == "/GJIREVO":
+            job = self.job(query)
+            self.page("GJIREVO Saved Output Review", GJIREVO.format(job=json.dumps(job)))
+        elif url.path == "/GJIREVO/status":
+            job = self.job(query)
+            ready = job in self.server.jobs and time.monotonic() >= self.server.jobs[job]["ready"]
+            self.send(json.dumps({"file": "gjirevo_{:d}.lis".format(job) if ready else None}),
+                      content_type="application/json")
+        elif url.path == "/GJIREVO/download":
+            job = self.job(query)
+            if job not in self.server.jobs:
+                self.send("Not found", 404, "text/plain")
+                return
+            self.download(self.server.jobs[job]["report"])
+        else:
+            self.page("Banner", "<h1>Page not found</h1>")
+
+    def job(self, query):
+        try:
+            return int(query.get("job", [""])[0])
+        except ValueError:
+            return None
+
+    def download(self, report):
+        # stream the export in pieces over the download latency, so the
+        # browser holds a partial download for a while as it would from Banner
+        with open(report, "rb") as fp:
+            content = fp.read()
+        pieces = 10
+        size = -(-len(content) // pieces)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Disposition", 'attachment; filename="GJIREVO.csv"')
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        for start in range(0, len(content), size):
+            time.sleep(self.server.latency.download / pieces)
+            self.wfile.write(content[start:start + size])
+            self.wfile.flush()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    # Set up command line parsing
+    parser = argparse.ArgumentParser(
+        description="Serve a local stand-in for the Banner pages used by retrieveEnrollments."
+    )
+    parser.add_argument("reports", help="directory of SWRCGSR csv exports served for their term")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on")
+    for field in Latency._fields:
+        parser.add_argument("--" + field, type=float, default=getattr(LATENCY, field),
+                            help="seconds Banner takes for the {:s} step".format(field))
+    args = parser.parse_args()
+
+    latency = Latency(*(getattr(args, field) for field in Latency._fields))
+    server = BannerStandIn(args.reports, latency, port=args.port)
+    print("Banner stand-in for terms {:s} at {:s}".format(", ".join(sorted(server.exports)),
+                                                         server.navigator))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
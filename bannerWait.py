@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+# Explicit waits for driving Banner with selenium.
+#
+# Every wait polls a condition until it holds or a timeout runs out, so a
+# step continues as soon as the page is ready and a wrong page fails right
+# away with a message instead of after a fixed sleep. Only the title,
+# find_elements and execute_script of the driver are used, so the waits run
+# the same against a local stand-in page.
+
+import os
+import time
+
+# seconds between two checks of a condition
+POLL = 0.25
+
+# list the waits are recorded in, see record_waits
+_waits = None
+
+
+class WrongPageException(Exception):
+    """Banner did not reach the expected page in time."""
+
+
+def record_waits(log):
+    """Record every wait from now on.
+
+    Args:
+        log:
+            list to append a (message, seconds) tuple to when a wait ends,
+            or None to stop recording.
+
+    Returns:
+        Nothing.
+    """
+    global _waits
+    _waits = log
+
+
+def wait_until(condition, timeout, poll=POLL, message="condition"):
+    """Poll a condition until it holds.
+
+    Args:
+        condition:
+            function without arguments; the wait ends when it returns a
+            truthy value.
+        timeout:
+            seconds to wait before giving up.
+        poll:
+            seconds between two checks.
+        message:
+            what is waited for, used in the exception.
+
+    Returns:
+        The truthy value returned by the condition.
+
+    Raises:
+        WrongPageException: the condition did not hold within the timeout.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    try:
+        while True:
+            value = condition()
+            if value:
+                return value
+            if time.monotonic() >= deadline:
+                raise WrongPageException("Timed out after {:g}s waiting for {:s}".format(timeout, message))
+            time.sleep(poll)
+    finally:
+        if _waits is not None:
+            _waits.append((message, time.monotonic() - start))
+
+
+def wait_for_title(driver, text, timeout=30, poll=POLL):
+    """Wait until the page title contains some text.
+
+    Args:
+        driver:
+            selenium webdriver.
+        text:
+            text expected in the title.
+        timeout:
+            seconds to wait before giving up.
+        poll:
+            seconds between two checks.
+
+    Returns:
+        The page title.
+    """
+    return wait_until(lambda: text in driver.title and driver.title, timeout, poll,
+                      "a page titled '{:s}'".format(text))
+
+
+def wait_for_element(driver, by, value, timeout=30, poll=POLL):
+    """Wait until an element is present on the page.
+
+    Args:
+        driver:
+            selenium webdriver.
+        by:
+            locator strategy, e.g. selenium.webdriver.common.by.By.CSS_SELECTOR.
+        value:
+            locator.
+        timeout:
+            seconds to wait before giving up.
+        poll:
+            seconds between two checks.
+
+    Returns:
+        The first matching element.
+    """
+    elements = wait_until(lambda: driver.find_elements(by, value), timeout, poll,
+                          "element {:s} '{:s}'".format(by, value))
+    return elements[0]
+
+
+def wait_for_idle(driver, busy_selector=None, timeout=30, poll=POLL, ready=None):
+    """Wait until the page has loaded, is not busy and shows the result of a step.
+
+    Banner runs as a single page application, so document.readyState stays
+    "complete" while a query runs and the busy indicator may only show up
+    after the first check; a step whose result shows on the page should give
+    it as ready.
+
+    Args:
+        driver:
+            selenium webdriver.
+        busy_selector:
+            optional CSS selector of the page's busy or loading indicator.
+        timeout:
+            seconds to wait before giving up.
+        poll:
+            seconds between two checks.
+        ready:
+            optional (by, value) locator of an element displayed once the
+            step is done, e.g. the message of a submitted query.
+
+    Returns:
+        Nothing.
+
+    Raises:
+        ValueError: neither busy_selector nor ready is given, so there is
+            nothing to wait for.
+    """
+    if busy_selector is None and ready is None:
+        raise ValueError("wait_for_idle needs a busy_selector or a ready locator")
+
+    def idle():
+        if driver.execute_script("return document.readyState") != "complete":
+            return False
+        if busy_selector is not None and any(
+                element.is_displayed() for element in driver.find_elements("css selector", busy_selector)):
+            return False
+        return ready is None or any(element.is_displayed() for element in driver.find_elements(*ready))
+
+    wait_until(idle, timeout, poll, "the page to finish loading" if ready is None else
+               "element {:s} '{:s}' after loading".format(*ready))
+
+
+def wait_for_download(filename, timeout=60, poll=POLL):
+    """Wait until a downloaded file is complete on disk.
+
+    The file is complete once it exists, the browser's partial download
+    (.crdownload or .part) is gone and its size is the same on two checks.
+
+    Args:
+        filename:
+            path the file is downloaded to.
+        timeout:
+            seconds to wait before giving up.
+        poll:
+            seconds between two checks.
+
+    Returns:
+        The path of the file.
+    """
+    last_size = [None]
+
+    def complete():
+        if os.path.exists(filename + ".crdownload") or os.path.exists(filename + ".part"):
+            return False
+        try:
+            size = os.path.getsize(filename)
+        except OSError:
+            return False
+        stable = size > 0 and size == last_size[0]
+        last_size[0] = size
+        return stable
+
+    wait_until(complete, timeout, poll, "the download of {:s}".format(filename))
+    return filename
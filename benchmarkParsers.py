@@ -0,0 +1,682 @@
+#!/usr/bin/env python3
+
+# Times the legacy SWRCGSR readers against the shared reader in swrcgsr. The
+# legacy readers of enrollmentTimeSeries, processEnrollment and the dashboard
+# utilities and utils modules are kept here only to be timed.
+
+import datetime
+import re
+
+import pandas as pd
+
+from enrollmentUtils import *
+from swrcgsr import HEADER_ROW, convert_to_24hr, write_and_format
+
+def benchmark(func, args, repeat):
+    """Time a parser on the same input several times.
+
+    Args:
+        func:
+            parser to call.
+        args:
+            function returning a fresh argument tuple for each call.
+        repeat:
+            number of timed calls.
+
+    Returns:
+        Best wall clock time in seconds.
+    """
+
+    import time
+
+    best = None
+    for _ in range(repeat):
+        call_args = args()
+        start = time.perf_counter()
+        func(*call_args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def alternating_size_chunks(iterable, steps):
+    """Break apart a line into chunks of provided sizes
+
+    Args:
+        iterable: Line of text to process.
+        steps: Tuple of int sizes to divide text, will cycle.
+
+    Returns:
+        Return a generator that yields string chunks of the original line.
+    """
+
+    from itertools import cycle
+
+    n = 0
+    step = cycle(steps)
+    while n < len(iterable):
+        try:
+            next_step = next(step)
+        except StopIteration:
+            continue
+        yield iterable[n : n + next_step]
+        n += next_step
+
+def readcsv_old(filename):
+    import csv
+    import datetime
+
+    # capture the date from the file header
+    with open(filename, "r") as currentfile:
+        i = 0
+        for line in currentfile:
+            # the date is in the fourth line, last column, and remove the trailing comma
+            if i == 4:
+                d = line.split()[-1][:-1]
+                break
+            else:
+                i += 1
+    d = datetime.datetime.strptime(d, "%d-%b-%Y")
+    datadate = datetime.datetime.strftime(d,"%Y%m%d")
+
+    newfile = []
+
+    # Open and process text file output
+    with open(filename) as csvfile:
+        reader = csv.reader(csvfile)
+        # eliminate top rows without data
+        for _ in range(7):
+            next(reader)
+        for row in reader:
+            # trim extra spaces or pad to adjust to 140 characters
+            newrow = (
+                row[0][:140].ljust(140) if len(row[0][:140]) < 140 else row[0][:140]
+            )
+
+            # break lines with data into a list of pieces
+            newlist = list(alternating_size_chunks(newrow, HEADER_ROW.values()))
+
+            # convert time format from 12hr to 24hr and account for TBA times
+            newlist[14] = convertAMPMtime(newlist[14])
+
+            # add date stamp column
+            newlist.append(datadate)
+
+            # Add the entry to our output list
+            newfile.append(newlist)
+
+    # Remove final non-data lines
+    newfile = newfile[:-1]
+
+    return newfile
+
+def processEnrollment_old(filename):
+    """Take in SWRCGSR output and format into usable excel-compatible format.
+
+    Args:
+        filename:
+            input filename (full path optional) of txt format SWRCGSR output.
+
+    Returns:
+        Nothing.
+    """
+
+    newfile = []
+
+    # SWRCGSR headers and spacer row
+    newfile.append(HEADER_ROW.keys())
+
+    # Open and process text file output
+    with open(filename) as csvfile:
+        reader = csv.reader(csvfile)
+        # eliminate top rows without data
+        for _ in range(7):
+            next(reader)
+        for row in reader:
+            # trim extra spaces or pad to adjust to 140 characters
+            newrow = (
+                row[0][:140].ljust(140) if len(row[0][:140]) < 140 else row[0][:140]
+            )
+
+            # break lines with data into a list of pieces
+            newlist = list(alternating_size_chunks(newrow, HEADER_ROW.values()))
+
+            # Catch non-data containing lines and skip them
+            if newlist[14] == 12*" ":
+                continue
+            if newlist[2][0] == " ":
+                continue
+            if newlist[0].strip()[:3] in ["---", "Sub", "Ter", "** "]:
+                continue
+
+            # convert time format from 12hr to 24hr and account for TBA times
+            newlist[14] = convertAMPMtime(newlist[14])
+
+            # remove leading and trailing whitespace
+            newlist = [i.strip() for i in newlist]
+
+            # Add the entry to our output list
+            newfile.append(newlist)
+
+    # Send it to the output function
+    write_and_format(newfile, filename[:-3]+"xlsx")
+
+    # Finish
+    return
+
+def tidy_txt_old(file_contents):
+    """Take in SWRCGSR output and format into pandas-compatible format.
+
+    Args:
+        file_contents:
+            input decoded filestream of SWRCGSR output from an uploaded textfile.
+
+    Returns:
+        Dataframe.
+    """
+
+    # helper of the dashboards, which still use it
+    from utilities import updateTitles
+
+    _LINE_PATTERN = [
+        (0, 5),
+        (5, 10),
+        (10, 16),
+        (16, 20),
+        (20, 22),
+        (22, 26),
+        (26, 28),
+        (28, 44),
+        (44, 51),
+        (51, 56),
+        (56, 61),
+        (61, 66),
+        (66, 71),
+        (71, 79),
+        (79, 91),
+        (91, 99),
+        (99, 104),
+        (104, 109),
+        (109, 121),
+        (121, 140),
+    ]
+
+    # read the data date from the file
+    d = ''
+    for i in range(5):
+        line = file_contents.readline()
+        if i == 4:
+            d = line.split()[-1]
+            break
+
+    data_date = datetime.datetime.strptime(d, "%d-%b-%Y")
+
+    # read into a dataframe based on specified column spacing
+    _df = pd.read_fwf(file_contents, colspecs=_LINE_PATTERN)
+
+    # read the report Term and Year from file
+    dd = _df.iloc[0]
+    term_code = str(dd.iloc[1][3:])+str(dd.iloc[2][:-2])
+    # term_code = str(_df.iloc[0][1])[3:] + str(_df.iloc[0][2])[:-2]
+
+    # rename the columns
+    # make allowances for newer version of pandas
+    if pd.__version__ >= '1.4.1':
+        k = 1
+    else:
+        k = 2
+    _df.columns = _df.iloc[k]
+
+
+    # manual filtering of erroneous data which preserves data for MTH 1108/1109
+    _df = _df.dropna(how='all')
+    _df = _df[~_df["Subj"].str.contains("Subj", na=False)]
+    _df = _df[~_df["Subj"].str.contains("---", na=False)]
+    _df = _df[~_df["Subj"].str.contains("SWRC", na=False)]
+    _df = _df[~_df["Subj"].str.contains("Ter", na=False)]
+    _df = _df[~_df["Instructor"].str.contains("Page", na=False)]
+
+    _df.reset_index(drop=True, inplace=True)
+    # pick up all rows where the "Begin/End" does not contain data
+    nan_rows_indexes=list(_df.loc[pd.isna(_df["Begin/End"]), :].index.values)
+    # append the "Loc" and "Instructor" to the previous row
+    mask = []
+    for row in _df.index.to_list():
+        if row in nan_rows_indexes:
+            for column in ["Loc", "Instructor"]:
+                # only do this when the data is not null and is a string
+                if not pd.isnull(_df.iloc[row][column]) and isinstance(_df.iloc[row-1][column],str):
+                    _df.loc[row-1,column] = _df.iloc[row-1][column] + _df.iloc[row][column]
+                    # keep track of those rows and remove them later
+                    mask.append(row)
+
+    # remove those rows whose data was appended to the previous row
+    _df = _df.drop(mask)
+
+    _df = _df.drop(_df.index[_df["Loc"].str.startswith("BA", na=False)].tolist())
+    # _df = _df[_df["Time"].notna()]
+    _df = _df[_df["Begin/End"].notna()]
+
+    # add columns for Access Table
+    _df.insert(len(_df.columns), "PTCR", 0)
+    _df["PTCR"] = _df["Credit"]
+    _df.insert(len(_df.columns), "Final", "Y")
+    _df.insert(len(_df.columns), "OrigRoom", " ")
+    _df["OrigRoom"] = _df["Loc"]
+    _df.insert(len(_df.columns), "Bldg", " ")
+    _df.insert(len(_df.columns), "Room", " ")
+    _df["Bldg"] = _df["Loc"].str.split(" ").str[0]
+    _df["Room"] = _df["Loc"].str.split(" ").str[1]
+    _df.insert(len(_df.columns), "Dates", " ")
+    _df["Dates"] = _df["Begin/End"] + "/" + str(term_code[2:4])
+    _df.insert(len(_df.columns), "Class Start Date", " ")
+    _df.insert(len(_df.columns), "Class End Date", " ")
+    _df["Class Start Date"] = _df["Begin/End"].str[0:5] +  "/" + str(term_code[2:4])
+    _df["Class End Date"] = _df["Begin/End"].str[-5:] +  "/" + str(term_code[2:4])
+
+    # _df = _df[_df["Instructor"].str.contains(',', na=False)]
+    # reset index and remove old index column
+    _df = _df.reset_index()
+    _df = _df.drop([_df.columns[0]], axis=1)
+
+    # for row in _df.index.to_list():
+        # if pd.isnull(_df.loc[row, 'Subj']):
+            # _df.loc[row, 'Subj'] = _df.loc[row-1, 'Subj']
+        # if pd.isnull(_df.loc[row, 'Nmbr']):
+            # _df.loc[row, 'Nmbr'] = _df.loc[row-1, 'Nmbr']
+        # if pd.isnull(_df.loc[row, 'CRN']):
+            # _df.loc[row, 'CRN'] = _df.loc[row-1, 'CRN']
+        # if pd.isnull(_df.loc[row, 'Sec']):
+            # _df.loc[row, 'Sec'] = _df.loc[row-1, 'Sec']
+        # if pd.isnull(_df.loc[row, 'S']):
+            # _df.loc[row, 'S'] = _df.loc[row-1, 'S']
+        # if pd.isnull(_df.loc[row, 'Cam']):
+            # _df.loc[row, 'Cam'] = _df.loc[row-1, 'Cam']
+        # if pd.isnull(_df.loc[row, 'Title']):
+            # _df.loc[row, 'Title'] = _df.loc[row-1, 'Title']
+        # if pd.isnull(_df.loc[row, 'PTCR']):
+            # _df.loc[row, 'PTCR'] = _df.loc[row-1, 'PTCR']
+        # if pd.isnull(_df.loc[row, 'T']):
+            # _df.loc[row, 'T'] = _df.loc[row-1, 'T']
+        # if pd.isnull(_df.loc[row, 'Credit']):
+            # _df.loc[row, 'Credit'] = _df.loc[row-1, 'Credit']
+        # if pd.isnull(_df.loc[row, 'Max']):
+            # _df.loc[row, 'Max'] = _df.loc[row-1, 'Max']
+        # if pd.isnull(_df.loc[row, 'Enrl']):
+            # _df.loc[row, 'Enrl'] = _df.loc[row-1, 'Enrl']
+        # if pd.isnull(_df.loc[row, 'WCap']):
+            # _df.loc[row, 'WCap'] = _df.loc[row-1, 'WCap']
+        # if pd.isnull(_df.loc[row, 'WLst']):
+            # _df.loc[row, 'WLst'] = _df.loc[row-1, 'WLst']
+
+    # This is a hack to include all rows of days into one for those classes
+    # that have different modes of teaching on different days.  For example,
+    # if MTLM 5610 is MT R, but the M is online and T R are in person.
+
+    # print()
+    # print(_df.to_string())
+
+    # for row in _df.index.to_list():
+        # if pd.isnull(_df.loc[row, 'Subj']) and (_df.loc[row-1, 'Nmbr'] not in ['1108', '1109']):
+            # weekdays = {'M':0, 'T':1, 'W':2, 'R':3, 'F':4, 'S':5}
+            # days = '      '
+            # _days = _df.loc[row, 'Days'] + _df.loc[row-1, 'Days']
+            # for day in weekdays.keys():
+                # if day in _days:
+                    # index = weekdays[day]
+                    # days = days[:index] + day + days[ index + 1:]
+            # _df.loc[row-1, 'Days'] = days.rstrip()
+            # _df.loc[row, 'Subj'] = _df.loc[row-1, 'Subj']
+            # _df.loc[row, 'Nmbr'] = _df.loc[row-1, 'Nmbr']
+
+    # only remove the extra rows from above that we no longer need but preserve
+    # the extra rows for 1108 and 1109
+    _df = _df[(~_df["CRN"].isnull()) | (~_df["Nmbr"].isin(['1108','1109']))]
+    _df = _df.reset_index()
+    _df = _df.drop([_df.columns[0]], axis=1)
+
+    # print()
+    # print(_df.to_string())
+
+    # change PTCR for 1081s, 1311s, 1111s, and 1115s to 0
+    for nmbr in ["1081", "1111", "1115", "1311"]:
+        for row in _df[_df["Subj"].str.contains("MTH") & _df["Nmbr"].str.contains(nmbr) & _df["S"].str.contains("A")].index.tolist():
+            _df.loc[row, "PTCR"] = 0
+
+    # change all online final flags to N since they do not need a room
+    for row in _df[_df["Cam"].str.startswith("I", na=False)].index.tolist():
+        _df.loc[row, "Final"] = "N"
+
+    # correct report to also include missing data for MTH 1108 and MTH 1109
+    for stretch_course in ['1108', '1109']:
+        for row in _df[_df["Subj"].str.contains("MTH") & _df["Nmbr"].str.contains(stretch_course) & _df["S"].str.contains("A")].index.tolist():
+
+            # only do this if there are extra rows; if it is a rollover, you will not have extra rows
+            if pd.isna(_df.loc[row+1,"Subj"]):
+
+                # copy all but days, time and location to next row
+                for col in ["Subj", "Nmbr", "CRN", "Sec", "S", "Cam", "T", "Title", "Max", "Enrl", "WCap", "WLst", "Instructor"]:
+                    _df.loc[row + 1, col] = _df.loc[row, col]
+
+                # define values for Credit and PTCR
+                _df.loc[row + 1, "Credit"] = 0
+                _df.loc[row + 1, "PTCR"] = 0
+
+                # copy all values from parent row and make available for lab instructor
+                row_dict = _df.loc[row].to_dict()
+                row_dict["Instructor"] = ","
+                row_dict["Credit"] = 0
+                row_dict["PTCR"] = 1
+                _df = pd.concat([_df, pd.DataFrame(row_dict, index=[0])], ignore_index=True)
+
+    # add columns for Access Table
+    _df.insert(len(_df.columns), "Class", " ")
+    _df["Class"] = _df["Subj"] + " " + _df["Nmbr"]
+    _df['DaysTimeLoc'] = _df['Days'] +  _df['Time'] + _df['Loc']
+    _df = updateTitles(_df)
+
+    # remove all rows with irrelevant data
+    _df = _df[_df["CRN"].notna()]
+    _df = _df[_df.CRN.apply(lambda x: x.isnumeric())]
+    _df.rename(
+        columns={
+            "Subj": "Subject",
+            "Nmbr": "Number",
+            "Sec": "Section",
+            "Cam": "Campus",
+            "Enrl": "Enrolled",
+            "WLst": "WList",
+            "%Ful": "Full",
+        },
+        inplace=True,
+    )
+    _df[["Credit", "Max", "Enrolled", "WCap", "WList"]] = _df[
+        ["Credit", "Max", "Enrolled", "WCap", "WList"]
+    ].apply(pd.to_numeric, errors="coerce")
+
+    _df = _df.sort_values(by=["Subject", "Number", "Section"])
+
+    # include in calculations
+    _df['Calc'] = 'Y'
+    for row in _df.index.to_list():
+        if _df.loc[row, 'S'] == 'C':
+            _df.loc[row, 'Calc'] = 'N'
+
+    # HENC_AI
+    _df['id'] = _df.index
+
+    return _df, term_code, data_date
+
+def parse_enrollment_file_old(file_content):
+    from utils import apply_custom_course_titles
+
+    if not file_content or not file_content.strip():
+        return {}, pd.DataFrame()
+
+    lines = file_content.split('\n')
+    header_metadata = {}
+    cleaned_rows = []
+
+    for line in lines:
+        if "METROPOLITAN STATE UNIVERSITY" in line:
+            date_match = re.search(r'(\d{2}-[A-Z]{3}-\d{4})', line)
+            if date_match:
+                header_metadata['report_date'] = date_match.group(1)
+        if "Term:" in line and 'term' not in header_metadata:
+            t_match = re.search(r'Term:\s*(\d+)', line)
+            d_match = re.search(r'Dept:\s*([^\s-]+)', line)
+            if t_match: header_metadata['term'] = t_match.group(1)
+            if d_match: header_metadata['dept'] = d_match.group(1)
+
+    ignorable = ["SWRCGSR", "METROPOLITAN STATE", "Class Enrollment", "Term:",
+                 "Subj Nmbr CRN", "---- ---- ----", "Subject Code", "** TOTALS **",
+                 "Cr Hr Prod", "Sections", "------------"]
+
+    for line in lines:
+        if any(kw in line for kw in ignorable) or not line.strip():
+            continue
+        if line.strip().startswith('\x0c') or line.strip().isdigit():
+            continue
+        cleaned_rows.append(line)
+
+    # 1. Runs the entire reconstruction, slicing, and splitting pipeline
+    df_final = reconstruct_records(cleaned_rows)
+
+    # 2. Calculate CHP safely after all splits have run and zeroed out credits
+    if not df_final.empty:
+        # Explicitly enforce numeric types to ensure multiplication doesn't break
+        df_final['Credit'] = pd.to_numeric(df_final['Credit'], errors='coerce').fillna(0)
+        df_final['Enrl'] = pd.to_numeric(df_final['Enrl'], errors='coerce').fillna(0)
+
+        # Calculate Credit Hour Production
+        df_final['CHP'] = df_final['Credit'] * df_final['Enrl']
+
+    df_final = apply_custom_course_titles(df_final)
+
+    return header_metadata, df_final
+
+def reconstruct_records(cleaned_rows):
+    logical_records = []
+    current_record = None
+    valid_subject_pattern = re.compile(r'^(MTH|MTL|MTLM)\s+\d+')
+
+    for line in cleaned_rows:
+        if valid_subject_pattern.match(line.lstrip()):
+            if current_record:
+                logical_records.append(current_record)
+            current_record = {"base": line, "wraps": []}
+        else:
+            if current_record:
+                current_record["wraps"].append(line)
+
+    if current_record:
+        logical_records.append(current_record)
+
+    return slice_fields(logical_records)
+
+def slice_fields(logical_records):
+    parsed_data = []
+
+    for record in logical_records:
+        base = record["base"]
+
+        subj = base[0:5].strip()
+        nmbr = base[5:10].strip()
+        crn  = base[10:16].strip()
+        sec  = base[16:20].strip()
+        s    = base[20:22].strip()
+        cam  = base[22:26].strip()
+        t    = base[26:28].strip()
+        title = base[28:44].strip()
+        credit = base[44:51].strip()
+        max_enrl = base[51:56].strip()
+        enrl = base[56:61].strip()
+        wcap = base[61:66].strip()
+        wlst = base[66:71].strip()
+        days = base[71:79].strip()
+        time = base[79:91].strip()
+        loc  = base[91:99].strip()
+        rcap = base[99:104].strip()
+        pct_ful = base[104:109].strip()
+        beg_end = base[109:121].strip()
+        inst = base[121:].strip()
+
+        if not re.match(r'^\d+$', crn):
+            continue
+
+        for wrap in record["wraps"]:
+            w_days = wrap[71:79].strip() if len(wrap) > 71 else ""
+            w_time = wrap[79:91].strip() if len(wrap) > 79 else ""
+            w_loc  = wrap[91:99].strip() if len(wrap) > 91 else ""
+            w_inst = wrap[121:].strip() if len(wrap) > 121 else ""
+
+            if w_days or w_time:
+                if w_days: days += f" / {w_days}"
+                if w_time: time += f" / {w_time}"
+                if w_loc: loc += f" / {w_loc}"
+            else:
+                if w_loc:
+                    loc = f"{loc}{w_loc}".strip() if loc else w_loc
+                if w_inst:
+                    inst = f"{inst}{w_inst}".strip() if inst else w_inst
+
+        time_parts = [convert_to_24hr(t) for t in time.split(' / ')]
+        formatted_time = " / ".join(time_parts)
+
+        try:
+            max_val = int(max_enrl) if max_enrl.isdigit() else 0
+            enrl_val = int(enrl) if enrl.isdigit() else 0
+            ratio = round(100 * enrl_val / max_val, 2) if max_val > 0 else 0.0
+        except ValueError:
+            ratio = 0.0
+
+        course_str = f"{subj}{nmbr}"
+
+        if not nmbr.isdigit():
+            calc_status = "N"
+        elif course_str in ["MTH1082", "MTH1101", "MTH1116", "MTH1312"]:
+            calc_status = "L"
+        elif course_str in ["MTL3850", "MTL3858", "MTL4690"]:
+            calc_status = "N"
+        else:
+            calc_status = "Y"
+
+        parsed_data.append({
+            'Subj': subj, 'Nmbr': nmbr, 'CRN': crn, 'Sec': sec, 'S': s,
+            'Cam': cam, 'T': t, 'Title': title, 'Credit': credit,
+            'Max Enrl': max_enrl, 'Enrl': enrl, 'WCap': wcap, 'WLst': wlst,
+            'Days': days, 'Time': formatted_time, 'Loc': loc, 'Rcap': rcap,
+            '%Ful': pct_ful, 'Begin/End': beg_end, 'Instructor': inst,
+            'Course': course_str, 'Ratio': ratio, 'Calc': calc_status,
+        })
+
+    # --- Convert records to a temporary DataFrame to clean up numeric types ---
+    df_temp = pd.DataFrame(parsed_data)
+
+    # Safely convert specific columns to numeric values, leaving non-numeric items blank (NaN)
+    numeric_cols = ['CRN', 'Max Enrl', 'Enrl', 'WCap', 'WLst', 'Rcap', '%Ful']
+    for col in numeric_cols:
+        if col in df_temp.columns:
+            df_temp[col] = pd.to_numeric(df_temp[col], errors='coerce')
+
+    # Convert records back to a dictionary format for the next function pipeline stage
+    cleaned_records = df_temp.to_dict('records')
+
+    return expand_and_split_courses(cleaned_records)
+
+def expand_and_split_courses(raw_records):
+    expanded_records = []
+
+    for row in raw_records:
+        if row['Subj'] == 'MTH' and row['Nmbr'] in ['1108', '1109']:
+            day_parts = row['Days'].split(' / ')
+            time_parts = row['Time'].split(' / ')
+            loc_parts = row['Loc'].split(' / ')
+
+            # --- Extract absolute string elements using indexing instead of copying entire arrays ---
+            lab_days = day_parts[0] if len(day_parts) > 0 else row['Days']
+            lab_time = time_parts[0] if len(time_parts) > 0 else row['Time']
+            lab_loc  = loc_parts[0]  if len(loc_parts) > 0  else row['Loc']
+
+            lec_days = day_parts[1] if len(day_parts) > 1 else (day_parts[0] if len(day_parts) > 0 else "")
+            lec_time = time_parts[1] if len(time_parts) > 1 else (time_parts[0] if len(time_parts) > 0 else "")
+            lec_loc  = loc_parts[1]  if len(loc_parts) > 1  else (loc_parts[0] if len(loc_parts) > 0 else "")
+
+            # Row 1: Primary Lecture Component (Clean String Assigned)
+            lec_row = row.copy()
+            lec_row['Days'], lec_row['Time'], lec_row['Loc'] = lec_days, lec_time, lec_loc
+            expanded_records.append(lec_row)
+
+            # Row 2: Lab Component #1 (Clean String Assigned)
+            lab_row_1 = row.copy()
+            lab_row_1['Days'], lab_row_1['Time'], lab_row_1['Loc'] = lab_days, lab_time, lab_loc
+            lab_row_1['Max Enrl'], lab_row_1['Enrl'], lab_row_1['Credit'] = 0, 0, 0
+            lab_row_1['WCap'], lab_row_1['WLst'], lab_row_1['Rcap'], lab_row_1['%Ful'] = 0, 0, 0, 0
+            expanded_records.append(lab_row_1)
+
+            # Row 3: Lab Component #2 (Clean String Assigned)
+            lab_row_2 = lab_row_1.copy()
+            lab_row_2['Instructor'] = ","
+            lab_row_2['Credit'] = 1
+            expanded_records.append(lab_row_2)
+
+        elif " / " in row['Days'] or " / " in row['Time']:
+            day_parts = row['Days'].split(' / ')
+            time_parts = row['Time'].split(' / ')
+            loc_parts = row['Loc'].split(' / ')
+
+            num_components = max(len(day_parts), len(time_parts), len(loc_parts))
+
+            for i in range(num_components):
+                split_row = row.copy()
+                split_row['Days'] = day_parts[i] if i < len(day_parts) else ""
+                split_row['Time'] = time_parts[i] if i < len(time_parts) else ""
+                split_row['Loc']  = loc_parts[i]  if i < len(loc_parts)  else ""
+
+                # --- Only the first split component (index 0) keeps original credits ---
+                if i > 0:
+                    split_row['Credit'] = 0
+
+                expanded_records.append(split_row)
+        else:
+            expanded_records.append(row)
+
+    return pd.DataFrame(expanded_records)
+
+
+if __name__ == "__main__":
+
+    import argparse
+    import csv
+    import io
+    import shutil
+    import tempfile
+    from os import path
+
+    from enrollmentTimeSeries import readcsv
+    from processEnrollment import processEnrollment
+    from swrcgsr import iter_report_lines
+    from utilities import tidy_txt
+    from utils import parse_enrollment_file
+
+    # Set up command line parsing
+    parser = argparse.ArgumentParser(
+        description="Time the legacy SWRCGSR readers against the shared reader."
+    )
+    parser.add_argument("filenames", nargs="+", help="SWRCGSR reports (.txt or .csv)")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="timed runs per parser")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for filename in args.filenames:
+            assert path.exists(filename), "File does not exist: {:s}".format(filename)
+
+            # every reader gets the same report, as text and as a csv export
+            csv_export = filename.lower().endswith(".csv")
+            with open(filename) as fp:
+                lines = list(iter_report_lines(fp, csv_export))
+            text = "\n".join(lines) + "\n"
+            csvname = path.join(tmpdir, "report.csv")
+            if csv_export:
+                shutil.copy(filename, csvname)
+            else:
+                with open(csvname, "w", newline="") as fp:
+                    writer = csv.writer(fp, lineterminator="\n")
+                    for line in lines:
+                        writer.writerow([line, ""])
+
+            cases = [
+                ("tidy_txt", tidy_txt_old, tidy_txt, lambda: (io.StringIO(text),)),
+                ("parse_enrollment_file", parse_enrollment_file_old, parse_enrollment_file, lambda: (text,)),
+                ("processEnrollment", processEnrollment_old, processEnrollment, lambda: (csvname,)),
+                ("readcsv", readcsv_old, readcsv, lambda: (csvname,)),
+            ]
+
+            print("{:s} ({:d} lines)".format(filename, len(lines)))
+            print("  {:24s}{:>10s}{:>10s}{:>9s}".format("reader", "legacy", "shared", "speedup"))
+            for name, legacy, shared, call_args in cases:
+                t_legacy = benchmark(legacy, call_args, args.repeat)
+                t_shared = benchmark(shared, call_args, args.repeat)
+                print("  {:24s}{:9.3f}s{:9.3f}s{:8.1f}x".format(name, t_legacy, t_shared, t_legacy / t_shared))
+    finally:
+        shutil.rmtree(tmpdir)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+# Times retrieveEnrollments end to end against a local Banner stand-in:
+# retrieval, time spent in the waits and parse time of every report.
+
+from enrollmentUtils import *
+
+def timed_retrieve(jobs, filepath, sessions=1, timeout=60, poll=None):
+    """Retrieve reports while recording the waits
+
+    Args:
+        jobs: List of dictionaries of run_query parameters.
+        filepath: Directory the reports are moved to.
+        sessions: Number of browsers running queries side by side.
+        timeout: Seconds to wait for each page.
+        poll: Seconds between checks while waiting.
+
+    Returns:
+        Tuple of the results of retrieve, the wall clock time in seconds and
+        the list of (message, seconds) of every wait.
+    """
+    import time
+
+    from bannerWait import POLL, record_waits
+    from retrieveEnrollments import retrieve
+
+    waits = []
+    record_waits(waits)
+    try:
+        start = time.perf_counter()
+        results = retrieve(jobs, filepath, sessions=sessions, retries=0,
+                           timeout=timeout, poll=poll or POLL)
+        elapsed = time.perf_counter() - start
+    finally:
+        record_waits(None)
+    return results, elapsed, waits
+
+def timed_parse(filename, repeat):
+    """Time the snapshot reader on a report
+
+    Args:
+        filename: Path of the SWRCGSR csv export.
+        repeat: Number of timed reads.
+
+    Returns:
+        Tuple of the best wall clock time in seconds and the number of rows.
+    """
+    import time
+
+    from enrollmentTimeSeries import readsnapshot
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        date, data = readsnapshot(filename)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(data)
+
+
+if __name__ == "__main__":
+
+    import argparse
+    import shutil
+    import tempfile
+
+    import retrieveEnrollments
+    from bannerStandIn import LATENCY, Latency, serve
+
+    # Set up command line parsing
+    parser = argparse.ArgumentParser(
+        description="Time retrieveEnrollments against a local Banner stand-in serving csv exports."
+    )
+    parser.add_argument("reports", help="directory of SWRCGSR csv exports served for their term")
+    parser.add_argument("-i", "--info", default=None,
+                        help="info.txt with the queries to run, by default one per term in reports")
+    parser.add_argument("-s", "--sessions", type=int, default=1,
+                        help="number of browsers running all queries side by side, after the runs per term")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="timed reads of every report")
+    parser.add_argument("-t", "--timeout", type=float, default=60,
+                        help="seconds to wait for each page before giving up")
+    parser.add_argument("-p", "--poll", type=float, default=None,
+                        help="seconds between checks while waiting")
+    parser.add_argument("--headless", help="Run Chrome without a window", action="store_true")
+    for field in Latency._fields:
+        parser.add_argument("--" + field, type=float, default=getattr(LATENCY, field),
+                            help="seconds the stand-in takes for the {:s} step".format(field))
+    args = parser.parse_args()
+
+    latency = Latency(*(getattr(args, field) for field in Latency._fields))
+    server = serve(args.reports, latency)
+    retrieveEnrollments.NAVIGATOR = server.navigator
+    retrieveEnrollments.HEADLESS = args.headless
+
+    if args.info:
+        jobs = info_jobs(text_parser(args.info), "A")
+    else:
+        jobs = info_jobs({"term": sorted(server.exports)}, "A")
+
+    # every phase renames its reports into a directory of its own
+    tmpdirs = []
+    try:
+        print("Stand-in latency: " + ", ".join("{:s} {:g}s".format(field, getattr(latency, field))
+                                               for field in Latency._fields))
+        print("{:8s} {:10s} {:>9s} {:>9s} {:>6s} {:>9s} {:>7s}".format(
+            "term", "department", "retrieve", "waits", "count", "parse", "rows"))
+
+        # every query on its own, in a fresh session, to time it alone
+        for job in jobs:
+            tmpdirs.append(tempfile.mkdtemp())
+            results, elapsed, waits = timed_retrieve([job], tmpdirs[-1] + "/", 1, args.timeout, args.poll)
+            if isinstance(results[0], Exception):
+                print("{:8s} {:10s} failed: {}".format(job["term"], job["department"], results[0]))
+                continue
+            parse, rows = timed_parse(results[0], args.repeat)
+            print("{:8s} {:10s} {:8.2f}s {:8.2f}s {:6d} {:8.3f}s {:7d}".format(
+                job["term"], job["department"], elapsed, sum(seconds for _, seconds in waits),
+                len(waits), parse, rows))
+
+        # then all queries over the sessions, for the throughput of a full pull
+        tmpdirs.append(tempfile.mkdtemp())
+        results, elapsed, waits = timed_retrieve(jobs, tmpdirs[-1] + "/", args.sessions, args.timeout, args.poll)
+        failed = sum(isinstance(result, Exception) for result in results)
+        print("{:d} queries over {:d} session(s) in {:.2f}s, {:.1f} reports a minute, {:d} failed".format(
+            len(jobs), args.sessions, elapsed, 60 * (len(jobs) - failed) / elapsed, failed))
+    finally:
+        server.shutdown()
+        for tmpdir in tmpdirs:
+            shutil.rmtree(tmpdir)
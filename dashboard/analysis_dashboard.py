@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
 from utilities import *
+from parse_cache import cached_parse
+from swrcgsr import read_xlsx
 
 import dash
 from dash import html, dcc, dash_table
@@ -72,7 +74,6 @@ def instructor_rank(df, name, term, print_rank=False):
     return rank_index
 
 
-
 def assignRank(df):
     if DEBUG:
         print("function: assignRank")
@@ -215,22 +216,21 @@ def tidy_xlsx(file_contents):
         Dataframe.
     """
 
-    _df = pd.read_excel(file_contents,
-                        engine='openpyxl',
-                        converters={
-                            'Term':str,
-                            'Subject':str,
-                            'Number':str,
-                            'CRN':str,
-                            'Section':str,
-                            'Campus':str,
-                            'Title':str,
-                            'Days':str,
-                            'Time':str,
-                            'Loc':str,
-                            'Instructor':str,
-                        },
-                       )
+    # stream the first sheet, keeping the identifying columns as text
+    _df = read_xlsx(
+        file_contents,
+        aliases={
+            'Subj': 'Subject',
+            'Nmbr': 'Number',
+            'Sec': 'Section',
+            'Cam': 'Campus',
+            'Enrl': 'Enrolled',
+            'WLst': 'WList',
+            '%Ful': 'Full',
+        },
+        text_columns=('Term', 'Subject', 'Number', 'CRN', 'Section', 'Campus', 'Title',
+                      'Days', 'Time', 'Loc', 'Instructor'),
+    )
 
     # create missing columns, if necessary
     if not 'S' in _df.columns:
@@ -242,19 +242,6 @@ def tidy_xlsx(file_contents):
     if not 'Credit' in _df.columns:
         _df.insert(len(_df.columns), 'Credit', 3)
 
-    _df.rename(
-        columns={
-            'Subj': 'Subject',
-            'Nmbr': 'Number',
-            'Sec': 'Section',
-            'Cam': 'Campus',
-            'Enrl': 'Enrolled',
-            'WLst': 'WList',
-            '%Ful': 'Full',
-        },
-        inplace=True,
-    )
-
     _df = _df[['Term', 'Year', 'Subject', 'Number', 'CRN', 'Section', 'S', 'Campus', 'Title',
               'Credit', 'Enrolled', 'Days', 'Time', 'Loc', 'Instructor']]
 
@@ -264,10 +251,8 @@ def tidy_xlsx(file_contents):
     _df = _df[_df['Enrolled']>0]
 
     _df.insert(len(_df.columns), "SUF", "S")
-    for row in _df[_df["Term"].str.endswith("40", na=False)].index.tolist():
-        _df.loc[row, "SUF"] = "U"
-    for row in _df[_df["Term"].str.endswith("50", na=False)].index.tolist():
-        _df.loc[row, "SUF"] = "F"
+    _df.loc[_df["Term"].str.endswith("40", na=False), "SUF"] = "U"
+    _df.loc[_df["Term"].str.endswith("50", na=False), "SUF"] = "F"
 
     _df.loc[:, "CHP"] = _df["Credit"] * _df["Enrolled"]
 
@@ -284,6 +269,7 @@ def tidy_xlsx(file_contents):
 
     return _df
 
+
 def parse_contents(contents):#, filename):#, date):
     if DEBUG:
         print("function: parse_contents")
@@ -292,14 +278,13 @@ def parse_contents(contents):#, filename):#, date):
 
     decoded = base64.b64decode(content_string)
     try:
-        df = tidy_xlsx(io.BytesIO(decoded))
+        df = cached_parse(decoded, tidy_xlsx, io.BytesIO(decoded))
         return df
     except Exception as e:
         print(e)
         return html.Div(['There was an error processing this file.'])
 
 
-
 def create_datatable(df):
         return [
             dash_table.DataTable(
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from utilities import *
+from parse_cache import cached_parse
 
 # Import required libraries
 import dash
@@ -668,14 +669,14 @@ def parse_contents(contents, filename): #, date):
     # try:
     if "txt" in filename:
         # Assume that the user uploaded a banner fixed width file with .txt extension
-        df, term_code, data_date = tidy_txt(io.StringIO(decoded.decode("utf-8")))
-        df["Time"] = df["Time"].apply(lambda x: convertAMPMtime(x))
+        df, term_code, data_date = cached_parse(decoded, tidy_txt, io.StringIO(decoded.decode("utf-8")))
+        df["Time"] = convert_times(df["Time"])
     elif "csv" in filename:
         # Assume the user uploaded a banner Shift-F1 export quasi-csv file with .csv extension
-        df, term_code, data_date = tidy_csv(io.StringIO(decoded.decode("utf-8")))
-        df["Time"] = df["Time"].apply(lambda x: convertAMPMtime(x))
+        df, term_code, data_date = cached_parse(decoded, tidy_csv, io.StringIO(decoded.decode("utf-8")))
+        df["Time"] = convert_times(df["Time"])
     elif "xlsx" in filename:
-        df, term_code, data_date = tidy_xlsx(io.BytesIO(decoded))
+        df, term_code, data_date = cached_parse(decoded, tidy_xlsx, io.BytesIO(decoded))
     # except Exception as e:
     #     print(e)
     else:
@@ -1,14 +1,22 @@
 # -*- coding: utf-8 -*-
 from utilities import *
+from parse_cache import cached_parse
+from intervals import adjacent, overlapping
+from room_capacity import SLOT, over_capacity, room_capacities
+from rules import RuleRegistry, changed_rows
+from finals_solver import SATURDAY_FINALS, exam_sections, finals_week, propose_finals
+from finals_grid import compile_grid, grid_finals
 
 # Import required libraries
-from dash import html, dcc, dash_table, callback_context, Dash
+from dash import html, dcc, dash_table, callback_context, Dash, Patch
+from dash.exceptions import PreventUpdate
 import dash
 from pandas import set_option, DataFrame, read_fwf, __version__, \
-        to_numeric, read_excel, merge, ExcelWriter
+        to_numeric, read_excel, merge, ExcelWriter, to_datetime
 from plotly import io as pio
 from base64 import b64decode, b64encode
 from io import StringIO, BytesIO
+import csv
 from dash.dependencies import Input, Output, State
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
@@ -55,8 +63,6 @@ if mathserver:
 days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
 
 
-
-
 def convert_term_title_to_code(term_title):
     """
     Converts a descriptive term title (e.g., "Fall Semester 2026" or "Spring 2025")
@@ -180,7 +186,6 @@ def draw_canvas_decorations(canvas, doc):
     canvas.restoreState()
 
 
-
 def build_grouped_replica_pdf(dataframe, group_by_col, term_title, output_target):
     """
     Assembles cleaned row blocks into independent tabular grid boxes separated
@@ -317,10 +322,6 @@ def build_grouped_replica_pdf(dataframe, group_by_col, term_title, output_target
         print(f"--> Success! Created file: {output_target}")
 
 
-
-
-
-
 def generate_weekday_tab(day):
     if DEBUG:
         print("generate_weekday_tab")
@@ -403,7 +404,7 @@ def generate_tab_fig(day, tab, fig):
         id='schedule_' + day_abbrv + '_div',
     )
 
-def update_grid(data):#toggle, data, filtered_data, slctd_row_indices):
+def update_grid(data, weekdays='MTWRFS'):#toggle, data, filtered_data, slctd_row_indices):
     if DEBUG:
         print("function: update_grid")
 
@@ -448,9 +449,9 @@ def update_grid(data):#toggle, data, filtered_data, slctd_row_indices):
     _df['timeLoc'] = _df['Time'] + _df['Loc']
 
 
-    # create figures for all tabs
+    # create figures for all tabs, or the tabs of the days asked for
     figs = []
-    for d in ['M', 'T', 'W', 'R', 'F', 'S']:
+    for d in weekdays:
 
         if DEBUG:
             print("function: update_grid {:s}".format(d))
@@ -836,108 +837,9 @@ df_grid = DataFrame({'Credit': finals_grid[::7], 'Meetings': finals_grid[1::7],
 df_grid['Class_Start'] = df_grid['Class_Start'].apply(lambda x: convertAMPMtime_grid(x))
 df_grid['Class_End'] = df_grid['Class_End'].apply(lambda x: convertAMPMtime_grid(x))
 
+# final day and time of every meeting pattern of the grid
+FINALS_GRID = compile_grid(df_grid)
 
-def tidy_csv_old(file_contents):
-    if DEBUG:
-        print("function: tidy_csv")
-    """ Converts the CSV format to the TXT format from Banner
-
-    Args:
-        file_contents:
-            input decoded filestream of SWRCGSR output from an uploaded textfile.
-
-    Returns:
-        Dataframe.
-    """
-
-    _file = file_contents.read()
-    _file = _file.replace('\r','')
-
-    _list = []
-    line = ''
-    for char in _file:
-        if char == '\n':
-            line = line.replace('"','')
-            _list.append(line[:-1])
-            line = ''
-        else:
-            line += char
-
-    # delete information in first line to match txt file type
-    _list = _list[1:]
-    _list.insert(0, '')
-
-    return tidy_txt(StringIO('\n'.join(_list)))
-
-def tidy_xlsx_old(file_contents):
-    if DEBUG:
-        print("function: tidy_xlsx")
-    """ Converts an Excel Spreadsheet
-
-    Make sure that you copy and paste all data as values before trying to import.
-
-    Args:
-        file_contents:
-            input decoded filestream of SWRCGSR output from an uploaded textfile.
-
-    Returns:
-        Dataframe.
-    """
-
-    _df = read_excel(file_contents,
-                        engine='openpyxl',
-                        converters={
-                            'Subject':str,
-                            'Number':str,
-                            'CRN':str,
-                            'Section':str,
-                            'Campus':str,
-                            'Title':str,
-                            'Days':str,
-                            'Time':str,
-                            'Loc':str,
-                            'Instructor':str,
-                        },
-                       )
-
-    # create missing columns, if necessary
-    if not 'S' in _df.columns:
-        _df.insert(len(_df.columns), 'S', 'A')
-    if not 'Begin/End' in _df.columns:
-        _df.insert(len(_df.columns), 'Begin/End', '01/01-01/01')
-    if not 'Max' in _df.columns:
-        _df.insert(len(_df.columns), 'Max', 1)
-    if not 'Credit' in _df.columns:
-        _df.insert(len(_df.columns), 'Credit', 3)
-
-    _df.rename(
-        columns={
-            'Subj': 'Subject',
-            'Nmbr': 'Number',
-            'Sec': 'Section',
-            'Cam': 'Campus',
-            'Enrl': 'Enrolled',
-            'WLst': 'WList',
-            '%Ful': 'Full',
-        },
-        inplace=True,
-    )
-
-    _df = _df[['Subject', 'Number', 'CRN', 'Section', 'S', 'Campus', 'Title',
-              'Credit', 'Max', 'Enrolled', 'Days', 'Time', 'Loc', 'Begin/End', 'Instructor']]
-
-    _df.insert(len(_df.columns), 'Class', ' ')
-    _df['Class'] = _df['Subject'] + ' ' + _df['Number']
-    _df = updateTitles(_df)
-
-    # there might be CRNs that are unknown (blank), so fill sequentially starting
-    # from 99999 and go down
-    i = 1
-    for row in _df[_df['CRN'].isna()].index.tolist():
-        _df.loc[row, 'CRN'] = str(100000 - i)
-        i += 1
-
-    return _df
 
 def parse_enrollment(contents, filename):#, date):
     if DEBUG:
@@ -951,8 +853,7 @@ def parse_enrollment(contents, filename):#, date):
         date: the timestamp
 
     Returns:
-        html Div element containing statistics and dash graphs
-        class EnrollmentData containing data and attributes
+        DataFrame of the enrollment and the datetime the report was run.
     """
 
     content_type, content_string = contents.split(',')
@@ -960,18 +861,19 @@ def parse_enrollment(contents, filename):#, date):
     decoded = b64decode(content_string)
 
     df = pd.DataFrame()
+    data_date = None
     if 'txt' in filename:
-        df, _, _ = tidy_txt(StringIO(decoded.decode('utf-8')))
+        df, _, data_date = cached_parse(decoded, tidy_txt, StringIO(decoded.decode('utf-8')))
     elif 'csv' in filename:
-        df = tidy_csv(StringIO(decoded.decode('utf-8')))
+        df, _, data_date = cached_parse(decoded, tidy_csv, StringIO(decoded.decode('utf-8')))
     elif 'xlsx' in filename:
-        df, _, _ = tidy_xlsx(BytesIO(decoded))
+        df, _, data_date = cached_parse(decoded, tidy_xlsx, BytesIO(decoded))
 
     df = df[df['Credit']>0]
     df = df[df['S']!='C']
-    df['Time'] = df['Time'].apply(lambda x: convertAMPMtime(x))
+    df['Time'] = convert_times(df['Time'])
     df = df[['Subject', 'Number', 'CRN', 'Section', 'S', 'Campus', 'Title', 'Credit', 'Max', 'Enrolled', 'Days', 'Time', 'Loc', 'Begin/End', 'Instructor', 'Class']].copy()
-    return df
+    return df, data_date
 
 def parse_finals_xlsx(contents, CRNs):
     content_type, content_string = contents.split(',')
@@ -999,7 +901,7 @@ def parse_finals_xlsx(contents, CRNs):
 
     df = df[['CRN', 'Class', 'Days', 'Time', 'Loc', 'Date']]
 
-    df['Time'] = df['Time'].apply(lambda x: convertAMPMtime(x))
+    df['Time'] = convert_times(df['Time'])
 
     df = merge(DataFrame({'CRN': CRNs}), df, how="left", on="CRN")
     df = df[df['Date'].notna()]
@@ -1008,32 +910,22 @@ def parse_finals_xlsx(contents, CRNs):
     return df
 
 
-def parse_finals_csv(contents, CRNs):
-
-    # subjects: list of subjects from enrollment report
-
-    content_type, content_string = contents.split(',')
-
-    decoded = b64decode(content_string)
-
-    _file = StringIO(decoded.decode('utf-8')).read()
-    _file = _file.replace('\r','')
-
-    file_contents = []
-    line = ''
-    for char in _file:
-        if char == '\n':
-            file_contents.append(line)
-            line = ''
-        else:
-            line += char
+def iter_finals_csv(file_contents, CRNs):
+    """Yield the final exam rows of an AHEC calendar export one line at a time.
 
-    # print(file_contents)
+    Args:
+        file_contents:
+            text stream of the csv export.
+        CRNs:
+            CRNs listed in the enrollment report; all other classes are skipped
+            before their dates and times are parsed.
 
-    rows = []
-    for line in file_contents:
+    Returns:
+        Generator of [CRN, Class, Days, Time, Loc, Date] lists.
+    """
 
-        fields = [field.replace('"','') for field in line.split(',')]
+    CRNs = set(CRNs)
+    for fields in csv.reader(file_contents):
 
         # only pick up classes for CRN listed in enrollment report
         try:
@@ -1042,9 +934,10 @@ def parse_finals_csv(contents, CRNs):
             if CRN in CRNs:
                 Loc = fields[3]
                 try:
-                    Date = datetime.strptime(fields[6], '%m/%d/%Y').strftime('%m/%d/%Y')
+                    date = datetime.strptime(fields[6], '%m/%d/%Y')
                 except ValueError:
-                    Date = datetime.strptime(fields[6], '%x').strftime('%m/%d/%Y')
+                    date = datetime.strptime(fields[6], '%x')
+                Date = date.strftime('%m/%d/%Y')
 
                 # reformat the time to match the SWRCGSR formatting
                 start_time = fields[7].replace(':','')[:-2].zfill(4)
@@ -1053,31 +946,28 @@ def parse_finals_csv(contents, CRNs):
                 Time = start_time + '-' + end_time + AMPM
 
                 # find the day of week and code it to MTWRFSU
-                day_str = datetime.strptime(Date, '%m/%d/%Y').strftime('%A')
-                if day_str == "Monday":
-                    Days = "M"
-                elif day_str == "Tuesday":
-                    Days = "T"
-                elif day_str == "Wednesday":
-                    Days = "W"
-                elif day_str == "Thursday":
-                    Days = "R"
-                elif day_str == "Friday":
-                    Days = "F"
-                elif day_str == "Saturday":
-                    Days = "S"
-                else:
-                    Days = "U"
-
-                rows.append([CRN, Class, Days, Time, Loc, Date])
+                Days = 'MTWRFSU'[date.weekday()]
+
+                yield [CRN, Class, Days, Time, Loc, Date]
         except IndexError:
             pass
 
+def parse_finals_csv(contents, CRNs):
+
+    # subjects: list of subjects from enrollment report
+
+    content_type, content_string = contents.split(',')
+
+    decoded = b64decode(content_string)
+
+    rows = iter_finals_csv(StringIO(decoded.decode('utf-8')), CRNs)
+
     df = DataFrame(rows, columns=['CRN', 'Class', 'Days', 'Time', 'Loc', 'Date'])
-    df['Time'] = df['Time'].apply(lambda x: convertAMPMtime(x))
+    df['Time'] = convert_times(df['Time'])
 
     return df
 
+
 def to_excel(df):
     if DEBUG:
         print("function: to_excel")
@@ -1103,36 +993,47 @@ def to_excel(df):
 
     return data
 
-def no_final(e, f):
-    indexFilter = []
-    for row in e.index.tolist():
-        CRN = e.loc[row, 'CRN']
+def match_finals(e, f, r):
+    """Join every enrollment row with its finals, grouping the finals by CRN once.
 
-        if f[f['CRN'] == CRN].shape[0] == 0:
-            indexFilter.append(row)
-    return indexFilter
+    Args:
+        e:
+            enrollment DataFrame with a CRN column.
+        f:
+            finals DataFrame with CRN, Days, Time, Loc and Date columns.
+        r:
+            rooms DataFrame with a Room column.
 
-def multiple_finals(e, f):
-    indexFilter = []
-    for row in e.index.tolist():
-        CRN = e.loc[row, 'CRN']
+    Returns:
+        DataFrame with the index of e and the number of finals of its CRN
+        (Final_Count), the Final_Day, Final_Date, Final_Time and Final_Loc of
+        the first of them and whether that room is in the rooms table
+        (Final_Room_Exists).
+    """
 
-        if f[f['CRN'] == CRN].shape[0] > 1:
-            indexFilter.append(row)
-    return indexFilter
+    first = f.drop_duplicates('CRN').set_index('CRN')[['Days', 'Date', 'Time', 'Loc']]
+    first.columns = ['Final_Day', 'Final_Date', 'Final_Time', 'Final_Loc']
+    first['Final_Count'] = f['CRN'].value_counts()
 
-def correct_final_day(e, f):
-    indexFilter = []
-    for row in e.index.tolist():
-        CRN = e.loc[row, 'CRN']
+    joined = first.reindex(e['CRN'].to_numpy())
+    joined.index = e.index
+    joined['Final_Count'] = joined['Final_Count'].fillna(0).astype(int)
+    joined['Final_Room_Exists'] = joined['Final_Loc'].isin(set(r['Room']))
+    return joined
+
+def no_final(e):
+    return e.index[e['Final_Count'] == 0].tolist()
 
-        day = f[f['CRN'] == CRN]['Days'].iloc[0]
-        days = e.loc[row, 'Days']
+def multiple_finals(e):
+    return e.index[e['Final_Count'] > 1].tolist()
 
+def correct_final_day(e):
+    indexFilter = []
+    for row, days, day, number in zip(e.index, e['Days'], e['Final_Day'], e['Number']):
         if days.find(day) < 0:
 
             # day of week does not match, is this an Algebra class
-            if e.loc[row, 'Number'] in ['1109', '1110', '1111']:
+            if number in ['1109', '1110', '1111']:
                 if day != "S":
                     indexFilter.append(row)
 
@@ -1141,26 +1042,17 @@ def correct_final_day(e, f):
 
     return indexFilter
 
-def room_exist(e, f, r):
-    indexFilter = []
-    for row in e.index.tolist():
-        CRN = e.loc[row, 'CRN']
+def room_exist(e):
+    return e.index[~e['Final_Room_Exists']].tolist()
 
-        d = f[f['CRN'] == CRN]
-        if d.iloc[0, 4] not in r['Room'].tolist():
-            indexFilter.append(row)
-    return indexFilter
 
-def final_room_capacity(df, room_capacities):
+def final_room_capacity(df, rooms):
     indexFilter = []
-    for row in df.index.tolist():
-        enrl = df[(df['Final_Loc'] == df.loc[row, 'Final_Loc']) & \
-                  (df['Final_Time'] == df.loc[row, 'Final_Time']) & \
-                  (df['Final_Day'] == df.loc[row, 'Final_Day'])]['Enrolled'].sum()
-        if (enrl > int(room_capacities[df.loc[row, 'Final_Loc']])):
-            indexFilter.append(row)
+    for rows in over_capacity(df, rooms)['Rows']:
+        indexFilter += rows
     return indexFilter
 
+
 def within_one_hour(e):
     indexFilter = []
     for row in e.index.tolist():
@@ -1174,178 +1066,225 @@ def within_one_hour(e):
             indexFilter.append(row)
     return indexFilter
 
-def instructor_overlap(enrl):
-    indexFilter = []
-    instructors = enrl['Instructor'].unique()
-    for instructor in instructors:
-        # filter by instructor
-        _df = enrl[enrl['Instructor'] == instructor]
-        days = ['M', 'T', 'W', 'R', 'F', 'S', 'U']
-        for day in days:
-            # filter by day
-            df = _df[_df['Final_Day'] == day]
-
-            # check for instructor overlap of same time blocks
-            # (this does not calculate all overlaps)
-            if df.shape[0] > 1:
-                # every final time block should have a unique location
-                for row in df.index.tolist():
-                    if df[df['Final_Time'] == df.loc[row, 'Final_Time']]['Final_Loc'].nunique() > 1:
-                        indexFilter.append(row)
-    return indexFilter
+def instructor_overlap(enrl, groups=None):
+    if groups is None:
+        groups = enrl.groupby(['Instructor', 'Final_Day'], sort=False).ngroup().to_numpy()
 
-def instructor_nonconformal_overlap(enrl):
-    indexFilter = []
-    instructors = enrl['Instructor'].unique()
-    for instructor in instructors:
-        # filter by instructor
-        _df = enrl[enrl['Instructor'] == instructor]
-        days = ['M', 'T', 'W', 'R', 'F', 'S', 'U']
-        for day in days:
-            # filter by day
-            df = _df[_df['Final_Day'] == day]
-
-            # check nonconformal overlaps; this uses SUMPRODUCT
-            times = df['Final_Time'].unique().tolist()
-            n = len(times)
-            if n > 1:
-                start_times = [datetime.strptime(time[:5], "%H:%M") for time in times]
-                end_times = [datetime.strptime(time[-5:], "%H:%M") for time in times]
-                for k in range(n):
-                    s = ([x > start_times[k] for x in end_times])
-                    e = ([x < end_times[k] for x in start_times])
-                    if sum([x*y for x,y in zip(s,e)]) > 1:
-                        for row in df.index.tolist():
-                            if df.loc[row, 'Final_Time'] == times[k]:
-                                indexFilter.append(row)
-    return indexFilter
+    # every final time block of an instructor on a day should have a unique location
+    locations = enrl.groupby([groups, enrl['Final_Time'].to_numpy()], sort=False)['Final_Loc'].transform('nunique')
+    return enrl.index[(locations > 1).to_numpy()].tolist()
 
-def instructor_back_to_back(enrl):
-    indexFilter = []
-    instructors = enrl['Instructor'].unique()
-    for instructor in instructors:
-        # filter by instructor
-        _df = enrl[enrl['Instructor'] == instructor]
-        days = ['M', 'T', 'W', 'R', 'F', 'S', 'U']
-        for day in days:
-            # filter by day
-            df = _df[_df['Final_Day'] == day]
-
-            # check nonconformal overlaps; this uses SUMPRODUCT
-            times = df['Final_Time'].unique().tolist()
-            n = len(times)
-            if n > 1:
-                # check for instructor back-to-back (different rooms) within 15 minutes
-                start_times = [datetime.strptime(time[:5], "%H:%M") for time in times]
-                end_times = [datetime.strptime(time[-5:], "%H:%M")+timedelta(minutes=15) for time in times]
-                for k in range(n):
-                    s = ([x > start_times[k] for x in end_times])
-                    e = ([x < end_times[k] for x in start_times])
-                    if sum([x*y for x,y in zip(s,e)]) > 1:
-                        for row in df.index.tolist():
-                            if df.loc[row, 'Final_Time'] == times[k]:
-                                indexFilter.append(row)
-    return indexFilter
+def instructor_nonconformal_overlap(enrl, groups=None):
+    return overlapping(enrl, ['Instructor', 'Final_Day'] if groups is None else groups, 'Final_Time')
 
-def room_overlap(enrl):
-    indexFilter = []
-    rooms = enrl['Final_Loc'].unique()
-    for room in rooms:
-        # filter by location
-        _df = enrl[enrl['Final_Loc'] == room]
-        days = ['M', 'T', 'W', 'R', 'F', 'S', 'U']
-        for day in days:
-            # filter by day
-            df = _df[_df['Final_Day'] == day]
-
-            # check for room overlap of same time blocks (this does not calculate all overlaps)
-            if df.shape[0] > 1 and (df['Time'].nunique() != df['Final_Time'].nunique()):
-                for row in df.index.tolist():
-                    indexFilter.append(row)
+def instructor_back_to_back(enrl, groups=None):
+    # check for instructor back-to-back (different rooms) within 15 minutes
+    return overlapping(enrl, ['Instructor', 'Final_Day'] if groups is None else groups, 'Final_Time', buffer=15)
 
-    return indexFilter
+def room_overlap(enrl, groups=None):
+    if groups is None:
+        groups = enrl.groupby(['Final_Loc', 'Final_Day'], sort=False).ngroup().to_numpy()
 
-def room_nonconformal_overlap(enrl):
-    indexFilter = []
-    rooms = enrl['Final_Loc'].unique()
-    for room in rooms:
-        # filter by location
-        _df = enrl[enrl['Final_Loc'] == room]
-        days = ['M', 'T', 'W', 'R', 'F', 'S', 'U']
-        for day in days:
-            # filter by day
-            df = _df[_df['Final_Day'] == day]
-
-            # check nonconformal overlaps; this uses SUMPRODUCT
-            times = df['Final_Time'].unique().tolist()
-            n = len(times)
-            if n > 1:
-                start_times = [datetime.strptime(time[:5], "%H:%M") for time in times]
-                end_times = [datetime.strptime(time[-5:], "%H:%M") for time in times]
-                for k in range(n):
-                    s = ([x > start_times[k] for x in end_times])
-                    e = ([x < end_times[k] for x in start_times])
-                    if sum([x*y for x,y in zip(s,e)]) > 1:
-                        for row in df.index.tolist():
-                            if df.loc[row, 'Final_Time'] == times[k]:
-                                indexFilter.append(row)
+    # check for room overlap of same time blocks (this does not calculate all overlaps)
+    rooms = enrl.groupby(groups, sort=False)
+    overlap = (rooms['Time'].transform('size') > 1) & \
+              (rooms['Time'].transform('nunique') != rooms['Final_Time'].transform('nunique'))
+    return enrl.index[overlap.to_numpy()].tolist()
 
-    return indexFilter
+def room_nonconformal_overlap(enrl, groups=None):
+    return overlapping(enrl, ['Final_Loc', 'Final_Day'] if groups is None else groups, 'Final_Time')
 
-def room_back_to_back(enrl):
-    indexFilter = []
-    rooms = enrl['Final_Loc'].unique()
-    for room in rooms:
-        # filter by location
-        _df = enrl[enrl['Final_Loc'] == room]
-        days = ['M', 'T', 'W', 'R', 'F', 'S', 'U']
-        for day in days:
-            # filter by day
-            df = _df[_df['Final_Day'] == day]
-
-            # check nonconformal overlaps; this uses SUMPRODUCT
-            times = df['Final_Time'].unique().tolist()
-            n = len(times)
-            if n > 1:
-                start_times = [datetime.strptime(time[:5], "%H:%M") for time in times]
-                end_times = [datetime.strptime(time[-5:], "%H:%M") for time in times]
-                # check for back-to-back in same room
-                for k in range(n):
-                    s = ([x == start_times[k] for x in end_times[:-1]])
-                    e = ([x == end_times[k] for x in start_times[1:]])
-                    if sum(s+e) > 0:
-                        for row in df.index.tolist():
-                            if df.loc[row, 'Final_Time'] == times[k]:
-                                indexFilter.append(row)
+def room_back_to_back(enrl, groups=None):
+    # check for back-to-back in same room
+    return adjacent(enrl, ['Final_Loc', 'Final_Day'] if groups is None else groups, 'Final_Time')
 
-    return indexFilter
 
-def accord_with_finals_grid(df_enrl, df_finals, df_grid):
-    indexFilter = []
-    for row in df_enrl.index.tolist():
-        CRN = df_enrl.loc[row, 'CRN']
+def accord_with_finals_grid(df_enrl, df_finals, grid=FINALS_GRID):
+    expected = grid_finals(df_enrl, grid)
 
-        # convert everything to string to compare to datatable
-        credit = str(int(df_enrl.loc[row, 'Credit']))
-        start_time = df_enrl.loc[row, 'Time'][:5]
-        days = df_enrl.loc[row, 'Days']
-        meetings = str(len(days) - days.count(" ")) # do not count spaces
+    # classes not in the finals grid are not checked, and algebra may hold
+    # its finals on Saturday
+    differs = (expected['Grid_Day'] != df_enrl['Final_Day']) | (expected['Grid_Time'] != df_enrl['Final_Time'])
+    saturday = df_enrl['Number'].isin(SATURDAY_FINALS) & (df_enrl['Final_Day'] == 'S')
+    return df_enrl.index[expected['Grid_Day'].notna() & differs & ~saturday].tolist()
 
-        df = df_grid[(df_grid['Credit']==credit) & (df_grid['Class_Start']==start_time) & (df_grid['Meetings']==meetings) & (df_grid['Class_Days']==days)]
-        try:
-            final_day = df_finals[df_finals['CRN']==CRN]['Days'].iloc[0]
-            final_time = df_finals[df_finals['CRN']==CRN]['Time'].iloc[0]
-            grid_day = df['Final_Day'].iloc[0]
-            grid_time = df['Final_Time'].iloc[0]
-            if (grid_day != final_day) or (grid_time != final_time):
-                if (df_enrl.loc[row, 'Number'] in ['1109', '1110', '1111']) and (final_day == "S"):
-                    pass
-                else:
-                    indexFilter.append(row)
-        except IndexError:
-            pass # could not find day/time in finals grid
 
-    return indexFilter
+# error codes of the combined table, checked in this order; rows without a
+# final or with several are left out of the checks of the final itself
+FINALS_RULES = RuleRegistry()
+
+@FINALS_RULES.rule('0', 'No final for this CRN')
+def _rule_no_final(df, groups, **context):
+    return no_final(df)
+
+@FINALS_RULES.rule('1', 'Multiple finals for this CRN')
+def _rule_multiple_finals(df, groups, **context):
+    return multiple_finals(df)
+
+@FINALS_RULES.rule('2', 'Day of final incorrect', skip='01')
+def _rule_correct_final_day(df, groups, **context):
+    return correct_final_day(df)
+
+@FINALS_RULES.rule('3', 'Overlap of time block for instructor', ('Instructor', 'Final_Day'), skip='01')
+def _rule_instructor_overlap(df, groups, **context):
+    return instructor_overlap(df, groups)
+
+@FINALS_RULES.rule('4', 'Overlap between time blocks for instructor', ('Instructor', 'Final_Day'), skip='01')
+def _rule_instructor_nonconformal_overlap(df, groups, **context):
+    return instructor_nonconformal_overlap(df, groups)
+
+@FINALS_RULES.rule('5', 'Instructor back-to-back within 15 minutes', ('Instructor', 'Final_Day'), skip='01')
+def _rule_instructor_back_to_back(df, groups, **context):
+    return instructor_back_to_back(df, groups)
+
+@FINALS_RULES.rule('6', 'Overlap of time block in same room', ('Final_Loc', 'Final_Day'), skip='01')
+def _rule_room_overlap(df, groups, **context):
+    return room_overlap(df, groups)
+
+@FINALS_RULES.rule('7', 'Overlap between time blocks in same room', ('Final_Loc', 'Final_Day'), skip='01')
+def _rule_room_nonconformal_overlap(df, groups, **context):
+    return room_nonconformal_overlap(df, groups)
+
+@FINALS_RULES.rule('8', 'Back-to-back in same room', ('Final_Loc', 'Final_Day'), skip='01')
+def _rule_room_back_to_back(df, groups, **context):
+    return room_back_to_back(df, groups)
+
+@FINALS_RULES.rule('9', 'Final start time not within one hour of regular start time', skip='01')
+def _rule_within_one_hour(df, groups, **context):
+    return within_one_hour(df)
+
+@FINALS_RULES.rule('A', 'Room does not exist in Rooms Table', skip='01')
+def _rule_room_exist(df, groups, **context):
+    return room_exist(df)
+
+@FINALS_RULES.rule('B', 'Room capacity may be too low (check in Banner)', SLOT, skip='01A')
+def _rule_final_room_capacity(df, groups, rooms, **context):
+    return final_room_capacity(df, rooms)
+
+@FINALS_RULES.rule('C', 'Final day/time does not agree with Finals Grid', skip='01')
+def _rule_accord_with_finals_grid(df, groups, finals, grid, **context):
+    return accord_with_finals_grid(df, finals, grid)
+
+# columns of the combined table
+COMBINED_COLUMNS = ['Subject', 'Number', 'CRN', 'Section', 'Title', 'Instructor',
+                    'Final_Day', 'Final_Time', 'Final_Loc', 'Final_Date', 'Error']
+
+def final_days(df_finals):
+    """Recalculate the day of every final from its date.
+
+    Args:
+        df_finals:
+            finals DataFrame with a Date column as mm/dd/YYYY.
+
+    Returns:
+        Copy of df_finals with the Days coded as MTWRFSU; dates that are not
+        dates, e.g. a row being added, are coded U.
+    """
+    df_finals = df_finals.copy()
+    dates = to_datetime(df_finals['Date'], format='%m/%d/%Y', errors='coerce')
+    df_finals['Days'] = dates.dt.dayofweek.map(dict(enumerate('MTWRFSU'))).fillna('U')
+    return df_finals
+
+def attach_finals(df_enrollment, df_finals, df_rooms):
+    """Fill in the final of every class of the combined table.
+
+    Args:
+        df_enrollment:
+            classes needing a final, with a reset index.
+        df_finals:
+            finals DataFrame with the days from final_days.
+        df_rooms:
+            rooms DataFrame with a Room column.
+
+    Returns:
+        Copy of df_enrollment with the Final_Day, Final_Time, Final_Loc and
+        Final_Date of the classes with exactly one final, blank otherwise, and
+        the Final_Count and Final_Room_Exists of match_finals.
+    """
+    df_enrollment = df_enrollment.copy()
+
+    # create columns for final information
+    df_enrollment['Final_Day'] = ''
+    df_enrollment['Final_Time'] = ''
+    df_enrollment['Final_Loc'] = ''
+    df_enrollment['Final_Date'] = ''
+
+    # match every class with its finals in a single join
+    finals = match_finals(df_enrollment, df_finals, df_rooms)
+    df_enrollment['Final_Count'] = finals['Final_Count']
+    df_enrollment['Final_Room_Exists'] = finals['Final_Room_Exists']
+
+    # fill in finals data
+    _indexFilter = finals.index[finals['Final_Count'] == 1]
+    for column in ['Final_Day', 'Final_Date', 'Final_Time', 'Final_Loc']:
+        df_enrollment.loc[_indexFilter, column] = finals.loc[_indexFilter, column]
+
+    return df_enrollment
+
+def room_overlap_override(df_enrollment, mask, df_rooms):
+    """Clear the room overlaps that fit in their room.
+
+    Args:
+        df_enrollment:
+            combined table with Final_Loc and Enrolled columns.
+        mask:
+            error masks of FINALS_RULES for the rows of df_enrollment.
+        df_rooms:
+            rooms DataFrame with Room and Cap columns.
+
+    Returns:
+        Copy of mask.
+    """
+    mask = mask.copy()
+
+    # need to check if the only error code is 6 but there may be enough capacity
+    # in the room so remove the error
+    only_room_overlap = mask == FINALS_RULES.bits('6')
+    df_tmp = df_enrollment[only_room_overlap]
+    capacities = room_capacities(df_rooms)
+    for r in df_tmp['Final_Loc'].unique():
+        cap_enrl = df_tmp[df_tmp['Final_Loc'] == r]['Enrolled'].sum()
+        if cap_enrl <= capacities.get(r, float('nan')):
+            mask[only_room_overlap] = 0
+    return mask
+
+def check_finals(df_enrollment, df_finals, df_rooms):
+    """Combined table of the classes needing a final with the errors of their finals.
+
+    Args:
+        df_enrollment:
+            enrollment DataFrame.
+        df_finals:
+            finals DataFrame with a Date column as mm/dd/YYYY.
+        df_rooms:
+            rooms DataFrame with Room and Cap columns.
+
+    Returns:
+        Tuple of the combined table with ErrorMask and Error columns, the
+        error masks of FINALS_RULES before room_overlap_override and the
+        seconds taken by every rule.
+    """
+    # the day of every final based on the date of the final
+    df_finals = final_days(df_finals)
+
+    # remove canceled classes, TBA times, classes not on the main campus and labs
+    df_enrollment = exam_sections(df_enrollment)
+
+    # remove extraneous columns
+    df_enrollment = df_enrollment.drop(columns=['Begin/End', 'S'])
+
+    # reset the index
+    df_enrollment = df_enrollment.reset_index(drop=True)
+
+    # fill in finals data
+    df_enrollment = attach_finals(df_enrollment, df_finals, df_rooms)
+
+    # run every check, each setting its bit of the error mask
+    mask, timings = FINALS_RULES.run(df_enrollment, rooms=df_rooms, finals=df_finals, grid=FINALS_GRID)
+
+    df_enrollment['ErrorMask'] = room_overlap_override(df_enrollment, mask, df_rooms)
+    df_enrollment['Error'] = FINALS_RULES.describe(df_enrollment['ErrorMask'])
+    return df_enrollment, mask, timings
 
 # Create app layout
 
@@ -1622,6 +1561,20 @@ app.layout = html.Div([
                 multiple=False,
                 accept='.txt, .csv, .xlsx',
             ),
+            html.Button(
+                'Propose Finals',
+                id='propose-finals-button',
+                n_clicks=0,
+                disabled=True,
+                style={
+                    'padding': '0px',
+                    'textAlign': 'center',
+                    'width': '95%',
+                    'fontSize': '1rem',
+                },
+                title='Propose a finals schedule from the enrollment report, finals grid and rooms',
+                className='button'
+            ),
             html.Hr(),
             html.Label('Action:'),
             html.Button(
@@ -1698,6 +1651,11 @@ app.layout = html.Div([
                     className='button'
                     ),
             dcc.Download(id='datatable-pdf-course-download'),
+
+            # combined table and error masks of the last Update, for revalidating edits
+            dcc.Store(id='finals-state'),
+            # date the enrollment report was run, to date the proposed finals
+            dcc.Store(id='enrollment-report-date'),
         ],
             id='buttonContainer',
         ),
@@ -1721,9 +1679,10 @@ app.layout = html.Div([
      Output('table-tabs', 'value'),
     [Input('load-enrollmentreport-button', 'n_clicks'),
      Input('load-finalsexport-button', 'n_clicks'),
+     Input('propose-finals-button', 'n_clicks'),
      Input('update-button', 'n_clicks'),]
 )
-def display_tab(btn_enroll, btn_finals, btn_update):
+def display_tab(btn_enroll, btn_finals, btn_propose, btn_update):
     # this function changes the view of the tab content based on
     # which button was clicked
     if DEBUG:
@@ -1735,7 +1694,7 @@ def display_tab(btn_enroll, btn_finals, btn_update):
         btn_id = ctx.triggered[0]['prop_id'].split('.')[0]
         if btn_id == 'load-enrollmentreport-button':
             return 'tab-enrollment'
-        elif btn_id == 'load-finalsexport-button':
+        elif btn_id in ['load-finalsexport-button', 'propose-finals-button']:
             return 'tab-finals'
         else:
             return 'tab-combined'
@@ -1768,7 +1727,9 @@ def update_tab_display(tab):
     [Output('datatable-enrollment-div', 'children'),
      Output('datatable-rooms-div', 'children'),
      Output('load-finalsexport-button', 'disabled'),
-     Output('load-enrollmentreport-button', 'n_clicks')],
+     Output('propose-finals-button', 'disabled'),
+     Output('load-enrollmentreport-button', 'n_clicks'),
+     Output('enrollment-report-date', 'data')],
     [Input('upload-enrollment', 'contents'),
      State('upload-enrollment', 'filename'),
      State('load-enrollmentreport-button', 'n_clicks')]
@@ -1777,7 +1738,8 @@ def load_enrollment_data(contents, name, n_clicks):
     if DEBUG:
         print('function: load_enrollment')
     if contents is not None and n_clicks > 0:
-        df_enrollment = parse_enrollment(contents, name)
+        df_enrollment, data_date = parse_enrollment(contents, name)
+        report_date = data_date.strftime('%Y-%m-%d')
 
         rooms = df_enrollment[(df_enrollment['S']=='A') & (df_enrollment['Time']!='TBA') & (df_enrollment['Campus']=='M')]['Loc'].unique()
         capacities = []
@@ -1870,20 +1832,26 @@ def load_enrollment_data(contents, name, n_clicks):
     else:
         enrollment_children = []
         rooms_children = []
-    return enrollment_children, rooms_children, False, 0
+        report_date = None
+    return enrollment_children, rooms_children, False, False, 0, report_date
 
 @app.callback(
     [Output('datatable-finals-div', 'children'),
      Output('load-finalsexport-button', 'n_clicks')],
     [Input('upload-finals', 'contents'),
+     Input('propose-finals-button', 'n_clicks'),
      State('upload-finals', 'filename'),
      State('load-finalsexport-button', 'n_clicks'),
-     State('datatable-enrollment', 'data')]
+     State('datatable-enrollment', 'data'),
+     State('datatable-rooms', 'data'),
+     State('enrollment-report-date', 'data')]
 )
-def load_finals_data(contents, filename, n_clicks, data_enrollment):
+def load_finals_data(contents, n_propose, filename, n_clicks, data_enrollment, data_rooms, report_date):
     if DEBUG:
         print('function: load_finals')
-    if contents is not None and n_clicks > 0:
+    ctx = callback_context
+    proposed = ctx.triggered and ctx.triggered[0]['prop_id'] == 'propose-finals-button.n_clicks'
+    if (contents is not None and n_clicks > 0) or (proposed and n_propose > 0):
 
         # retrieve enrollment table
         df_enrollment = DataFrame(data_enrollment)
@@ -1891,7 +1859,29 @@ def load_finals_data(contents, filename, n_clicks, data_enrollment):
         # obtain list of CRNs from enrollment report
         CRNs = df_enrollment['CRN'].unique()
 
-        if 'csv' in filename:
+        message_children = []
+        if proposed:
+            dates = finals_week(df_enrollment, datetime.strptime(report_date, '%Y-%m-%d'))
+            df_finals, unresolved = propose_finals(df_enrollment, DataFrame(data_rooms), df_grid, dates)
+            if DEBUG:
+                print("finals in conflict: {}".format(unresolved))
+
+            # the proposal goes through the same checks as an uploaded export
+            df_checked, _, _ = check_finals(df_enrollment, df_finals, DataFrame(data_rooms))
+            flagged = df_checked[df_checked['ErrorMask'] != 0]
+            if len(flagged):
+                message_children = [
+                    html.Div([
+                        html.P("{:d} of {:d} classes need attention in the proposed finals "
+                               "(error codes as in the Combined table):".format(len(flagged), len(df_checked))),
+                        html.Ul([
+                            html.Li("{} {}{}-{}: {}".format(
+                                row.CRN, row.Subject, row.Number, row.Section, row.Error))
+                            for row in flagged.itertuples()
+                        ]),
+                    ]),
+                ]
+        elif 'csv' in filename:
             df_finals = parse_finals_csv(contents, CRNs)
         elif 'xlsx' in filename:
             df_finals = parse_finals_xlsx(contents, CRNs)
@@ -1904,7 +1894,7 @@ def load_finals_data(contents, filename, n_clicks, data_enrollment):
             # print(e)
             # return html.Div(['There was an error processing this file.'])
 
-        data_children = [
+        data_children = message_children + [
             dash_table.DataTable(
                 id='datatable-finals',
                 columns=[{'name': n, 'id': i} for n,i in zip([
@@ -1952,12 +1942,13 @@ def load_finals_data(contents, filename, n_clicks, data_enrollment):
 @app.callback(
     Output('update-button', 'disabled'),
     [Input('upload-enrollment', 'contents'),
-     Input('upload-finals', 'contents')]
+     Input('upload-finals', 'contents'),
+     Input('propose-finals-button', 'n_clicks')]
 )
-def enable_update_button(enrollment_contents, finals_contents):
+def enable_update_button(enrollment_contents, finals_contents, n_propose):
     if DEBUG:
         print('function: enable_update_button')
-    if enrollment_contents is not None and finals_contents is not None:
+    if enrollment_contents is not None and (finals_contents is not None or n_propose > 0):
         return False
     return True
 
@@ -2077,7 +2068,8 @@ def export_all(n_clicks, data):
 
 @app.callback(
     [Output('datatable-combined-div', 'children'),
-     Output('weekdays-tabs-content', 'children'),],
+     Output('weekdays-tabs-content', 'children'),
+     Output('finals-state', 'data'),],
     [Input('update-button', 'n_clicks'),
      State('weekdays-tabs', 'value'),
      State('datatable-enrollment', 'data'),
@@ -2086,171 +2078,14 @@ def export_all(n_clicks, data):
 )
 def create_combined_table(n_clicks, tab, data_enrollment, data_finals, data_rooms):
 
-    # retrieve enrollment table
-    df_enrollment = DataFrame(data_enrollment)
-
-    # retrieve finals table
-    df_finals = DataFrame(data_finals)
-
-    # recalculate the day of the final based on the date of the final
-    for row in df_finals.index.tolist():
-        Date = df_finals.loc[row, 'Date']
-        # find the day of week and code it to MTWRFSU
-        day_str = datetime.strptime(Date, '%m/%d/%Y').strftime('%A')
-        if day_str == "Monday":
-            Days = "M"
-        elif day_str == "Tuesday":
-            Days = "T"
-        elif day_str == "Wednesday":
-            Days = "W"
-        elif day_str == "Thursday":
-            Days = "R"
-        elif day_str == "Friday":
-            Days = "F"
-        elif day_str == "Saturday":
-            Days = "S"
-        else:
-            Days = "U"
-        df_finals.loc[row, 'Days'] = Days
-
-    # retrieve rooms table
+    # retrieve the enrollment, finals and rooms tables and check every final
     df_rooms = DataFrame(data_rooms)
+    df_enrollment, mask, timings = check_finals(DataFrame(data_enrollment), DataFrame(data_finals), df_rooms)
+    if DEBUG:
+        for code, seconds in timings.items():
+            print("rule {:s}: {:.4f}s".format(code, seconds))
 
-    # create dictionary of capacities
-    room_capacities = {
-        df_rooms.loc[row, 'Room']: int(df_rooms.loc[row, 'Cap']) for row in df_rooms.index.tolist()
-    }
-
-    # remove all canceled classes
-    df_enrollment.drop(df_enrollment[df_enrollment.S == "C"].index, inplace=True)
-
-    # remove any times that have TBA
-    df_enrollment.drop(df_enrollment[df_enrollment.Time == "TBA"].index, inplace=True)
-
-    # remove any classes not on the main campus
-    df_enrollment.drop(df_enrollment[df_enrollment.Campus != "M"].index, inplace=True)
-
-    # remove labs
-    df_enrollment.drop(df_enrollment[df_enrollment.Number == "1082"].index, inplace=True)
-    df_enrollment.drop(df_enrollment[df_enrollment.Number == "1101"].index, inplace=True)
-    df_enrollment.drop(df_enrollment[df_enrollment.Number == "1116"].index, inplace=True)
-    df_enrollment.drop(df_enrollment[df_enrollment.Number == "1312"].index, inplace=True)
-
-    # remove extraneous columns
-    df_enrollment = df_enrollment.drop(columns=['Begin/End', 'S'])
-
-    # reset the index
-    df_enrollment = df_enrollment.reset_index(drop=True)
-
-    # create columns for final information
-    df_enrollment['Final_Day'] = ''
-    df_enrollment['Final_Time'] = ''
-    df_enrollment['Final_Loc'] = ''
-    df_enrollment['Final_Time'] = ''
-    df_enrollment['Final_Date'] = ''
-    df_enrollment['Error'] = ['' for _ in range(len(df_enrollment))]
-
-    # check to see if every course has a final
-    _indexFilter = no_final(df_enrollment, df_finals)
-    if _indexFilter:
-        df_enrollment.loc[_indexFilter, 'Error'] += '0'
-
-    # check to see if there are multiple finals for a given CRN
-    _indexFilter = multiple_finals(df_enrollment[~df_enrollment['Error'].str.contains('0')], df_finals)
-    if _indexFilter:
-        df_enrollment.loc[_indexFilter, 'Error'] += '1'
-
-    # fill in finals data
-    _indexFilter = df_enrollment[~df_enrollment['Error'].str.contains('0|1')].index.tolist()
-    for row in _indexFilter:
-        CRN = df_enrollment.loc[row, 'CRN']
-
-        day = df_finals[df_finals['CRN'] == CRN]['Days'].iloc[0]
-        date = df_finals[df_finals['CRN'] == CRN]['Date'].iloc[0]
-        time = df_finals[df_finals['CRN'] == CRN]['Time'].iloc[0]
-        room = df_finals[df_finals['CRN'] == CRN]['Loc'].iloc[0]
-
-        df_enrollment.loc[row, 'Final_Day'] = day
-        df_enrollment.loc[row, 'Final_Date'] = date
-        df_enrollment.loc[row, 'Final_Time'] = time
-        df_enrollment.loc[row, 'Final_Loc'] = room
-
-
-    # filter out non-existent or multiple finals
-    df = df_enrollment[~df_enrollment['Error'].str.contains('0|1')]
-
-    # check to see if final is on one of the class days
-    _indexFilter = correct_final_day(df, df_finals)
-    if _indexFilter:
-        df_enrollment.loc[_indexFilter, 'Error'] += '2'
-
-    # check for instructor overlap of full time block
-    _indexFilter = instructor_overlap(df)
-    if _indexFilter:
-        df_enrollment.loc[_indexFilter, 'Error'] += '3'
-
-    # check for instructor overlap of nonconformal time block
-    _indexFilter = instructor_nonconformal_overlap(df)
-    if _indexFilter:
-        df_enrollment.loc[_indexFilter, 'Error'] += '4'
-
-    # check for instructor back-to-back
-    _indexFilter = instructor_back_to_back(df)
-    if _indexFilter:
-        df_enrollment.loc[_indexFilter, 'Error'] += '5'
-
-    # check for room overlap
-    _indexFilter = room_overlap(df)
-    if _indexFilter:
-        df_enrollment.loc[_indexFilter, 'Error'] += '6'
-
-    # check for room overlap of nonconformal time block
-    _indexFilter = room_nonconformal_overlap(df)
-    if _indexFilter:
-        df_enrollment.loc[_indexFilter, 'Error'] += '7'
-
-    # check for room back-to-back
-    _indexFilter = room_back_to_back(df)
-    if _indexFilter:
-        df_enrollment.loc[_indexFilter, 'Error'] += '8'
-
-    # check that start time is within one hour of regular class start time
-    _indexFilter = within_one_hour(df)
-    if _indexFilter:
-        df_enrollment.loc[_indexFilter, 'Error'] += '9'
-
-    # check to see if final room is in room table
-    _indexFilter = room_exist(df, df_finals, df_rooms)
-    if _indexFilter:
-        df_enrollment.loc[_indexFilter, 'Error'] += 'A'
-
-    # check final room capacity
-    _indexFilter = final_room_capacity(df_enrollment[~df_enrollment['Error'].str.contains('0|1|A')], room_capacities)
-    if _indexFilter:
-        df_enrollment.loc[_indexFilter, 'Error'] += 'B'
-
-    # check if day and time correspond to Finals Grid
-    _indexFilter = accord_with_finals_grid(df, df_finals, df_grid)
-    if _indexFilter:
-        df_enrollment.loc[_indexFilter, 'Error'] += 'C'
-
-
-    # need to check if the only error code is 6 but there may be enough capacity
-    # in the room so remove the error
-    _indexFilter = df_enrollment[df_enrollment['Error'] == '6'].index.tolist()
-    df_tmp = df_enrollment[df_enrollment['Error'] == '6']
-    rms = df_enrollment[df_enrollment['Error'] == '6']['Final_Loc'].unique()
-    # rms = df_tmp['Final_Loc'].unique()
-    for r in rms:
-        cap_enrl = df_tmp[df_tmp['Final_Loc'] == r]['Enrolled'].sum()
-        cap_rm = int(df_rooms[df_rooms['Room'] == r]['Cap'].iloc[0])
-        if cap_enrl <= cap_rm:
-            for row in _indexFilter:
-                df_enrollment.loc[row, 'Error'] = ''
-
-
-    df = df_enrollment[['Subject', 'Number', 'CRN', 'Section', 'Title', 'Instructor',
-                       'Final_Day', 'Final_Time', 'Final_Loc', 'Final_Date', 'Error']]
+    df = df_enrollment[COMBINED_COLUMNS]
 
     data_children = [
         dash_table.DataTable(
@@ -2301,19 +2136,7 @@ def create_combined_table(n_clicks, tab, data_enrollment, data_finals, data_room
         html.P(),
         html.Label('The error codes are'),
         html.Ul([
-            html.Li('0 : No final for this CRN'),
-            html.Li('1 : Multiple finals for this CRN'),
-            html.Li('2 : Day of final incorrect'),
-            html.Li('3 : Overlap of time block for instructor'),
-            html.Li('4 : Overlap between time blocks for instructor'),
-            html.Li('5 : Instructor back-to-back within 15 minutes'),
-            html.Li('6 : Overlap of time block in same room'),
-            html.Li('7 : Overlap between time blocks in same room'),
-            html.Li('8 : Back-to-back in same room'),
-            html.Li('9 : Final start time not within one hour of regular start time'),
-            html.Li('A : Room does not exist in Rooms Table'),
-            html.Li('B : Room capacity may be too low (check in Banner)'),
-            html.Li('C : Final day/time does not agree with Finals Grid'),
+            html.Li('{:s} : {:s}'.format(rule.code, rule.description)) for rule in FINALS_RULES.rules
         ],
             style={'listStyleType': 'none', 'lineHeight': 1.25},
         ),
@@ -2322,8 +2145,71 @@ def create_combined_table(n_clicks, tab, data_enrollment, data_finals, data_room
     figs = update_grid(df.to_dict())
     tabs_children = [ generate_tab_fig(day, tab, fig) for day, fig in zip(days, figs)]
 
+    # keep what was checked so that edits to the finals and rooms only check
+    # the rows they affect
+    state = {
+        'combined': df_enrollment.to_dict('records'),
+        'mask': mask.tolist(),
+        'rooms': data_rooms,
+    }
+
+    return data_children, tabs_children, state
 
-    return data_children, tabs_children
+@app.callback(
+    [Output('datatable-combined', 'data'),
+     Output('finals-state', 'data', allow_duplicate=True)] +
+    [Output('schedule_' + day.lower()[:3], 'figure') for day in days],
+    [Input('datatable-finals', 'data'),
+     Input('datatable-rooms', 'data'),
+     State('finals-state', 'data')],
+    prevent_initial_call=True,
+)
+def revalidate_finals(data_finals, data_rooms, state):
+    if DEBUG:
+        print('function: revalidate_finals')
+    if state is None or data_finals is None or data_rooms is None:
+        raise PreventUpdate
+
+    # combined table of the last check and the same table with the finals now
+    previous = DataFrame(state['combined'])
+    df_finals = final_days(DataFrame(data_finals))
+    df_rooms = DataFrame(data_rooms)
+    df_enrollment = attach_finals(previous.drop(columns=['ErrorMask', 'Error']), df_finals, df_rooms)
+
+    # classes in rooms whose capacity changed need checking although their
+    # final did not change
+    old_capacities, new_capacities = room_capacities(DataFrame(state['rooms'])).align(room_capacities(df_rooms))
+    same = (old_capacities == new_capacities) | (old_capacities.isna() & new_capacities.isna())
+    changed = df_enrollment['Final_Loc'].isin(same.index[~same]).to_numpy()
+
+    # check again the classes changed and the instructor and room days they
+    # left or joined
+    mask, checked = FINALS_RULES.rerun(df_enrollment, previous, state['mask'], changed,
+                                       rooms=df_rooms, finals=df_finals, grid=FINALS_GRID)
+    if DEBUG:
+        print("rows checked again: {:d}".format(checked.sum()))
+
+    df_enrollment['ErrorMask'] = room_overlap_override(df_enrollment, mask, df_rooms)
+    df_enrollment['Error'] = FINALS_RULES.describe(df_enrollment['ErrorMask'])
+
+    # patch the rows of the combined table that changed
+    table = Patch()
+    stored = Patch()
+    records = df_enrollment.to_dict('records')
+    for row in np.flatnonzero(changed_rows(df_enrollment, previous)):
+        table[row] = {column: records[row][column] for column in COMBINED_COLUMNS}
+        stored['combined'][row] = records[row]
+    for row in np.flatnonzero(checked):
+        stored['mask'][row] = int(mask[row])
+    stored['rooms'] = data_rooms
+
+    # redraw the week view of the days classes moved from or to
+    moved = changed_rows(df_enrollment[['Final_Day', 'Final_Time', 'Final_Loc']], previous)
+    touched = set(previous['Final_Day'][moved]) | set(df_enrollment['Final_Day'][moved])
+    weekdays = ''.join(d for d in 'MTWRFS' if d in touched)
+    figs = dict(zip(weekdays, update_grid(df_enrollment[COMBINED_COLUMNS].to_dict(), weekdays)))
+
+    return [table, stored] + [figs.get(d, dash.no_update) for d in 'MTWRFS']
 
 @app.callback(
     [Output('schedule_mon_div', 'style'),
@@ -0,0 +1,90 @@
+# Finals grid compiled into a dictionary from the meeting pattern of a class
+# to the day and time of its final.
+#
+# A class is keyed by its credit, start time, meetings a week and class days,
+# so finding its final is one dictionary lookup instead of a scan of the grid,
+# and checking a whole table is one lookup per row.
+
+import pandas as pd
+
+GRID_KEYS = ['Credit', 'Class_Start', 'Meetings', 'Class_Days']
+
+
+def compile_grid(grid):
+    """Dictionary from the key of a class to its final in the finals grid.
+
+    Args:
+        grid:
+            finals grid DataFrame with 'Credit', 'Class_Start', 'Meetings',
+            'Class_Days', 'Final_Day' and 'Final_Time' columns as strings; a
+            key listed twice has the final of its first row.
+
+    Returns:
+        Dictionary from (Credit, Class_Start, Meetings, Class_Days) to
+        (Final_Day, Final_Time).
+    """
+    compiled = {}
+    for key, final in zip(zip(*(grid[column] for column in GRID_KEYS)),
+                          zip(grid['Final_Day'], grid['Final_Time'])):
+        compiled.setdefault(key, final)
+    return compiled
+
+
+def grid_key(credit, time, days):
+    """Key of a class in a compiled finals grid.
+
+    Args:
+        credit:
+            credit hours, e.g. 3, 3.0 or '3'.
+        time:
+            class time such as '09:30-10:45'.
+        days:
+            class days such as 'M W'.
+
+    Returns:
+        Tuple of strings (Credit, Class_Start, Meetings, Class_Days), or None
+        when the credit is not a number.
+    """
+    try:
+        credit = str(int(float(credit)))
+    except (TypeError, ValueError):
+        return None
+    return credit, time[:5], str(len(days) - days.count(' ')), days
+
+
+def grid_final(compiled, credit, time, days):
+    """Day and time the finals grid gives the final of a class.
+
+    Args:
+        compiled:
+            dictionary from compile_grid.
+        credit, time, days:
+            as for grid_key.
+
+    Returns:
+        Tuple (Final_Day, Final_Time), or None for a class not in the grid.
+    """
+    return compiled.get(grid_key(credit, time, days))
+
+
+def grid_finals(df, compiled):
+    """Day and time the finals grid gives the final of every class.
+
+    Args:
+        df:
+            DataFrame with 'Credit', 'Time' and 'Days' columns.
+        compiled:
+            dictionary from compile_grid.
+
+    Returns:
+        DataFrame with the index of df and 'Grid_Day' and 'Grid_Time'
+        columns, NaN for classes not in the grid.
+    """
+    credit = pd.to_numeric(df['Credit'], errors='coerce')
+    credit = credit.map(lambda c: str(int(c)), na_action='ignore').fillna('')
+    start = df['Time'].astype(str).str[:5]
+    days = df['Days'].astype(str)
+    meetings = (days.str.len() - days.str.count(' ')).astype(str)
+
+    finals = [compiled.get(key, (None, None)) for key in zip(credit, start, meetings, days)]
+    return pd.DataFrame(finals, index=df.index, columns=['Grid_Day', 'Grid_Time'], dtype=object)
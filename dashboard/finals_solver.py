@@ -0,0 +1,280 @@
+# Proposes a finals schedule: a day, time and room for the final of every
+# section, respecting the checks of the finals dashboard.
+#
+# Sections meeting together (same days, time and room) take one final. The
+# finals are placed most constrained first on their cheapest free slot and
+# room, and the finals left in conflict are then repaired by min-conflicts
+# local search, moving one final at a time to its least conflicting choice.
+
+import random
+import time
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from finals_grid import compile_grid, grid_final
+from room_capacity import room_capacities
+from time_slots import time_slot
+
+# sections without a final of their own
+LABS = ['1082', '1101', '1116', '1312']
+
+# algebra courses may hold a common final on Saturday, between these hours
+SATURDAY_FINALS = ['1109', '1110', '1111']
+SATURDAY_HOURS = (8, 16)
+
+# minutes of a final when the finals grid has none for the class
+FINAL_LENGTH = 120
+
+Block = namedtuple('Block', ['rows', 'instructors', 'time', 'demand', 'candidates'])
+Candidate = namedtuple('Candidate', ['day', 'start', 'end', 'room', 'cost'])
+
+
+def exam_sections(df):
+    """Sections needing a final: active, timed, main campus classes other than labs.
+
+    Args:
+        df:
+            enrollment DataFrame.
+
+    Returns:
+        The rows of df needing a final.
+    """
+    return df[(df['S'] != 'C') & (df['Time'] != 'TBA') & (df['Campus'] == 'M') & ~df['Number'].isin(LABS)]
+
+
+def finals_week(df, report_date):
+    """Dates of the finals week, the last week of the most common part of term.
+
+    The 'Begin/End' column has no year, so the end of term is taken as the
+    first day with its month and day on or after the date of the report.
+
+    Args:
+        df:
+            enrollment DataFrame with a 'Begin/End' column such as '08/19-12/14'.
+        report_date:
+            datetime the enrollment report was run, from its header.
+
+    Returns:
+        Dictionary from the days M, T, W, R, F and S to their dates as mm/dd/YYYY.
+    """
+    month, day = (int(n) for n in df['Begin/End'].mode().iloc[0].split('-')[-1].split('/'))
+    end = datetime(report_date.year, month, day)
+    if end.date() < report_date.date():
+        end = datetime(report_date.year + 1, month, day)
+    monday = end - timedelta(days=end.weekday())
+    return {day: (monday + timedelta(days=n)).strftime('%m/%d/%Y') for n, day in enumerate('MTWRFS')}
+
+
+def _minutes(hhmm):
+    return 60 * int(hhmm[:2]) + int(hhmm[3:5])
+
+
+def _display(start, end):
+    return '{:02d}:{:02d}-{:02d}:{:02d}'.format(start // 60, start % 60, end // 60, end % 60)
+
+
+def _candidates(section, grid, starts, capacities, demand, own_room, saturday):
+    """Every day, time and room a final may take, cheapest first."""
+    slot = time_slot(section['Time'])
+    days = section['Days'].replace(' ', '')
+
+    # the finals grid gives the expected day and time of the class, as long
+    # as it is on a class day within an hour of the class
+    times = {}
+    final = grid_final(grid, section['Credit'], section['Time'], section['Days'])
+    if final is not None:
+        day, final_time = final
+        start = _minutes(final_time[:5])
+        if day in days and abs(start - slot.start) <= 60:
+            times[(day, start, _minutes(final_time[-5:]))] = 0
+
+    # otherwise any class day, starting within an hour of the class
+    for day in days:
+        for start in [slot.start] + [s for s in starts if abs(s - slot.start) <= 60]:
+            times.setdefault((day, start, start + FINAL_LENGTH), 1 + abs(start - slot.start) / 60)
+    if saturday:
+        for start in starts:
+            if 60 * SATURDAY_HOURS[0] <= start <= 60 * SATURDAY_HOURS[1]:
+                times.setdefault(('S', start, start + FINAL_LENGTH), 2)
+
+    # the class's own room, then the rooms closest to the seats needed
+    rooms = {room: 0.5 + (cap - demand) / capacities.max() for room, cap in capacities.items() if cap >= demand}
+    if own_room in rooms:
+        rooms[own_room] = 0
+    if not rooms:
+        # nowhere fits; the largest room keeps the conflict to capacity, and
+        # without a Rooms table the class keeps its own room
+        rooms = {capacities.idxmax() if len(capacities) else own_room: 10}
+
+    return sorted((Candidate(day, start, end, room, cost + room_cost)
+                   for (day, start, end), cost in times.items()
+                   for room, room_cost in rooms.items()), key=lambda c: c.cost)
+
+
+class _Schedule:
+    """Placements of the finals indexed by instructor and day and by room and day."""
+
+    def __init__(self, blocks, buffer, room_buffer):
+        self.blocks = blocks
+        self.buffer = buffer
+        self.room_buffer = room_buffer
+        self.placed = [None] * len(blocks)
+        self.instructors = defaultdict(set)
+        self.rooms = defaultdict(set)
+
+    def place(self, b, candidate):
+        self.placed[b] = candidate
+        for instructor in self.blocks[b].instructors:
+            self.instructors[(instructor, candidate.day)].add(b)
+        self.rooms[(candidate.room, candidate.day)].add(b)
+
+    def remove(self, b):
+        candidate = self.placed[b]
+        for instructor in self.blocks[b].instructors:
+            self.instructors[(instructor, candidate.day)].discard(b)
+        self.rooms[(candidate.room, candidate.day)].discard(b)
+        self.placed[b] = None
+
+    def conflicts(self, b, candidate):
+        """Finals placed in conflict with final b placed at candidate."""
+        found = set()
+        for instructor in self.blocks[b].instructors:
+            for other in self.instructors[(instructor, candidate.day)]:
+                c = self.placed[other]
+                if other == b or (c.start == candidate.start and c.end == candidate.end and c.room == candidate.room):
+                    continue
+                if c.start < candidate.end + self.buffer and candidate.start < c.end + self.buffer:
+                    found.add(other)
+        for other in self.rooms[(candidate.room, candidate.day)]:
+            c = self.placed[other]
+            if other == b:
+                continue
+            # classes meeting at the same time take their finals in a room
+            # on a day at the same time, so only one of them can be there
+            if self.blocks[other].time == self.blocks[b].time or \
+                    (c.start < candidate.end + self.room_buffer and candidate.start < c.end + self.room_buffer):
+                found.add(other)
+        return found
+
+    def conflicted(self):
+        return [b for b, candidate in enumerate(self.placed)
+                if candidate is not None and self.conflicts(b, candidate)]
+
+
+def propose_finals(df, rooms, grid, dates, buffer=15, room_buffer=15, seconds=5, seed=0):
+    """Assign a day, time and room to the final of every section.
+
+    A final is on one of the class days (Saturday for algebra, unless it
+    meets together with other classes), starts within an hour of the class,
+    fits in its room and keeps buffer minutes from the other finals of its
+    instructors and room_buffer minutes from the other finals in its room. Among those choices the slot of the finals grid and
+    the class's own room are preferred. Sections meeting only on days
+    without a date, e.g. Sunday, get no final and are reported as unresolved.
+
+    Args:
+        df:
+            enrollment DataFrame.
+        rooms:
+            DataFrame with 'Room' and 'Cap' columns of the rooms to use.
+        grid:
+            finals grid DataFrame with 'Credit', 'Meetings', 'Class_Days',
+            'Class_Start', 'Final_Day' and 'Final_Time' columns.
+        dates:
+            dictionary from day letter to mm/dd/YYYY date, such as
+            finals_week returns.
+        buffer:
+            minutes between two finals of an instructor.
+        room_buffer:
+            minutes between two finals in a room.
+        seconds:
+            time limit of the local search.
+        seed:
+            seed of the random choices of the local search.
+
+    Returns:
+        Tuple of the finals, a DataFrame with the columns of a finals export
+        (CRN, Class, Days, Time, Loc, Date), and the list of CRNs whose final
+        is still in conflict or that has no final.
+    """
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    # an emptied Rooms table has no columns at all
+    capacities = room_capacities(rooms.reindex(columns=['Room', 'Cap'])).dropna()
+    starts = sorted({_minutes(t[:5]) for t in grid['Final_Time']})
+    compiled = compile_grid(grid)
+
+    # sections meeting together take one final
+    sections = exam_sections(df)
+    blocks = []
+    unresolved = []
+    for (days, times, room), group in sections.groupby(['Days', 'Time', 'Loc'], sort=False):
+        demand = pd.to_numeric(group['Enrolled'], errors='coerce').fillna(0).sum()
+        # Saturday only when every section meeting together may take it
+        saturday = group['Number'].isin(SATURDAY_FINALS).all()
+        candidates = [c for c in _candidates(group.iloc[0], compiled, starts, capacities, demand, room, saturday)
+                      if c.day in dates]
+        if not candidates:
+            unresolved.extend(group['CRN'])
+            continue
+        blocks.append(Block(group.index.tolist(), set(group['Instructor']), times, demand, candidates))
+
+    schedule = _Schedule(blocks, buffer, room_buffer)
+
+    # constructive placement, finals with the fewest choices and most seats first
+    order = sorted(range(len(blocks)), key=lambda b: (len(blocks[b].candidates), -blocks[b].demand))
+    for b in order:
+        best = None
+        for candidate in blocks[b].candidates:
+            n = len(schedule.conflicts(b, candidate))
+            if n == 0:
+                best = candidate
+                break
+            if best is None or n < best[0]:
+                best = (n, candidate)
+        schedule.place(b, best if isinstance(best, Candidate) else best[1])
+
+    # min-conflicts repair of the finals left in conflict
+    while time.perf_counter() - started < seconds:
+        conflicted = schedule.conflicted()
+        if not conflicted:
+            break
+        b = rng.choice(conflicted)
+        schedule.remove(b)
+        scored = [(len(schedule.conflicts(b, c)), c.cost, rng.random(), c) for c in blocks[b].candidates]
+        if rng.random() < 0.1:
+            choice = rng.choice(scored)
+        else:
+            choice = min(scored)
+        schedule.place(b, choice[3])
+
+    # move finals to cheaper choices that stay free of conflicts
+    improved = True
+    while improved and time.perf_counter() - started < 2 * seconds:
+        improved = False
+        for b in range(len(blocks)):
+            current = schedule.placed[b]
+            schedule.remove(b)
+            for candidate in blocks[b].candidates:
+                if candidate.cost >= current.cost:
+                    candidate = current
+                    break
+                if not schedule.conflicts(b, candidate):
+                    improved = True
+                    break
+            schedule.place(b, candidate)
+
+    conflicted = set(schedule.conflicted())
+    records = []
+    for b, block in enumerate(blocks):
+        c = schedule.placed[b]
+        for row in block.rows:
+            section = sections.loc[row]
+            records.append([section['CRN'], section['Subject'] + section['Number'], c.day,
+                            _display(c.start, c.end), c.room, dates[c.day]])
+            if b in conflicted or block.demand > capacities.get(c.room, 0):
+                unresolved.append(section['CRN'])
+
+    finals = pd.DataFrame(records, columns=['CRN', 'Class', 'Days', 'Time', 'Loc', 'Date'])
+    return finals, unresolved
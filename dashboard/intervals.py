@@ -0,0 +1,120 @@
+# Sweep line over time intervals grouped by key columns, e.g. the finals of
+# every (instructor, day) or the meetings of every (room, day).
+#
+# Times are converted to integer minutes once through time_slots and every
+# group is sorted by start, so overlaps and gaps are found in O(n log n) with
+# running maxima and binary searches instead of comparing every pair.
+
+import numpy as np
+import pandas as pd
+
+from time_slots import time_slot_frame
+
+
+def _intervals(df, by, times, identical):
+    # group code, start and end of every interval sorted by group and start,
+    # the sorted interval of every row with a time and the labels of those rows
+    slots = time_slot_frame(df[times])
+    positions = np.flatnonzero((slots['start'].notna() & slots['end'].notna()).to_numpy())
+
+    if isinstance(by, (str, list)):
+        groups = df[by if isinstance(by, list) else [by]].iloc[positions].astype(str)
+        code = pd.factorize(groups.agg('\x1f'.join, axis=1) if len(positions) else [])[0]
+    else:
+        # group codes computed by the caller, e.g. shared between rules
+        code = pd.factorize(np.asarray(by)[positions])[0]
+    start = slots['start'].to_numpy()[positions].astype(np.int64)
+    end = slots['end'].to_numpy()[positions].astype(np.int64)
+
+    if identical:
+        order = np.lexsort((end, start, code))
+        slot = np.empty(len(order), dtype=np.int64)
+        slot[order] = np.arange(len(order))
+        code, start, end = code[order], start[order], end[order]
+    else:
+        # rows with the same interval in a group are one time block
+        unique, slot = np.unique(np.stack([code, start, end], axis=1), axis=0, return_inverse=True)
+        code, start, end = unique[:, 0], unique[:, 1], unique[:, 2]
+        slot = slot.reshape(-1)
+
+    return code, start, end, slot, df.index[positions]
+
+
+def overlapping(df, by, times, buffer=0, identical=False):
+    """Rows whose interval overlaps another interval of their group.
+
+    Two intervals overlap when each starts before the other ends plus buffer,
+    so a buffer of 15 also finds intervals less than 15 minutes apart.
+
+    Args:
+        df:
+            DataFrame of the intervals.
+        by:
+            column, or list of columns, of the groups, e.g. ['Instructor', 'Final_Day'],
+            or an array of the group of every row.
+        times:
+            column of 24 hour times, e.g. 'Final_Time'; rows without a time,
+            e.g. TBA, are never flagged.
+        buffer:
+            minutes added to the end of every interval.
+        identical:
+            whether rows with the same interval in a group overlap each
+            other; by default they are one time block.
+
+    Returns:
+        List of the index labels of the flagged rows, in the order of df.
+    """
+    code, start, end, slot, labels = _intervals(df, by, times, identical)
+    if len(code) < 2:
+        return []
+    reach = end + buffer
+    same = code[1:] == code[:-1]
+
+    # the next interval of the group starts within reach
+    flags = np.zeros(len(code), dtype=bool)
+    flags[:-1] = same & (start[1:] < reach[:-1])
+
+    # the furthest reach of the earlier intervals of the group passes the
+    # start; offsetting by the group keeps the running maximum in the group
+    scale = int(reach.max()) + 1
+    furthest = np.maximum.accumulate(code * scale + reach) - code * scale
+    flags[1:] |= same & (furthest[:-1] > start[1:])
+
+    return labels[flags[slot]].tolist()
+
+
+def adjacent(df, by, times, gap=0):
+    """Rows with another interval of their group starting or ending within gap.
+
+    Args:
+        df:
+            DataFrame of the intervals.
+        by:
+            column, or list of columns, of the groups, e.g. ['Final_Loc', 'Final_Day'],
+            or an array of the group of every row.
+        times:
+            column of 24 hour times; rows without a time are never flagged.
+        gap:
+            most minutes between the end of one interval and the start of
+            another; 0 finds intervals back-to-back.
+
+    Returns:
+        List of the index labels of the flagged rows, in the order of df.
+    """
+    code, start, end, slot, labels = _intervals(df, by, times, False)
+    if len(code) < 2:
+        return []
+    scale = int(end.max()) + 1
+
+    # the first start of the group at or after the end
+    starts = code * scale + start
+    after = np.minimum(np.searchsorted(starts, code * scale + end), len(code) - 1)
+    flags = (code[after] == code) & (start[after] >= end) & (start[after] <= end + gap)
+
+    # the last end of the group at or before the start
+    order = np.lexsort((end, code))
+    ends = code[order] * scale + end[order]
+    before = np.maximum(np.searchsorted(ends, code * scale + start, side='right') - 1, 0)
+    flags |= (code[order][before] == code) & (end[order][before] <= start) & (end[order][before] >= start - gap)
+
+    return labels[flags[slot]].tolist()
@@ -0,0 +1,214 @@
+# On-disk cache of parsed uploads shared by all dashboard apps.
+#
+# Entries are keyed by a hash of the decoded upload bytes together with the
+# parser that produced them, its source and the source of the shared parsing
+# modules, so every app parsing an upload with the same function finds the
+# same entry. Entries are stored as compressed pickles and evicted least recently used first once the
+# directory grows past its size limit. Pickles run code when loaded, so the
+# cache lives in a directory only its user can write to and entries of any
+# other owner are ignored.
+
+import hashlib
+import inspect
+import os
+import pickle
+import stat
+import sys
+import tempfile
+import zlib
+
+# bump to invalidate every cached entry after the layout of the entries changes
+CACHE_VERSION = 3
+
+# per-user location and size limit; override with environment variables
+CACHE_DIR = os.environ.get(
+    "DASHBOARD_PARSE_CACHE",
+    os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+                 "dashboard_parse_cache"),
+)
+CACHE_MAX_BYTES = int(float(os.environ.get("DASHBOARD_PARSE_CACHE_MB", "256")) * 1024 * 1024)
+
+# modules the parsers of the apps are built on; editing one invalidates
+# every entry
+PARSER_MODULES = ("swrcgsr", "time_slots", "utilities", "utils")
+
+_SUFFIX = ".pkl.z"
+
+_source_hashes = {}
+
+
+def _private(st):
+    # owned by this user and writable by nobody else
+    if not hasattr(os, "getuid"):
+        return True
+    return st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def cache_dir():
+    """Create the cache directory and check that only this user can write to it.
+
+    Returns:
+        The path of the directory.
+
+    Raises:
+        PermissionError: the directory is a symbolic link, belongs to another
+            user or is writable by other users.
+    """
+    os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+    st = os.lstat(CACHE_DIR)
+    if not stat.S_ISDIR(st.st_mode) or not _private(st):
+        raise PermissionError("{:s} is not a directory private to this user".format(CACHE_DIR))
+    return CACHE_DIR
+
+
+def parser_name(parser):
+    """Qualified name of a parser, the same whether or not its app is __main__.
+
+    Args:
+        parser:
+            the parsing function.
+
+    Returns:
+        String module.qualname, the module named after its file.
+    """
+    module = parser.__module__
+    if module == "__main__":
+        filename = getattr(sys.modules["__main__"], "__file__", None)
+        if filename:
+            module = os.path.splitext(os.path.basename(filename))[0]
+    return "{:s}.{:s}".format(module, parser.__qualname__)
+
+
+def source_hash(parser):
+    """Hash of the source of a parser and of the shared parsing modules.
+
+    Args:
+        parser:
+            the parsing function.
+
+    Returns:
+        Hex digest of the parser's own source and of the PARSER_MODULES next
+        to this file, so that editing the parser or the modules it builds on
+        invalidates its entries while editing an app does not.
+    """
+    name = parser_name(parser)
+    if name not in _source_hashes:
+        digest = hashlib.sha256()
+        try:
+            digest.update(inspect.getsource(parser).encode())
+        except (OSError, TypeError):
+            digest.update(name.encode())
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for module in PARSER_MODULES:
+            try:
+                with open(os.path.join(directory, module + ".py"), "rb") as fp:
+                    digest.update(fp.read())
+            except OSError:
+                digest.update(module.encode())
+        _source_hashes[name] = digest.hexdigest()
+    return _source_hashes[name]
+
+
+def cache_key(decoded, parser):
+    """Content address of an upload as parsed by a given parser.
+
+    Args:
+        decoded:
+            the base64-decoded bytes of the uploaded file.
+        parser:
+            the parsing function.
+
+    Returns:
+        Hex digest string.
+    """
+    digest = hashlib.sha256()
+    digest.update("{:d}:{:s}:{:s}:".format(CACHE_VERSION, parser_name(parser), source_hash(parser)).encode())
+    digest.update(decoded)
+    return digest.hexdigest()
+
+
+def cached_parse(decoded, parser, *args):
+    """Return parser(*args), reusing the result of an earlier identical upload.
+
+    Args:
+        decoded:
+            the base64-decoded bytes of the uploaded file; the parse result
+            must depend only on these bytes.
+        parser:
+            the parsing function.
+        *args:
+            arguments for the parser.
+
+    Returns:
+        The parser's return value, a fresh copy on every call.
+    """
+    try:
+        directory = cache_dir()
+    except OSError as e:
+        # no safe place for the cache, so parse every time
+        print("parse cache: {}".format(e))
+        return parser(*args)
+    path = os.path.join(directory, cache_key(decoded, parser) + _SUFFIX)
+
+    try:
+        with open(path, "rb") as fp:
+            if not _private(os.fstat(fp.fileno())):
+                raise PermissionError("{:s} is not private to this user".format(path))
+            result = pickle.loads(zlib.decompress(fp.read()))
+        # mark as recently used
+        os.utime(path)
+        return result
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        # a damaged, outdated or foreign entry is simply parsed again
+        print("parse cache: {}".format(e))
+
+    result = parser(*args)
+
+    try:
+        payload = zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        # write under a temporary name so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(payload)
+        os.replace(tmp_path, path)
+        evict()
+    except (OSError, pickle.PicklingError) as e:
+        print("parse cache: {}".format(e))
+
+    return result
+
+
+def evict(max_bytes=None):
+    """Remove least recently used entries until the cache fits its limit.
+
+    Args:
+        max_bytes:
+            size limit in bytes, CACHE_MAX_BYTES by default.
+
+    Returns:
+        Nothing.
+    """
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    entries = []
+    total = 0
+    with os.scandir(CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(_SUFFIX):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
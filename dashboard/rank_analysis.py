@@ -18,6 +18,8 @@ import dash_daq as daq
 from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 
+from parse_cache import cached_parse
+
 
 
 DEBUG = True
@@ -443,7 +445,7 @@ def parse_contents(contents, filename):#, date):
 
     decoded = base64.b64decode(content_string)
     try:
-        df = tidy_xlsx(io.BytesIO(decoded))
+        df = cached_parse(decoded, tidy_xlsx, io.BytesIO(decoded))
     except Exception as e:
         print(e)
         return html.Div(['There was an error processing this file.'])
@@ -0,0 +1,79 @@
+# Seat demand of every room slot against the capacities of the Rooms table.
+#
+# Demand is summed in one grouped reduction over (room, day, time) and joined
+# with the capacities once, so a check costs one pass over the finals however
+# many rooms and slots there are, including rooms shared with the finals of
+# other departments.
+
+import pandas as pd
+
+SLOT = ['Final_Loc', 'Final_Day', 'Final_Time']
+
+
+def room_capacities(rooms):
+    """Capacity of every room in a Rooms table.
+
+    Args:
+        rooms:
+            DataFrame with 'Room' and 'Cap' columns; a room listed twice has
+            the capacity of its last row.
+
+    Returns:
+        Float Series indexed by room; capacities that are not numbers, e.g.
+        a row being edited, are NaN.
+    """
+    rooms = rooms.drop_duplicates('Room', keep='last')
+    return pd.Series(pd.to_numeric(rooms['Cap'], errors='coerce').to_numpy(dtype=float),
+                     index=rooms['Room'].to_numpy())
+
+
+def room_demand(df, rooms, shared=None, slot=SLOT, seats='Enrolled'):
+    """Seats needed in every room slot and by how much they exceed the room.
+
+    Args:
+        df:
+            DataFrame of the finals, one row per class.
+        rooms:
+            DataFrame with 'Room' and 'Cap' columns.
+        shared:
+            optional DataFrame of finals of other departments with the slot
+            and seats columns; their seats add to the demand of the rooms
+            they share, but their rows are not reported.
+        slot:
+            columns of the room, day and time of a final.
+        seats:
+            column of the seats every final needs.
+
+    Returns:
+        DataFrame indexed by slot with the 'Demand', the room's 'Cap' and the
+        'Overflow', demand minus capacity (NaN for rooms without a capacity),
+        and 'Rows', the index labels of the rows of df in the slot.
+    """
+    demand = df[slot + [seats]]
+    if shared is not None:
+        demand = pd.concat([demand, shared[slot + [seats]]], ignore_index=True)
+    demand = demand.assign(**{seats: pd.to_numeric(demand[seats], errors='coerce').fillna(0)})
+
+    table = demand.groupby(slot, sort=False)[seats].sum().to_frame('Demand')
+    table['Cap'] = table.index.get_level_values(0).map(room_capacities(rooms)).to_numpy(dtype=float)
+    table['Overflow'] = table['Demand'] - table['Cap']
+
+    rows = pd.Series(df.index, index=pd.MultiIndex.from_frame(df[slot])).groupby(level=slot, sort=False).agg(list)
+    table['Rows'] = rows.reindex(table.index)
+    return table
+
+
+def over_capacity(df, rooms, shared=None, slot=SLOT, seats='Enrolled'):
+    """Room slots of df needing more seats than the room has.
+
+    Args:
+        df, rooms, shared, slot, seats:
+            as for room_demand.
+
+    Returns:
+        The rows of room_demand with a positive overflow and rows in df,
+        largest overflow first.
+    """
+    table = room_demand(df, rooms, shared, slot, seats)
+    table = table[(table['Overflow'] > 0) & table['Rows'].notna()]
+    return table.sort_values('Overflow', ascending=False)
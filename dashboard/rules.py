@@ -0,0 +1,174 @@
+# Registry of validation rules producing a bitmask error column.
+#
+# Every rule declares the key columns it groups by and the error codes that
+# exclude a row from it. The registry runs the rules in order of
+# registration, computes every grouping once for all rules sharing it and
+# records the wall time of every rule. After an edit only the rows changed
+# and the rows sharing a group with them need to be checked again.
+
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+Rule = namedtuple('Rule', ['code', 'description', 'keys', 'skip', 'check'])
+
+
+def changed_rows(df, previous):
+    """Rows of df whose values differ from the same row of previous.
+
+    Args:
+        df:
+            DataFrame with the index and rows of previous.
+        previous:
+            earlier version of df; only the columns of both are compared and
+            missing values equal each other.
+
+    Returns:
+        Boolean array in the order of df.
+    """
+    columns = df.columns.intersection(previous.columns)
+    same = (df[columns] == previous[columns]) | (df[columns].isna() & previous[columns].isna())
+    return ~same.all(axis=1).to_numpy()
+
+
+class RuleRegistry:
+    """Ordered set of rules, each setting one bit of the error mask."""
+
+    def __init__(self):
+        self.rules = []
+
+    def rule(self, code, description, keys=(), skip=''):
+        """Register a check as a rule.
+
+        Args:
+            code:
+                one character error code shown for the rows the rule flags.
+            description:
+                what the code means.
+            keys:
+                tuple of the columns the check groups by, e.g.
+                ('Instructor', 'Final_Day'); the check gets the group code of
+                every row, shared with all rules grouping by the same keys.
+            skip:
+                error codes of earlier rules; rows with any of them are left
+                out of the check.
+
+        Returns:
+            Decorator registering a function check(df, groups, **context)
+            that returns the index labels of the rows in error; groups is
+            None for rules without keys.
+        """
+        def register(check):
+            self.rules.append(Rule(code, description, tuple(keys), skip, check))
+            return check
+        return register
+
+    def bits(self, codes):
+        """Mask of the bits of some error codes."""
+        mask = 0
+        for n, rule in enumerate(self.rules):
+            if rule.code in codes:
+                mask |= 1 << n
+        return mask
+
+    def run(self, df, **context):
+        """Run every rule on a DataFrame.
+
+        Args:
+            df:
+                DataFrame to validate.
+            context:
+                keyword arguments passed on to every check.
+
+        Returns:
+            Tuple of the integer error mask of every row, as an array in the
+            order of df, and a dictionary of the seconds taken by every rule
+            by code, with the time spent grouping under 'groups'.
+        """
+        mask = np.zeros(len(df), dtype=np.int64)
+        groups = {}
+        timings = {'groups': 0.0}
+
+        for n, rule in enumerate(self.rules):
+            if rule.keys and rule.keys not in groups:
+                start = time.perf_counter()
+                groups[rule.keys] = df.groupby(list(rule.keys), sort=False, dropna=False).ngroup().to_numpy()
+                timings['groups'] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            scope = (mask & self.bits(rule.skip)) == 0
+            flagged = rule.check(df[scope], groups[rule.keys][scope] if rule.keys else None, **context)
+            mask[df.index.get_indexer(flagged)] |= 1 << n
+            timings[rule.code] = time.perf_counter() - start
+
+        return mask, timings
+
+    def rerun(self, df, previous, mask, changed=None, **context):
+        """Update the error mask of a DataFrame after some of its rows changed.
+
+        Rules without keys are run again on the changed rows and rules with
+        keys on the groups the changed rows left or joined, so the result is
+        the mask run would give on df.
+
+        Args:
+            df:
+                DataFrame to validate, with the index and rows of previous.
+            previous:
+                DataFrame the mask was computed from.
+            mask:
+                error masks of the rows of previous.
+            changed:
+                optional boolean array of rows to check again although their
+                values did not change, e.g. rows of a room whose capacity did.
+            context:
+                keyword arguments passed on to every check.
+
+        Returns:
+            Tuple of the updated error mask and the boolean array of the rows
+            checked again.
+        """
+        changed = changed_rows(df, previous) | (False if changed is None else np.asarray(changed))
+
+        # every group holding a changed row, before or after the change
+        affected = {}
+        for keys in {rule.keys for rule in self.rules if rule.keys}:
+            codes = pd.concat([previous[list(keys)], df[list(keys)]], ignore_index=True) \
+                .groupby(list(keys), sort=False, dropna=False).ngroup().to_numpy()
+            old, new = codes[:len(df)], codes[len(df):]
+            hit = np.union1d(old[changed], new[changed])
+            affected[keys] = np.isin(old, hit) | np.isin(new, hit)
+
+        rows = changed.copy()
+        for members in affected.values():
+            rows |= members
+        positions = np.flatnonzero(rows)
+        if not len(positions):
+            return np.array(mask, dtype=np.int64), rows
+
+        # the groups of a rule are whole among the rows checked again; rows
+        # there only through another rule's groups keep their bit of the rule
+        partial, _ = self.run(df.iloc[positions], **context)
+        mask = np.array(mask, dtype=np.int64)
+        for n, rule in enumerate(self.rules):
+            keep = affected[rule.keys][positions] if rule.keys else np.ones(len(positions), dtype=bool)
+            bit = 1 << n
+            mask[positions[keep]] = (mask[positions[keep]] & ~bit) | (partial[keep] & bit)
+        return mask, rows
+
+    def describe(self, mask):
+        """Error codes of every row, in order of registration.
+
+        Args:
+            mask:
+                array of error masks.
+
+        Returns:
+            Object array of strings, '' for rows without errors.
+        """
+        mask = np.asarray(mask)
+        codes = np.full(len(mask), '', dtype=object)
+        for n, rule in enumerate(self.rules):
+            codes = codes + np.where(mask & (1 << n), rule.code, '')
+        return codes
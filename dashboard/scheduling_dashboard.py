@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from utilities import *
+from parse_cache import cached_parse
 
 # Import required libraries
 import dash
@@ -70,16 +71,16 @@ def parse_contents(contents, filename):#, date):
     df = pd.DataFrame()
     if 'txt' in filename:
         # Assume that the user uploaded a banner fixed width file with .txt extension
-        df, _, _ = tidy_txt(io.StringIO(decoded.decode('utf-8')))
+        df, _, _ = cached_parse(decoded, tidy_txt, io.StringIO(decoded.decode('utf-8')))
     # elif 'csv' in filename:
         # Assume the user uploaded a banner Shift-F1 export quasi-csv file with .csv extension
         # df = tidy_csv(io.StringIO(decoded.decode('utf-8')))
     elif 'xlsx' in filename:
-        df, _, _ = tidy_xlsx(io.BytesIO(decoded))
+        df, _, _ = cached_parse(decoded, tidy_xlsx, io.BytesIO(decoded))
 
     df = df[['Subject', 'Number', 'CRN', 'Section', 'S', 'Campus', 'Title', 'Credit', 'Max', 'Enrolled', 'Days', 'Time', 'Loc', 'Begin/End', 'Instructor', 'Class']].copy()
     df = df[df['S']=='A']
-    df.loc[:,'Time'] = df['Time'].apply(lambda x: convertAMPMtime(x))
+    df.loc[:,'Time'] = convert_times(df['Time'])
 
     # HENC_AI
     df['id'] = df.index
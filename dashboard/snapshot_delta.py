@@ -0,0 +1,144 @@
+# Differences between two SWRCGSR snapshots, keyed by CRN.
+#
+# Works on the section frames returned by utils.parse_enrollment_file: each
+# snapshot is collapsed to one row per CRN and the two are matched with a hash
+# join, so only added, cancelled and changed sections need to be passed on.
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# fields compared between snapshots
+DELTA_FIELDS = ['Enrl', 'WLst', 'Max Enrl', 'Time', 'Loc', 'Instructor']
+
+# fields of a section spread over several rows (one per meeting)
+_MEETING_FIELDS = ['Days', 'Time', 'Loc']
+
+ChangeSet = namedtuple('ChangeSet', ['added', 'cancelled', 'changed'])
+
+
+def section_table(df):
+    """Collapse a section frame to one row per CRN.
+
+    Multi-meeting sections and stretch courses are split over several rows
+    by the parser; their Days, Time and Loc are joined back with " / " and the
+    remaining fields are taken from the first row.
+
+    Args:
+        df:
+            DataFrame from utils.parse_enrollment_file.
+
+    Returns:
+        DataFrame indexed by CRN, in report order.
+    """
+    sections = df.loc[~df['CRN'].duplicated()].set_index('CRN')
+
+    repeated = df['CRN'].duplicated(keep=False)
+    if repeated.any():
+        joined = df.loc[repeated].groupby('CRN', sort=False)[_MEETING_FIELDS].agg(
+            lambda values: ' / '.join(str(value) for value in values))
+        sections.loc[joined.index, _MEETING_FIELDS] = joined
+
+    return sections
+
+
+def hash_join(left, right):
+    """Positions of each left key in right, through a hash table on right.
+
+    Args:
+        left:
+            array-like of keys to look up.
+        right:
+            array-like of unique keys.
+
+    Returns:
+        Integer array of positions into right, -1 where a key is missing.
+    """
+    return pd.Index(right).get_indexer(left)
+
+
+def _differs(old, new):
+    # missing on both sides counts as unchanged
+    old = np.asarray(old, dtype=object)
+    new = np.asarray(new, dtype=object)
+    return (old != new) & ~(pd.isna(old) & pd.isna(new))
+
+
+def diff_snapshots(old, new, fields=DELTA_FIELDS):
+    """Compare two snapshots of the same term.
+
+    Args:
+        old:
+            earlier section frame (or section_table of it).
+        new:
+            later section frame (or section_table of it).
+        fields:
+            fields whose changes are reported.
+
+    Returns:
+        ChangeSet of
+            added: section_table rows of CRNs new to the report;
+            cancelled: CRNs dropped from the report or whose status became C;
+            changed: one row per changed field with CRN, Field, Old and New,
+            including the status S of sections no longer cancelled.
+    """
+    if 'CRN' in old.columns:
+        old = section_table(old)
+    if 'CRN' in new.columns:
+        new = section_table(new)
+
+    position = hash_join(old.index, new.index)
+    matched = position >= 0
+    old_matched = old.loc[matched]
+    new_matched = new.iloc[position[matched]]
+
+    added = new.loc[hash_join(new.index, old.index) < 0]
+
+    cancelled_now = (new_matched['S'].to_numpy() == 'C') & (old_matched['S'].to_numpy() != 'C')
+    cancelled = old.index[~matched].append(old_matched.index[cancelled_now])
+
+    # status flips other than cancellation, e.g. a section reinstated from C
+    # to A, are changes of S so that apply_delta reproduces the status
+    keep = ~cancelled_now
+    changes = []
+    for field in ['S'] + [field for field in fields if field != 'S']:
+        before = old_matched[field].to_numpy()[keep]
+        after = new_matched[field].to_numpy()[keep]
+        differs = _differs(before, after)
+        if differs.any():
+            changes.append(pd.DataFrame({
+                'CRN': old_matched.index[keep][differs],
+                'Field': field,
+                'Old': before[differs],
+                'New': after[differs],
+            }))
+
+    if changes:
+        changed = pd.concat(changes, ignore_index=True)
+    else:
+        changed = pd.DataFrame(columns=['CRN', 'Field', 'Old', 'New'])
+
+    return ChangeSet(added, cancelled, changed)
+
+
+def apply_delta(sections, delta):
+    """Bring a section table up to date with a change set.
+
+    Args:
+        sections:
+            section_table of the snapshot the delta was taken from.
+        delta:
+            ChangeSet returned by diff_snapshots.
+
+    Returns:
+        Updated section table; cancelled sections are dropped.
+    """
+    sections = sections.drop(index=delta.cancelled, errors='ignore')
+
+    for field, changes in delta.changed.groupby('Field', sort=False):
+        column = sections[field].astype(object)
+        column.loc[changes['CRN'].to_numpy()] = changes['New'].to_numpy()
+        sections[field] = column.infer_objects()
+
+    return pd.concat([sections, delta.added])
@@ -0,0 +1,611 @@
+# Shared reader for SWRCGSR enrollment reports from Banner 9.
+#
+# The report is read once into column arrays by read_report; the output
+# adapters below turn that into whatever a caller needs (a section DataFrame,
+# a line-per-row frame, a list of records or an xlsx workbook).
+
+import csv
+import io
+import re
+from collections import namedtuple
+from itertools import zip_longest
+
+import numpy as np
+import pandas as pd
+
+from time_slots import convert_times, time_slot
+
+# This is the both the headers and the associated line pattern of SWRCGSR output in Banner 9
+HEADER_ROW = {
+    "Subject": 5,
+    "Number": 5,
+    "CRN": 6,
+    "Section": 4,
+    "S": 2,
+    "Campus": 4,
+    "T": 2,
+    "Title": 16,
+    "Credit": 7,
+    "Max": 5,
+    "Enrolled": 5,
+    "WCap": 5,
+    "WList": 5,
+    "Days": 8,
+    "Time": 12,
+    "Loc": 8,
+    "Rcap": 5,
+    "Full": 5,
+    "Begin/End": 12,
+    "Instructor": 19,
+}
+
+# Fixed-width layout of an SWRCGSR record using the report's own column
+# names (same widths as HEADER_ROW); the last field runs to the end of the line
+SWRCGSR_LAYOUT = [
+    ('Subj', 0, 5), ('Nmbr', 5, 10), ('CRN', 10, 16), ('Sec', 16, 20),
+    ('S', 20, 22), ('Cam', 22, 26), ('T', 26, 28), ('Title', 28, 44),
+    ('Credit', 44, 51), ('Max', 51, 56), ('Enrl', 56, 61), ('WCap', 61, 66),
+    ('WLst', 66, 71), ('Days', 71, 79), ('Time', 79, 91), ('Loc', 91, 99),
+    ('Rcap', 99, 104), ('%Ful', 104, 109), ('Begin/End', 109, 121), ('Instructor', 121, None),
+]
+SWRCGSR_RECORD_WIDTH = 140
+
+# Columns produced by the section frame adapter, in output order
+ENROLLMENT_COLUMNS = [
+    'Subj', 'Nmbr', 'CRN', 'Sec', 'S', 'Cam', 'T', 'Title', 'Credit',
+    'Max Enrl', 'Enrl', 'WCap', 'WLst', 'Days', 'Time', 'Loc', 'Rcap',
+    '%Ful', 'Begin/End', 'Instructor', 'Course', 'Ratio', 'Calc',
+]
+
+# number of leading report lines kept verbatim for callers that read the
+# header positionally
+PREAMBLE_LINES = 12
+
+_REPORT_IGNORABLE = ["SWRCGSR", "METROPOLITAN STATE", "Class Enrollment", "Term:",
+                     "Subj Nmbr CRN", "---- ---- ----", "Subject Code", "** TOTALS **",
+                     "Cr Hr Prod", "Sections", "------------"]
+
+_REPORT_IGNORABLE_PATTERN = re.compile('|'.join(re.escape(kw) for kw in _REPORT_IGNORABLE))
+
+# code points removed by str.strip()
+_WHITESPACE_CODES = np.array([c for c in range(0x3001) if chr(c).isspace()], dtype=np.uint32)
+
+Report = namedtuple('Report', ['metadata', 'fields', 'is_record'])
+
+
+def convert_to_24hr(time_str):
+    if not time_str:
+        return time_str
+    return time_slot(time_str).display
+
+
+def iter_report_lines(source, csv_export=False):
+    """Yield the text lines of a report without their line endings.
+
+    Args:
+        source:
+            report text as a string, or an open text file / file-like object.
+        csv_export:
+            True when the report was saved from Banner as CSV, where every
+            line is a single (possibly quoted) field followed by a comma.
+
+    Returns:
+        Generator of report lines.
+    """
+    if isinstance(source, str):
+        lines = (line.rstrip('\r') for line in source.split('\n'))
+    else:
+        lines = (line.rstrip('\r\n') for line in source)
+
+    if not csv_export:
+        yield from lines
+        return
+
+    for row in csv.reader(lines):
+        yield row[0] if row else ''
+
+
+def decode_fixed_width(lines, layout=SWRCGSR_LAYOUT):
+    """Decode fixed-width records a whole column at a time.
+
+    The lines are padded to a common stride and laid out in one UTF-32 buffer,
+    viewed as an n x stride array of code points.  Each field is a column slice
+    of that array: surrounding whitespace is shifted out and zeroed in bulk and
+    the slice is reinterpreted as a fixed-width numpy string.
+
+    Args:
+        lines: list of record lines.
+        layout: list of (name, start, end) tuples; end of None runs to the
+            end of the line.
+
+    Returns:
+        Dictionary of field name to stripped numpy string array.
+    """
+    n = len(lines)
+    if n == 0:
+        return {name: np.array([], dtype='U1') for name, _, _ in layout}
+
+    stride = max(SWRCGSR_RECORD_WIDTH, max(len(line) for line in lines))
+    buffer = ''.join(line.ljust(stride) for line in lines).encode('utf-32-le')
+    codes = np.frombuffer(buffer, dtype=np.uint32).reshape(n, stride)
+    blank = np.isin(codes, _WHITESPACE_CODES)
+
+    fields = {}
+    for name, start, end in layout:
+        end = stride if end is None else end
+        width = end - start
+        column = codes[:, start:end]
+        column_blank = blank[:, start:end]
+
+        # shift each value left past its leading whitespace
+        lead = np.logical_and.accumulate(column_blank, axis=1).sum(axis=1)
+        if lead.any():
+            shift = np.minimum(np.arange(width) + lead[:, None], width - 1)
+            column = np.take_along_axis(column, shift, axis=1)
+            column_blank = np.take_along_axis(column_blank, shift, axis=1)
+            column_blank[np.arange(width) >= width - lead[:, None]] = True
+        else:
+            column = column.copy()
+
+        # zero the trailing whitespace, which numpy treats as string padding
+        trail = np.logical_and.accumulate(column_blank[:, ::-1], axis=1)[:, ::-1]
+        column[trail] = 0
+        fields[name] = np.ascontiguousarray(column).view('<U{:d}'.format(width))[:, 0]
+    return fields
+
+
+def read_report(source, csv_export=False):
+    """Read an SWRCGSR report in a single pass.
+
+    Page headers, separators, totals and blank lines are dropped while the
+    report is walked; every remaining line (section records and the wrap lines
+    that follow them) is decoded column-wise.
+
+    Args:
+        source:
+            report text as a string, or an open text file / file-like object.
+        csv_export:
+            True when the report was saved from Banner as CSV.
+
+    Returns:
+        Report tuple of the metadata dictionary (report_date, term, dept and
+        the verbatim preamble lines), the decoded fields of the kept lines and
+        a boolean array marking which of those lines are section records.
+    """
+    metadata = {'preamble': []}
+    kept = []
+
+    for line in iter_report_lines(source, csv_export):
+        if len(metadata['preamble']) < PREAMBLE_LINES:
+            metadata['preamble'].append(line)
+        if "METROPOLITAN STATE UNIVERSITY" in line:
+            date_match = re.search(r'(\d{2}-[A-Z]{3}-\d{4})', line)
+            if date_match:
+                metadata['report_date'] = date_match.group(1)
+        if "Term:" in line and 'term' not in metadata:
+            t_match = re.search(r'Term:\s*(\d+)', line)
+            d_match = re.search(r'Dept:\s*([^\s-]+)', line)
+            if t_match: metadata['term'] = t_match.group(1)
+            if d_match: metadata['dept'] = d_match.group(1)
+
+        stripped = line.strip()
+        if not stripped or stripped.startswith('\x0c') or stripped.isdigit():
+            continue
+        # section records are never page furniture, whatever their title says
+        if not line[10:16].strip().isdigit() and _REPORT_IGNORABLE_PATTERN.search(line):
+            continue
+        kept.append(line)
+
+    fields = decode_fixed_width(kept)
+    return Report(metadata, fields, np.char.isdigit(fields['CRN']))
+
+
+def _merge_wraps(days, time, loc, inst, wraps):
+    for w_days, w_time, w_loc, w_inst in wraps:
+        if w_days or w_time:
+            if w_days: days += f" / {w_days}"
+            if w_time: time += f" / {w_time}"
+            if w_loc: loc += f" / {w_loc}"
+        else:
+            if w_loc:
+                loc = f"{loc}{w_loc}".strip() if loc else w_loc
+            if w_inst:
+                inst = f"{inst}{w_inst}".strip() if inst else w_inst
+    return days, time, loc, inst
+
+
+def _interned(values):
+    # factorize so repeated strings share one object per distinct value
+    codes, uniques = pd.factorize(values)
+    return np.asarray(uniques, dtype=object)[codes]
+
+
+def _record_wraps(report):
+    # map each record (by position among the records) to its wrap lines
+    owner = np.cumsum(report.is_record) - 1
+    wraps = {}
+    for i in np.flatnonzero(~report.is_record & (owner >= 0)):
+        wraps.setdefault(owner[i], []).append(
+            tuple(report.fields[name][i] for name in ['Days', 'Time', 'Loc', 'Instructor']))
+    return wraps
+
+
+def to_dataframe(report, subjects=None):
+    """Section frame adapter: one row per section meeting.
+
+    Wrap lines are folded into their record, stretch courses (MTH 1108/1109)
+    become a lecture and two lab rows and multi-meeting sections one row per
+    meeting.  Only records that carry wrap lines or need splitting fall back
+    to Python; everything else is handled a column at a time.
+
+    Args:
+        report:
+            Report returned by read_report.
+        subjects:
+            optional list of subject codes to keep; records of any other
+            subject are dropped together with their wrap lines.
+
+    Returns:
+        DataFrame with ENROLLMENT_COLUMNS.
+    """
+    records = np.flatnonzero(report.is_record)
+    keep = np.arange(len(records))
+    if subjects is not None:
+        keep = keep[np.isin(report.fields['Subj'][records], subjects)]
+    fields = {name: values[records[keep]] for name, values in report.fields.items()}
+    record_wraps = _record_wraps(report)
+    wraps = {i: record_wraps[k] for i, k in enumerate(keep) if k in record_wraps}
+    n = len(keep)
+
+    for name in ['Days', 'Time', 'Loc', 'Instructor']:
+        fields[name] = fields[name].astype(object)
+    for i, lines in wraps.items():
+        fields['Days'][i], fields['Time'][i], fields['Loc'][i], fields['Instructor'][i] = \
+            _merge_wraps(fields['Days'][i], fields['Time'][i], fields['Loc'][i],
+                         fields['Instructor'][i], lines)
+
+    fields['Time'] = convert_times(fields['Time'])
+
+    subj = fields['Subj']
+    nmbr = fields['Nmbr']
+    course = np.char.add(subj, nmbr)
+
+    # ratio of enrollment to capacity, computed once per distinct pair
+    max_val = np.where(np.char.isdigit(fields['Max']), fields['Max'], '0').astype(np.int64)
+    enrl_val = np.where(np.char.isdigit(fields['Enrl']), fields['Enrl'], '0').astype(np.int64)
+    pairs, inverse = np.unique(np.stack([max_val, enrl_val], axis=1), axis=0, return_inverse=True)
+    ratios = np.array([round(100 * e / m, 2) if m > 0 else 0.0 for m, e in pairs], dtype=np.float64)
+    ratio = ratios[inverse.reshape(-1)] if n else np.array([], dtype=np.float64)
+
+    calc = np.where(~np.char.isdigit(nmbr), 'N',
+                    np.where(np.isin(course, ["MTH1082", "MTH1101", "MTH1116", "MTH1312"]), 'L',
+                             np.where(np.isin(course, ["MTL3850", "MTL3858", "MTL4690"]), 'N', 'Y')))
+
+    columns = {
+        'Subj': subj, 'Nmbr': nmbr, 'CRN': fields['CRN'].astype(np.int64), 'Sec': fields['Sec'],
+        'S': fields['S'], 'Cam': fields['Cam'], 'T': fields['T'], 'Title': fields['Title'],
+        'Credit': pd.to_numeric(fields['Credit'], errors='coerce'),
+        'Max Enrl': pd.to_numeric(fields['Max'], errors='coerce'),
+        'Enrl': pd.to_numeric(fields['Enrl'], errors='coerce'),
+        'WCap': pd.to_numeric(fields['WCap'], errors='coerce'),
+        'WLst': pd.to_numeric(fields['WLst'], errors='coerce'),
+        'Days': fields['Days'], 'Time': fields['Time'], 'Loc': fields['Loc'],
+        'Rcap': pd.to_numeric(fields['Rcap'], errors='coerce'),
+        '%Ful': pd.to_numeric(fields['%Ful'], errors='coerce'),
+        'Begin/End': fields['Begin/End'], 'Instructor': fields['Instructor'],
+        'Course': course, 'Ratio': ratio, 'Calc': calc,
+    }
+
+    # stretch courses become a lecture and two lab rows; multi-meeting
+    # sections become one row per meeting
+    stretch = (subj == 'MTH') & np.isin(nmbr, ['1108', '1109'])
+    counts = np.ones(n, dtype=np.int64)
+    parts = {}
+    for i in np.flatnonzero(stretch | np.array([' / ' in d or ' / ' in t for d, t in
+                                                 zip(fields['Days'], fields['Time'])], dtype=bool)):
+        parts[i] = [columns[name][i].split(' / ') for name in ['Days', 'Time', 'Loc']]
+        counts[i] = 3 if stretch[i] else max(len(p) for p in parts[i])
+
+    rows = np.repeat(np.arange(n), counts)
+    columns = {name: np.asarray(values)[rows] for name, values in columns.items()}
+    offsets = np.cumsum(counts) - counts
+
+    for i, (day_parts, time_parts, loc_parts) in parts.items():
+        r = offsets[i]
+        if stretch[i]:
+            lec = [p[1] if len(p) > 1 else p[0] for p in (day_parts, time_parts, loc_parts)]
+            lab = [p[0] for p in (day_parts, time_parts, loc_parts)]
+            columns['Days'][r:r + 3] = [lec[0], lab[0], lab[0]]
+            columns['Time'][r:r + 3] = [lec[1], lab[1], lab[1]]
+            columns['Loc'][r:r + 3] = [lec[2], lab[2], lab[2]]
+            for name in ['Max Enrl', 'Enrl', 'Credit', 'WCap', 'WLst', 'Rcap', '%Ful']:
+                columns[name][r + 1:r + 3] = 0
+            columns['Credit'][r + 2] = 1
+            columns['Instructor'][r + 2] = ","
+        else:
+            for k in range(counts[i]):
+                columns['Days'][r + k] = day_parts[k] if k < len(day_parts) else ""
+                columns['Time'][r + k] = time_parts[k] if k < len(time_parts) else ""
+                columns['Loc'][r + k] = loc_parts[k] if k < len(loc_parts) else ""
+            columns['Credit'][r + 1:r + counts[i]] = 0
+
+    for name in ['Days', 'Time', 'Loc']:
+        columns[name] = _interned(columns[name])
+
+    return pd.DataFrame(columns, columns=ENROLLMENT_COLUMNS)
+
+
+def to_fwf_frame(report):
+    """Line frame adapter: one row per kept report line, as read_fwf gives it.
+
+    Wrap lines are left as their own rows and blank fields are NaN, so the
+    caller decides how to fold them.
+
+    Args:
+        report:
+            Report returned by read_report.
+
+    Returns:
+        DataFrame of strings with the SWRCGSR_LAYOUT column names.
+    """
+    columns = {}
+    for name, _, _ in SWRCGSR_LAYOUT:
+        values = report.fields[name]
+        column = _interned(values)
+        column[values == ''] = np.nan
+        columns[name] = column
+    return pd.DataFrame(columns, columns=[name for name, _, _ in SWRCGSR_LAYOUT])
+
+
+def to_records(report, convert_time=None, scheduled_only=False):
+    """Record list adapter: one list of stripped fields per section record.
+
+    Wrap lines are dropped.
+
+    Args:
+        report:
+            Report returned by read_report.
+        convert_time:
+            optional function applied to the Time field; each distinct time
+            slot is converted once.
+        scheduled_only:
+            True to skip records without a meeting time.
+
+    Returns:
+        List of lists in HEADER_ROW order.
+    """
+    records = np.flatnonzero(report.is_record)
+    if scheduled_only:
+        records = records[report.fields['Time'][records] != '']
+
+    columns = [report.fields[name][records].tolist() for name, _, _ in SWRCGSR_LAYOUT]
+    if convert_time is not None:
+        converted = {slot: convert_time(slot) for slot in set(columns[14])}
+        columns[14] = [converted[slot] for slot in columns[14]]
+
+    return [list(row) for row in zip(*columns)]
+
+
+def to_xlsx(report, output_name, **kwargs):
+    """Workbook adapter: write the section records to a formatted xlsx file.
+
+    Args:
+        report:
+            Report returned by read_report.
+        output_name:
+            a filename to write out to.
+        **kwargs:
+            passed on to to_records.
+
+    Returns:
+        Nothing.
+    """
+    write_and_format([HEADER_ROW.keys()] + to_records(report, **kwargs), output_name)
+
+
+def write_and_format(input_list, output_name):
+    """Take in a list of lists for output data and write an xlsx file.
+
+    Args:
+        input_list:
+            input data (a list of lists) of output to write.
+        output_name:
+            a filename to write out to.
+
+    Returns:
+        Nothing.
+    """
+
+    import xlsxwriter
+
+    # Initialize the xlsx file
+    workbook = xlsxwriter.Workbook(output_name, {"strings_to_numbers": True})
+    worksheet = workbook.add_worksheet()
+
+    bold = workbook.add_format({"bold": True})
+
+    # Process the data
+    rowCount = 0
+    for row in input_list:
+        if rowCount == 0:
+            colCount = 0
+            for column in row:
+                worksheet.write(rowCount, colCount, column, bold)
+                colCount += 1
+        else:
+            colCount = 0
+            for column in row:
+                # force Excel to see the course and section numbers as text
+                if colCount == 3 or colCount == 1:
+                    column = '="' + column + '"'
+                worksheet.write(rowCount, colCount, column)
+                colCount += 1
+        rowCount += 1
+
+    # Set up for easy scrolling
+    worksheet.freeze_panes(1, 0)
+
+    # Format column widths
+    worksheet.set_column("A:A", 6.5)
+    worksheet.set_column("B:B", 7)
+    worksheet.set_column("C:C", 5.5)
+    worksheet.set_column("D:D", 6.5)
+    worksheet.set_column("E:E", 2)
+    worksheet.set_column("F:F", 6.5)
+    worksheet.set_column("G:G", 2)
+    worksheet.set_column("H:H", 13.2)
+    worksheet.set_column("I:I", 5.5)
+    worksheet.set_column("J:J", 4)
+    worksheet.set_column("K:K", 7)
+    worksheet.set_column("L:L", 5)
+    worksheet.set_column("M:M", 5)
+    worksheet.set_column("N:N", 5.5)
+    worksheet.set_column("O:O", 12)
+    worksheet.set_column("P:P", 7)
+    worksheet.set_column("Q:Q", 4)
+    worksheet.set_column("R:R", 3.5)
+    worksheet.set_column("S:S", 10.5)
+    worksheet.set_column("T:T", 14)
+
+    # Common cell formatting
+    # Light red fill with dark red text
+    format1 = workbook.add_format({"bg_color": "#FFC7CE", "font_color": "#9C0006"})
+    # Light yellow fill with dark yellow text
+    format2 = workbook.add_format({"bg_color": "#FFEB9C", "font_color": "#9C6500"})
+    # Green fill with dark green text.
+    format3 = workbook.add_format({"bg_color": "#C6EFCE", "font_color": "#006100"})
+    # Darker green fill with black text.
+    format4 = workbook.add_format({"bg_color": "#008000", "font_color": "#000000"})
+
+    # Add enrollment evaluation conditions
+
+    # classes that have enrollment above 94% of capacity
+    worksheet.conditional_format(
+        1,  # row 2
+        10,  # column K
+        rowCount - 1,  # last row
+        10,  # column K
+        {"type": "formula", "criteria": "=$K2>0.94*$J2", "format": format4},
+    )
+
+    # classes that have enrollment above 80% of capacity
+    worksheet.conditional_format(
+        1,  # row 2
+        10,  # column K
+        rowCount - 1,  # last row
+        10,  # column K
+        {"type": "formula", "criteria": "=$K2>0.8*$J2", "format": format3},
+    )
+
+    # classes that have enrollment below 10 students
+    worksheet.conditional_format(
+        1,  # row 2
+        10,  # column K
+        rowCount - 1,  # last row
+        10,  # column K
+        {"type": "formula", "criteria": "=$K2<10", "format": format1},
+    )
+
+    # classes that have students on the waitlist
+    worksheet.conditional_format(
+        1,  # row 2
+        12,  # column M
+        rowCount - 1,  # last row
+        12,  # column M
+        {"type": "cell", "criteria": ">", "value": 0, "format": format2},
+    )
+
+    # Close it out
+    workbook.close()
+    return
+
+
+def _xlsx_value(value, formula):
+    # the ="..." formulas that keep course and section numbers as text
+    # evaluate to their text, whatever value was cached for them
+    if isinstance(formula, str) and formula.startswith('="') and formula.endswith('"'):
+        return formula[2:-1]
+    # otherwise follow pandas.read_excel: the cached value, whole numbers as
+    # int, empty cells as NaN
+    if value is None:
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def iter_xlsx_rows(file_contents, aliases=None, text_columns=()):
+    """Stream the first worksheet of an xlsx file row by row.
+
+    The workbook is opened read-only twice, once for the cached values and
+    once for the formulas, and both are read in step, so the sheet is never
+    held in memory as a whole. Cells take their cached value like
+    pandas.read_excel, except ="..." formulas which take their text.
+
+    Args:
+        file_contents:
+            path or binary file-like object of the workbook.
+        aliases:
+            optional dictionary renaming header names to canonical ones.
+        text_columns:
+            canonical column names whose values are kept as text.
+
+    Returns:
+        Generator yielding the normalized header first and then one list of
+        values per non-empty row.
+    """
+    from openpyxl import load_workbook
+
+    aliases = aliases or {}
+    if hasattr(file_contents, 'read'):
+        # each workbook reads the file on its own
+        file_contents = file_contents.read()
+    if isinstance(file_contents, bytes):
+        sources = [io.BytesIO(file_contents), io.BytesIO(file_contents)]
+    else:
+        sources = [file_contents, file_contents]
+
+    wb = load_workbook(sources[0], read_only=True, data_only=True)
+    wb_formulas = load_workbook(sources[1], read_only=True, data_only=False)
+    try:
+        rows = zip_longest(wb.worksheets[0].iter_rows(values_only=True),
+                           wb_formulas.worksheets[0].iter_rows(values_only=True), fillvalue=())
+        header, _ = next(rows, ((), ()))
+        header = [aliases.get(name, name) if name is not None else "Unnamed: {:d}".format(i)
+                  for i, name in enumerate(header)]
+        yield header
+
+        width = len(header)
+        text = [i for i, name in enumerate(header) if name in text_columns]
+        for row, formulas in rows:
+            if all(value is None for value in row) and all(formula is None for formula in formulas):
+                continue
+            values = [_xlsx_value(value, formula)
+                      for value, formula in zip_longest(row[:width], formulas[:width])]
+            values += [np.nan] * (width - len(values))
+            for i in text:
+                if not pd.isna(values[i]):
+                    values[i] = str(values[i])
+            yield values
+    finally:
+        wb.close()
+        wb_formulas.close()
+
+
+def read_xlsx(file_contents, aliases=None, text_columns=()):
+    """Read the first worksheet of an xlsx file into a DataFrame.
+
+    Args:
+        file_contents:
+            path or binary file-like object of the workbook.
+        aliases:
+            optional dictionary renaming header names to canonical ones.
+        text_columns:
+            canonical column names whose values are kept as text.
+
+    Returns:
+        DataFrame with the normalized header as columns.
+    """
+    rows = iter_xlsx_rows(file_contents, aliases, text_columns)
+    header = next(rows)
+    return pd.DataFrame(rows, columns=header)
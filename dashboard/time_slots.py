@@ -0,0 +1,107 @@
+# Interned conversion of SWRCGSR meeting times ("0800-0915AM") to 24 hour
+# time slots ("08:00-09:15") with their start and end in minutes.
+#
+# A term only has a few hundred distinct time strings, so each one is parsed
+# once and whole columns are converted through their factorized codes.
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+TimeSlot = namedtuple('TimeSlot', ['start', 'end', 'display'])
+
+_TWELVE_HOUR = re.compile(r'(\d{2})(\d{2})-(\d{2})(\d{2})(AM|PM)$')
+_TWENTY_FOUR_HOUR = re.compile(r'(\d{2}):(\d{2})-(\d{2}):(\d{2})$')
+
+
+def _parse_slot(value):
+    match = _TWELVE_HOUR.match(value.strip())
+    if match:
+        start_hour, start_min, end_hour, end_min = (int(g) for g in match.groups()[:4])
+        # the meridian belongs to the end time
+        if match.group(5) == "PM":
+            end_hour = end_hour + 12 if end_hour < 12 else end_hour
+            start_hour = start_hour + 12 if start_hour + 12 <= end_hour else start_hour
+        display = "{:02d}:{:02d}-{:02d}:{:02d}".format(start_hour, start_min, end_hour, end_min)
+        return TimeSlot(60 * start_hour + start_min, 60 * end_hour + end_min, display)
+
+    # already converted, so converting twice changes nothing
+    match = _TWENTY_FOUR_HOUR.match(value.strip())
+    if match:
+        start_hour, start_min, end_hour, end_min = (int(g) for g in match.groups())
+        return TimeSlot(60 * start_hour + start_min, 60 * end_hour + end_min, value.strip())
+
+    # TBA and anything else unrecognized is left alone
+    return TimeSlot(None, None, value)
+
+
+@lru_cache(maxsize=None)
+def time_slot(value):
+    """Convert one meeting time to a 24 hour time slot.
+
+    Multi-meeting values joined with " / " are converted part by part; their
+    start and end are those of the first meeting.
+
+    Args:
+        value:
+            meeting time string, in SWRCGSR 12 hour form or already converted.
+
+    Returns:
+        TimeSlot of start and end minutes after midnight (None when the value
+        is not a time, e.g. TBA) and the 24 hour display string.
+    """
+    parts = [_parse_slot(part) for part in value.split(' / ')]
+    if len(parts) == 1:
+        return parts[0]
+    return TimeSlot(parts[0].start, parts[0].end, ' / '.join(part.display for part in parts))
+
+
+def _slot_codes(values):
+    values = np.asarray(values, dtype=object)
+    codes, uniques = pd.factorize(values)
+    slots = [time_slot(value) if isinstance(value, str) else TimeSlot(None, None, value)
+             for value in uniques]
+    return values, codes, slots
+
+
+def convert_times(values):
+    """Convert a whole column of meeting times, each distinct value once.
+
+    Args:
+        values:
+            Series or array of meeting times; missing and non-string values are
+            kept as they are.
+
+    Returns:
+        The 24 hour display strings, as a Series with the same index when
+        given a Series and as an object array otherwise.
+    """
+    original, codes, slots = _slot_codes(values)
+    display = np.array([slot.display for slot in slots] + [None], dtype=object)[codes]
+    display[codes == -1] = original[codes == -1]
+
+    if isinstance(values, pd.Series):
+        return pd.Series(display, index=values.index, name=values.name)
+    return display
+
+
+def time_slot_frame(values):
+    """Start and end minutes and display string for a whole column of times.
+
+    Args:
+        values:
+            Series or array of meeting times.
+
+    Returns:
+        DataFrame with nullable integer 'start' and 'end' columns and a
+        'display' column, indexed like values when it is a Series.
+    """
+    original, codes, slots = _slot_codes(values)
+    start = pd.array([slot.start for slot in slots] + [None], dtype='Int64')[codes]
+    end = pd.array([slot.end for slot in slots] + [None], dtype='Int64')[codes]
+    index = values.index if isinstance(values, pd.Series) else None
+
+    return pd.DataFrame({'start': start, 'end': end, 'display': convert_times(original)}, index=index)
@@ -2,9 +2,11 @@ from os import times
 import numpy as np
 import plotly.graph_objects as go
 import pandas as pd
-import io
 import datetime
 
+from swrcgsr import read_report, read_xlsx, to_fwf_frame
+from time_slots import convert_times, time_slot
+
 def blankFigure():
 # blank figure when no data is present
     return {
@@ -118,25 +120,14 @@ def convertAMPMtime(timeslot):
     if pd.isna(timeslot):
         return
 
-    try:
-        if ("AM" in timeslot) or ("PM" in timeslot):
-            starthour = int(timeslot[0:2])
-            endhour = int(timeslot[5:7])
-            if timeslot[-2:] == "PM":
-                endhour = endhour + 12 if endhour < 12 else endhour
-                starthour = starthour + 12 if starthour + 12 <= endhour else starthour
-            timeslot = "{:s}:{:s}-{:s}:{:s}".format(
-                str(starthour).zfill(2), timeslot[2:4], str(endhour).zfill(2), timeslot[7:9]
-            )
-    except ValueError:  # catch the TBA times
-        pass
-
-    return timeslot
+    return time_slot(timeslot).display
 
 
 def tidy_csv(file_contents):
     """ Converts the CSV format to the TXT format from Banner
 
+    The export is read line by line through the csv module.
+
     Args:
         file_contents:
             input decoded filestream of SWRCGSR output from an uploaded textfile.
@@ -145,86 +136,34 @@ def tidy_csv(file_contents):
         Dataframe.
     """
 
-    _file = file_contents.read()
-    _file = _file.replace("\r","")
-
-    _list = []
-    line = ""
-    for char in _file:
-        if char == '\n':
-            line = line.replace('"','')
-            _list.append(line[:-1])
-            line = ""
-        else:
-            line += char
-
-    # delete information in first line to match txt file type
-    _list = _list[1:]
-    _list.insert(0,'')
+    return tidy_txt(file_contents, csv_export=True)
 
-    return tidy_txt(io.StringIO("\n".join(_list)))
 
-
-def tidy_txt(file_contents):
+def tidy_txt(file_contents, csv_export=False):
     """Take in SWRCGSR output and format into pandas-compatible format.
 
     Args:
         file_contents:
             input decoded filestream of SWRCGSR output from an uploaded textfile.
+        csv_export:
+            True when the upload is a Banner csv export rather than text.
 
     Returns:
         Dataframe.
     """
 
-    _LINE_PATTERN = [
-        (0, 5),
-        (5, 10),
-        (10, 16),
-        (16, 20),
-        (20, 22),
-        (22, 26),
-        (26, 28),
-        (28, 44),
-        (44, 51),
-        (51, 56),
-        (56, 61),
-        (61, 66),
-        (66, 71),
-        (71, 79),
-        (79, 91),
-        (91, 99),
-        (99, 104),
-        (104, 109),
-        (109, 121),
-        (121, 140),
-    ]
+    report = read_report(file_contents, csv_export)
+    preamble = report.metadata['preamble']
 
     # read the data date from the file
-    d = ''
-    for i in range(5):
-        line = file_contents.readline()
-        if i == 4:
-            d = line.split()[-1]
-            break
-
-    data_date = datetime.datetime.strptime(d, "%d-%b-%Y")
+    data_date = datetime.datetime.strptime(preamble[4].split()[-1], "%d-%b-%Y")
 
-    # read into a dataframe based on specified column spacing
-    _df = pd.read_fwf(file_contents, colspecs=_LINE_PATTERN)
-
-    # read the report Term and Year from file
-    dd = _df.iloc[0]
-    term_code = str(dd.iloc[1][3:])+str(dd.iloc[2][:-2])
-    # term_code = str(_df.iloc[0][1])[3:] + str(_df.iloc[0][2])[:-2]
-
-    # rename the columns
-    # make allowances for newer version of pandas
-    if pd.__version__ >= '1.4.1':
-        k = 1
-    else:
-        k = 2
-    _df.columns = _df.iloc[k]
+    # read the report Term and Year from the first line after the report title
+    term_line = [line for line in preamble[5:] if line.strip()][1]
+    term_code = term_line[5:10].strip()[3:] + term_line[10:16].strip()[:-2]
 
+    # one row per report line, page headers already removed
+    _df = to_fwf_frame(report)
 
     # manual filtering of erroneous data which preserves data for MTH 1108/1109
     _df = _df.dropna(how='all')
@@ -235,24 +174,23 @@ def tidy_txt(file_contents):
     _df = _df[~_df["Instructor"].str.contains("Page", na=False)]
 
     _df.reset_index(drop=True, inplace=True)
-    # pick up all rows where the "Begin/End" does not contain data
-    nan_rows_indexes=list(_df.loc[pd.isna(_df["Begin/End"]), :].index.values)
-    # append the "Loc" and "Instructor" to the previous row
+    # append the "Loc" and "Instructor" of rows where the "Begin/End" does not
+    # contain data to the previous row
     mask = []
-    for row in _df.index.to_list():
-        if row in nan_rows_indexes:
-            for column in ["Loc", "Instructor"]:
-                # only do this when the data is not null and is a string
-                if not pd.isnull(_df.iloc[row][column]) and isinstance(_df.iloc[row-1][column],str):
-                    _df.loc[row-1,column] = _df.iloc[row-1][column] + _df.iloc[row][column]
-                    # keep track of those rows and remove them later
-                    mask.append(row)
+    for column in ["Loc", "Instructor"]:
+        values = _df[column].tolist()
+        for row in np.flatnonzero(_df["Begin/End"].isna()):
+            # only do this when the data is not null and is a string
+            if not pd.isnull(values[row]) and isinstance(values[row-1], str):
+                values[row-1] = values[row-1] + values[row]
+                # keep track of those rows and remove them later
+                mask.append(row)
+        _df[column] = values
 
     # remove those rows whose data was appended to the previous row
     _df = _df.drop(mask)
 
     _df = _df.drop(_df.index[_df["Loc"].str.startswith("BA", na=False)].tolist())
-    # _df = _df[_df["Time"].notna()]
     _df = _df[_df["Begin/End"].notna()]
 
     # add columns for Access Table
@@ -272,100 +210,42 @@ def tidy_txt(file_contents):
     _df["Class Start Date"] = _df["Begin/End"].str[0:5] +  "/" + str(term_code[2:4])
     _df["Class End Date"] = _df["Begin/End"].str[-5:] +  "/" + str(term_code[2:4])
 
-    # _df = _df[_df["Instructor"].str.contains(',', na=False)]
     # reset index and remove old index column
     _df = _df.reset_index()
     _df = _df.drop([_df.columns[0]], axis=1)
 
-    # for row in _df.index.to_list():
-        # if pd.isnull(_df.loc[row, 'Subj']):
-            # _df.loc[row, 'Subj'] = _df.loc[row-1, 'Subj']
-        # if pd.isnull(_df.loc[row, 'Nmbr']):
-            # _df.loc[row, 'Nmbr'] = _df.loc[row-1, 'Nmbr']
-        # if pd.isnull(_df.loc[row, 'CRN']):
-            # _df.loc[row, 'CRN'] = _df.loc[row-1, 'CRN']
-        # if pd.isnull(_df.loc[row, 'Sec']):
-            # _df.loc[row, 'Sec'] = _df.loc[row-1, 'Sec']
-        # if pd.isnull(_df.loc[row, 'S']):
-            # _df.loc[row, 'S'] = _df.loc[row-1, 'S']
-        # if pd.isnull(_df.loc[row, 'Cam']):
-            # _df.loc[row, 'Cam'] = _df.loc[row-1, 'Cam']
-        # if pd.isnull(_df.loc[row, 'Title']):
-            # _df.loc[row, 'Title'] = _df.loc[row-1, 'Title']
-        # if pd.isnull(_df.loc[row, 'PTCR']):
-            # _df.loc[row, 'PTCR'] = _df.loc[row-1, 'PTCR']
-        # if pd.isnull(_df.loc[row, 'T']):
-            # _df.loc[row, 'T'] = _df.loc[row-1, 'T']
-        # if pd.isnull(_df.loc[row, 'Credit']):
-            # _df.loc[row, 'Credit'] = _df.loc[row-1, 'Credit']
-        # if pd.isnull(_df.loc[row, 'Max']):
-            # _df.loc[row, 'Max'] = _df.loc[row-1, 'Max']
-        # if pd.isnull(_df.loc[row, 'Enrl']):
-            # _df.loc[row, 'Enrl'] = _df.loc[row-1, 'Enrl']
-        # if pd.isnull(_df.loc[row, 'WCap']):
-            # _df.loc[row, 'WCap'] = _df.loc[row-1, 'WCap']
-        # if pd.isnull(_df.loc[row, 'WLst']):
-            # _df.loc[row, 'WLst'] = _df.loc[row-1, 'WLst']
-
-    # This is a hack to include all rows of days into one for those classes
-    # that have different modes of teaching on different days.  For example,
-    # if MTLM 5610 is MT R, but the M is online and T R are in person.
-
-    # print()
-    # print(_df.to_string())
-
-    # for row in _df.index.to_list():
-        # if pd.isnull(_df.loc[row, 'Subj']) and (_df.loc[row-1, 'Nmbr'] not in ['1108', '1109']):
-            # weekdays = {'M':0, 'T':1, 'W':2, 'R':3, 'F':4, 'S':5}
-            # days = '      '
-            # _days = _df.loc[row, 'Days'] + _df.loc[row-1, 'Days']
-            # for day in weekdays.keys():
-                # if day in _days:
-                    # index = weekdays[day]
-                    # days = days[:index] + day + days[ index + 1:]
-            # _df.loc[row-1, 'Days'] = days.rstrip()
-            # _df.loc[row, 'Subj'] = _df.loc[row-1, 'Subj']
-            # _df.loc[row, 'Nmbr'] = _df.loc[row-1, 'Nmbr']
-
     # only remove the extra rows from above that we no longer need but preserve
     # the extra rows for 1108 and 1109
     _df = _df[(~_df["CRN"].isnull()) | (~_df["Nmbr"].isin(['1108','1109']))]
     _df = _df.reset_index()
     _df = _df.drop([_df.columns[0]], axis=1)
 
-    # print()
-    # print(_df.to_string())
-
     # change PTCR for 1081s, 1311s, 1111s, and 1115s to 0
-    for nmbr in ["1081", "1111", "1115", "1311"]:
-        for row in _df[_df["Subj"].str.contains("MTH") & _df["Nmbr"].str.contains(nmbr) & _df["S"].str.contains("A")].index.tolist():
-            _df.loc[row, "PTCR"] = 0
+    _df.loc[_df["Subj"].str.contains("MTH", na=False)
+            & _df["Nmbr"].str.contains("1081|1111|1115|1311", na=False)
+            & _df["S"].str.contains("A", na=False), "PTCR"] = 0
 
     # change all online final flags to N since they do not need a room
-    for row in _df[_df["Cam"].str.startswith("I", na=False)].index.tolist():
-        _df.loc[row, "Final"] = "N"
+    _df.loc[_df["Cam"].str.startswith("I", na=False), "Final"] = "N"
 
     # correct report to also include missing data for MTH 1108 and MTH 1109
+    lab_rows = [_df]
     for stretch_course in ['1108', '1109']:
-        for row in _df[_df["Subj"].str.contains("MTH") & _df["Nmbr"].str.contains(stretch_course) & _df["S"].str.contains("A")].index.tolist():
+        rows = _df.index[_df["Subj"].str.contains("MTH", na=False) & _df["Nmbr"].str.contains(stretch_course, na=False) & _df["S"].str.contains("A", na=False)]
 
-            # only do this if there are extra rows; if it is a rollover, you will not have extra rows
-            if pd.isna(_df.loc[row+1,"Subj"]):
+        # only do this if there are extra rows; if it is a rollover, you will not have extra rows
+        rows = rows[_df["Subj"].isna().shift(-1, fill_value=False)[rows].to_numpy()]
 
-                # copy all but days, time and location to next row
-                for col in ["Subj", "Nmbr", "CRN", "Sec", "S", "Cam", "T", "Title", "Max", "Enrl", "WCap", "WLst", "Instructor"]:
-                    _df.loc[row + 1, col] = _df.loc[row, col]
+        # copy all but days, time and location to next row
+        columns = ["Subj", "Nmbr", "CRN", "Sec", "S", "Cam", "T", "Title", "Max", "Enrl", "WCap", "WLst", "Instructor"]
+        _df.loc[rows + 1, columns] = _df.loc[rows, columns].to_numpy()
 
-                # define values for Credit and PTCR
-                _df.loc[row + 1, "Credit"] = 0
-                _df.loc[row + 1, "PTCR"] = 0
+        # define values for Credit and PTCR
+        _df.loc[rows + 1, ["Credit", "PTCR"]] = 0
 
-                # copy all values from parent row and make available for lab instructor
-                row_dict = _df.loc[row].to_dict()
-                row_dict["Instructor"] = ","
-                row_dict["Credit"] = 0
-                row_dict["PTCR"] = 1
-                _df = pd.concat([_df, pd.DataFrame(row_dict, index=[0])], ignore_index=True)
+        # copy all values from parent row and make available for lab instructor
+        lab_rows.append(_df.loc[rows].assign(Instructor=",", Credit=0, PTCR=1))
+    _df = pd.concat(lab_rows, ignore_index=True)
 
     # add columns for Access Table
     _df.insert(len(_df.columns), "Class", " ")
@@ -396,9 +276,7 @@ def tidy_txt(file_contents):
 
     # include in calculations
     _df['Calc'] = 'Y'
-    for row in _df.index.to_list():
-        if _df.loc[row, 'S'] == 'C':
-            _df.loc[row, 'Calc'] = 'N'
+    _df.loc[_df['S'] == 'C', 'Calc'] = 'N'
 
     # HENC_AI
     _df['id'] = _df.index
@@ -423,35 +301,22 @@ def tidy_xlsx(file_contents):
     d = "02-FEB-1900"
     data_date = datetime.datetime.strptime(d, "%d-%b-%Y")
 
-    # _df = pd.read_excel(file_contents,
-                        # engine='openpyxl',
-                        # converters={
-                            # 'Subject':str,
-                            # 'Number':str,
-                            # 'CRN':str,
-                            # 'Section':str,
-                            # 'Campus':str,
-                            # 'Title':str,
-                            # 'Days':str,
-                            # 'Time':str,
-                            # 'Loc':str,
-                            # 'Instructor':str,
-                        # })
-
-    # work around to import the Number and Section correctly since they are formulas
-    from openpyxl import load_workbook
-    wb = load_workbook(file_contents)
-    sheet_names = wb.get_sheet_names()
-    name = sheet_names[0]
-    sheet_ranges = wb[name]
-    df_test = pd.DataFrame(sheet_ranges.values)
-    df_test.columns = df_test.iloc[0]
-    df_test = df_test.iloc[1:,:]
-    df_test["Number"] =  df_test["Number"].str.replace('"','')
-    df_test["Number"] =  df_test["Number"].str.replace('=','')
-    df_test["Section"] =  df_test["Section"].str.replace('"','')
-    df_test["Section"] =  df_test["Section"].str.replace('=','')
-    _df = df_test.copy()
+    # stream the first sheet; the Number and Section are unwrapped from their
+    # ="..." formulas and the column names normalized while reading
+    _df = read_xlsx(
+        file_contents,
+        aliases={
+            "Subj": "Subject",
+            "Nmbr": "Number",
+            "Sec": "Section",
+            "Cam": "Campus",
+            "Enrl": "Enrolled",
+            "WLst": "WList",
+            "%Ful": "Full",
+        },
+        text_columns=("Subject", "Number", "CRN", "Section", "Campus", "Title",
+                      "Days", "Time", "Loc", "Instructor"),
+    )
 
     # create missing columns, if necessary
     if not 'S' in _df.columns:
@@ -475,19 +340,6 @@ def tidy_xlsx(file_contents):
     if not 'Credit' in _df.columns:
         _df.insert(len(_df.columns), "Credit", 3)
 
-    _df.rename(
-        columns={
-            "Subj": "Subject",
-            "Nmbr": "Number",
-            "Sec": "Section",
-            "Cam": "Campus",
-            "Enrl": "Enrolled",
-            "WLst": "WList",
-            "%Ful": "Full",
-        },
-        inplace=True,
-    )
-
     _df = _df[["Subject", "Number", "CRN", "Section", "S", "Campus", "T", "Title",
               "Credit", "Max", "Enrolled", "WCap", "WList", "Days", "Time", "Loc",
               "Rcap", "Full", "Begin/End", "Instructor"]]
@@ -522,9 +374,7 @@ def tidy_xlsx(file_contents):
 
     # include in calculations
     _df['Calc'] = 'Y'
-    for row in _df.index.to_list():
-        if _df.loc[row, 'S'] == 'C':
-            _df.loc[row, 'Calc'] = 'N'
+    _df.loc[_df['S'] == 'C', 'Calc'] = 'N'
 
     # HENC_AI
     _df['id'] = _df.index
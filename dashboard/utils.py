@@ -16,6 +16,10 @@ from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, HRFlowable
 
+from parse_cache import cached_parse
+from swrcgsr import read_report, read_xlsx, to_dataframe
+from time_slots import convert_times
+
 def blankFigure():
 # blank figure when no data is present
     return {
@@ -105,7 +109,6 @@ def generate_weekday_tab(day):
     )
 
 
-
 def convert_term_title_to_code(term_title):
     """
     Converts a descriptive term title (e.g., "Fall Semester 2026" or "Spring 2025")
@@ -255,261 +258,39 @@ def apply_custom_course_titles(df):
     return df[original_columns]
 
 
-def convert_to_24hr(time_str):
-    if not time_str or time_str.strip() == "TBA" or "-" not in time_str:
-        return time_str
-
-    time_str = time_str.strip()
-    match = re.match(r'(\d{4})-(\d{4})(AM|PM)', time_str)
-    if not match:
-        return time_str
-
-    start_str, end_str, meridian = match.groups()
-    start_hour, start_min = int(start_str[:2]), int(start_str[2:])
-    end_hour, end_min = int(end_str[:2]), int(end_str[2:])
-
-    if meridian == "PM" and end_hour != 12:
-        end_hour += 12
-    elif meridian == "AM" and end_hour == 12:
-        end_hour = 0
-
-    if meridian == "PM":
-        if start_hour != 12 and (start_hour > (end_hour - 12) or start_hour >= 11):
-            pass
-        elif start_hour != 12:
-            start_hour += 12
-    elif meridian == "AM" and start_hour == 12:
-        start_hour = 0
-
-    return f"{start_hour:02d}:{start_min:02d}-{end_hour:02d}:{end_min:02d}"
+def parse_enrollment_file(file_content):
+    """Parse SWRCGSR text output into report metadata and a section frame.
 
+    Args:
+        file_content:
+            decoded text of the SWRCGSR report.
 
-def parse_enrollment_file(file_content):
+    Returns:
+        Tuple of the header metadata dictionary and the section DataFrame.
+    """
     if not file_content or not file_content.strip():
         return {}, pd.DataFrame()
 
-    lines = file_content.split('\n')
-    header_metadata = {}
-    cleaned_rows = []
-
-    for line in lines:
-        if "METROPOLITAN STATE UNIVERSITY" in line:
-            date_match = re.search(r'(\d{2}-[A-Z]{3}-\d{4})', line)
-            if date_match:
-                header_metadata['report_date'] = date_match.group(1)
-        if "Term:" in line and 'term' not in header_metadata:
-            t_match = re.search(r'Term:\s*(\d+)', line)
-            d_match = re.search(r'Dept:\s*([^\s-]+)', line)
-            if t_match: header_metadata['term'] = t_match.group(1)
-            if d_match: header_metadata['dept'] = d_match.group(1)
-
-    ignorable = ["SWRCGSR", "METROPOLITAN STATE", "Class Enrollment", "Term:",
-                 "Subj Nmbr CRN", "---- ---- ----", "Subject Code", "** TOTALS **",
-                 "Cr Hr Prod", "Sections", "------------"]
-
-    for line in lines:
-        if any(kw in line for kw in ignorable) or not line.strip():
-            continue
-        if line.strip().startswith('\x0c') or line.strip().isdigit():
-            continue
-        cleaned_rows.append(line)
-
-    # 1. Runs the entire reconstruction, slicing, and splitting pipeline
-    df_final = reconstruct_records(cleaned_rows)
-
-    # 2. Calculate CHP safely after all splits have run and zeroed out credits
-    if not df_final.empty:
-        # Explicitly enforce numeric types to ensure multiplication doesn't break
-        df_final['Credit'] = pd.to_numeric(df_final['Credit'], errors='coerce').fillna(0)
-        df_final['Enrl'] = pd.to_numeric(df_final['Enrl'], errors='coerce').fillna(0)
-
-        # Calculate Credit Hour Production
-        df_final['CHP'] = df_final['Credit'] * df_final['Enrl']
+    report = read_report(file_content)
+    header_metadata = {key: value for key, value in report.metadata.items() if key != 'preamble'}
+    df_final = to_dataframe(report, subjects=['MTH', 'MTL', 'MTLM'])
+
+    # Calculate Credit Hour Production after all splits have zeroed out credits
+    df_final['Credit'] = df_final['Credit'].fillna(0)
+    df_final['Enrl'] = df_final['Enrl'].fillna(0)
+    df_final['CHP'] = df_final['Credit'] * df_final['Enrl']
 
     df_final = apply_custom_course_titles(df_final)
 
     return header_metadata, df_final
 
 
-def reconstruct_records(cleaned_rows):
-    logical_records = []
-    current_record = None
-    valid_subject_pattern = re.compile(r'^(MTH|MTL|MTLM)\s+\d+')
-
-    for line in cleaned_rows:
-        if valid_subject_pattern.match(line.lstrip()):
-            if current_record:
-                logical_records.append(current_record)
-            current_record = {"base": line, "wraps": []}
-        else:
-            if current_record:
-                current_record["wraps"].append(line)
-
-    if current_record:
-        logical_records.append(current_record)
-
-    return slice_fields(logical_records)
-
-def slice_fields(logical_records):
-    parsed_data = []
-
-    for record in logical_records:
-        base = record["base"]
-
-        subj = base[0:5].strip()
-        nmbr = base[5:10].strip()
-        crn  = base[10:16].strip()
-        sec  = base[16:20].strip()
-        s    = base[20:22].strip()
-        cam  = base[22:26].strip()
-        t    = base[26:28].strip()
-        title = base[28:44].strip()
-        credit = base[44:51].strip()
-        max_enrl = base[51:56].strip()
-        enrl = base[56:61].strip()
-        wcap = base[61:66].strip()
-        wlst = base[66:71].strip()
-        days = base[71:79].strip()
-        time = base[79:91].strip()
-        loc  = base[91:99].strip()
-        rcap = base[99:104].strip()
-        pct_ful = base[104:109].strip()
-        beg_end = base[109:121].strip()
-        inst = base[121:].strip()
-
-        if not re.match(r'^\d+$', crn):
-            continue
-
-        for wrap in record["wraps"]:
-            w_days = wrap[71:79].strip() if len(wrap) > 71 else ""
-            w_time = wrap[79:91].strip() if len(wrap) > 79 else ""
-            w_loc  = wrap[91:99].strip() if len(wrap) > 91 else ""
-            w_inst = wrap[121:].strip() if len(wrap) > 121 else ""
-
-            if w_days or w_time:
-                if w_days: days += f" / {w_days}"
-                if w_time: time += f" / {w_time}"
-                if w_loc: loc += f" / {w_loc}"
-            else:
-                if w_loc:
-                    loc = f"{loc}{w_loc}".strip() if loc else w_loc
-                if w_inst:
-                    inst = f"{inst}{w_inst}".strip() if inst else w_inst
-
-        time_parts = [convert_to_24hr(t) for t in time.split(' / ')]
-        formatted_time = " / ".join(time_parts)
-
-        try:
-            max_val = int(max_enrl) if max_enrl.isdigit() else 0
-            enrl_val = int(enrl) if enrl.isdigit() else 0
-            ratio = round(100 * enrl_val / max_val, 2) if max_val > 0 else 0.0
-        except ValueError:
-            ratio = 0.0
-
-        course_str = f"{subj}{nmbr}"
-
-        if not nmbr.isdigit():
-            calc_status = "N"
-        elif course_str in ["MTH1082", "MTH1101", "MTH1116", "MTH1312"]:
-            calc_status = "L"
-        elif course_str in ["MTL3850", "MTL3858", "MTL4690"]:
-            calc_status = "N"
-        else:
-            calc_status = "Y"
-
-        parsed_data.append({
-            'Subj': subj, 'Nmbr': nmbr, 'CRN': crn, 'Sec': sec, 'S': s,
-            'Cam': cam, 'T': t, 'Title': title, 'Credit': credit,
-            'Max Enrl': max_enrl, 'Enrl': enrl, 'WCap': wcap, 'WLst': wlst,
-            'Days': days, 'Time': formatted_time, 'Loc': loc, 'Rcap': rcap,
-            '%Ful': pct_ful, 'Begin/End': beg_end, 'Instructor': inst,
-            'Course': course_str, 'Ratio': ratio, 'Calc': calc_status,
-        })
-
-    # --- Convert records to a temporary DataFrame to clean up numeric types ---
-    df_temp = pd.DataFrame(parsed_data)
-
-    # Safely convert specific columns to numeric values, leaving non-numeric items blank (NaN)
-    numeric_cols = ['CRN', 'Max Enrl', 'Enrl', 'WCap', 'WLst', 'Rcap', '%Ful']
-    for col in numeric_cols:
-        if col in df_temp.columns:
-            df_temp[col] = pd.to_numeric(df_temp[col], errors='coerce')
-
-    # Convert records back to a dictionary format for the next function pipeline stage
-    cleaned_records = df_temp.to_dict('records')
-
-    return expand_and_split_courses(cleaned_records)
-
-
-def expand_and_split_courses(raw_records):
-    expanded_records = []
-
-    for row in raw_records:
-        if row['Subj'] == 'MTH' and row['Nmbr'] in ['1108', '1109']:
-            day_parts = row['Days'].split(' / ')
-            time_parts = row['Time'].split(' / ')
-            loc_parts = row['Loc'].split(' / ')
-
-            # --- Extract absolute string elements using indexing instead of copying entire arrays ---
-            lab_days = day_parts[0] if len(day_parts) > 0 else row['Days']
-            lab_time = time_parts[0] if len(time_parts) > 0 else row['Time']
-            lab_loc  = loc_parts[0]  if len(loc_parts) > 0  else row['Loc']
-
-            lec_days = day_parts[1] if len(day_parts) > 1 else (day_parts[0] if len(day_parts) > 0 else "")
-            lec_time = time_parts[1] if len(time_parts) > 1 else (time_parts[0] if len(time_parts) > 0 else "")
-            lec_loc  = loc_parts[1]  if len(loc_parts) > 1  else (loc_parts[0] if len(loc_parts) > 0 else "")
-
-            # Row 1: Primary Lecture Component (Clean String Assigned)
-            lec_row = row.copy()
-            lec_row['Days'], lec_row['Time'], lec_row['Loc'] = lec_days, lec_time, lec_loc
-            expanded_records.append(lec_row)
-
-            # Row 2: Lab Component #1 (Clean String Assigned)
-            lab_row_1 = row.copy()
-            lab_row_1['Days'], lab_row_1['Time'], lab_row_1['Loc'] = lab_days, lab_time, lab_loc
-            lab_row_1['Max Enrl'], lab_row_1['Enrl'], lab_row_1['Credit'] = 0, 0, 0
-            lab_row_1['WCap'], lab_row_1['WLst'], lab_row_1['Rcap'], lab_row_1['%Ful'] = 0, 0, 0, 0
-            expanded_records.append(lab_row_1)
-
-            # Row 3: Lab Component #2 (Clean String Assigned)
-            lab_row_2 = lab_row_1.copy()
-            lab_row_2['Instructor'] = ","
-            lab_row_2['Credit'] = 1
-            expanded_records.append(lab_row_2)
-
-        elif " / " in row['Days'] or " / " in row['Time']:
-            day_parts = row['Days'].split(' / ')
-            time_parts = row['Time'].split(' / ')
-            loc_parts = row['Loc'].split(' / ')
-
-            num_components = max(len(day_parts), len(time_parts), len(loc_parts))
-
-            for i in range(num_components):
-                split_row = row.copy()
-                split_row['Days'] = day_parts[i] if i < len(day_parts) else ""
-                split_row['Time'] = time_parts[i] if i < len(time_parts) else ""
-                split_row['Loc']  = loc_parts[i]  if i < len(loc_parts)  else ""
-
-                # --- Only the first split component (index 0) keeps original credits ---
-                if i > 0:
-                    split_row['Credit'] = 0
-
-                expanded_records.append(split_row)
-        else:
-            expanded_records.append(row)
-
-    return pd.DataFrame(expanded_records)
-
-
 def process_excel_import(file_content_bytes):
     import io
     import pandas as pd
     import numpy as np
 
-    # 1. Read raw bytes directly from the base64 Dash upload stream
-    df = pd.read_excel(io.BytesIO(file_content_bytes))
-
-    # 2. Define the normalization map (Inconsistent Name -> Standard Name)
+    # 1. Define the normalization map (Inconsistent Name -> Standard Name)
     column_mapping = {
         'Subj': 'Subj',
         'Subject': 'Subj',
@@ -529,8 +310,9 @@ def process_excel_import(file_content_bytes):
         'Full': '%Ful',
     }
 
-    # Rename the columns safely
-    df = df.rename(columns=column_mapping)
+    # 2. Stream the raw bytes of the Dash upload through a read-only workbook,
+    #    renaming the columns and unwrapping ="..." text formulas on the way
+    df = read_xlsx(io.BytesIO(file_content_bytes), aliases=column_mapping)
 
     # Ensure critical columns exist and are clean strings/numbers for downstream calculations
     if 'Subj' not in df.columns: df['Subj'] = ""
@@ -560,20 +342,15 @@ def process_excel_import(file_content_bytes):
 
     # C. Calculate 'Calc' (Strict translation of your text-parser course-filtering rules)
     if 'Calc' not in df.columns:
-        def determine_calc_status(row):
-            course_str = row['Course']
-            nmbr_str = row['Nmbr']
-
-            if not nmbr_str.isdigit():
-                return "N"
-            elif course_str in ["MTH1082", "MTH1101", "MTH1116", "MTH1312"]:
-                return "L"
-            elif course_str in ["MTL3850", "MTL3858", "MTL4690"]:
-                return "N"
-            else:
-                return "Y"
-
-        df['Calc'] = df.apply(determine_calc_status, axis=1)
+        df['Calc'] = np.select(
+            [
+                ~df['Nmbr'].str.isdigit(),
+                df['Course'].isin(["MTH1082", "MTH1101", "MTH1116", "MTH1312"]),
+                df['Course'].isin(["MTL3850", "MTL3858", "MTL4690"]),
+            ],
+            ["N", "L", "N"],
+            default="Y",
+        )
 
 
     # D. Calculate 'CHP' (Enrl * Credit)
@@ -837,10 +614,10 @@ def parse_contents_integrated(contents, filename):
 
     # 1. Leverage the superior engine from utils.py to process data
     if filename.endswith('.xlsx') or filename.endswith('.xls'):
-        _, df = process_excel_import(decoded)
+        _, df = cached_parse(decoded, process_excel_import, decoded)
     else:
         file_text = decoded.decode('utf-8', errors='ignore')
-        _, df = parse_enrollment_file(file_text)
+        _, df = cached_parse(decoded, parse_enrollment_file, file_text)
 
     if df.empty:
         return pd.DataFrame()
@@ -861,7 +638,7 @@ def parse_contents_integrated(contents, filename):
         df['S'] = 'A'
     if 'Time' in df.columns:
         # Convert derived times slot strings safely
-        df['Time'] = df['Time'].apply(lambda x: convert_to_24hr(x) if pd.notna(x) else x)
+        df['Time'] = convert_times(df['Time'])
         # df['Time'] = df['Time'].apply(lambda x: convertAMPMtime(x) if pd.notna(x) else x)
 
     # Filter to active status courses if present
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+# Projected final enrollment and wait list of every section, fitted at once
+# over the CRN by date matrices built from the daily snapshots.
+
+from enrollmentTimeSeries import *
+
+def minimum_enrollment(matrix):
+    """Minimum enrollment of every section
+
+    Lower and upper division courses have their own minimum, which is never
+    more than the section's maximum enrollment.
+
+    Args:
+        matrix: EnrollmentMatrix.
+
+    Returns:
+        Integer array with the minimum enrollment of every matrix row.
+    """
+    import numpy as np
+
+    upper = matrix.sections.CourseNumber.str[0].isin(["3", "4", "5", "6", "7", "8", "9"]).to_numpy()
+    m = np.where(upper, u_minenrollment, l_minenrollment)
+    return np.minimum(m, latest(matrix, matrix.max))
+
+def latest(matrix, values):
+    """Value of every row on the last date it was present
+
+    Args:
+        matrix: EnrollmentMatrix.
+        values: Row by date matrix, e.g. matrix.enrollment.
+
+    Returns:
+        Array with one value per matrix row.
+    """
+    import numpy as np
+
+    last = matrix.present.shape[1] - 1 - np.argmax(matrix.present[:, ::-1], axis=1)
+    return values[np.arange(len(values)), last]
+
+def fit_lines(x, values, present):
+    """Least squares line through the present values of every row
+
+    Args:
+        x: Array of the x value of every column.
+        values: Row by column matrix of values.
+        present: Boolean matrix, the values used in the fit.
+
+    Returns:
+        Arrays of the intercept and slope of every row; the slope is 0 for
+        rows with a single value and both are NaN for rows without values.
+    """
+    import numpy as np
+
+    w = present.astype(float)
+    y = np.where(present, values, 0).astype(float)
+    n = w.sum(axis=1)
+    sx = w @ x
+    sy = y.sum(axis=1)
+    sxx = w @ (x * x)
+    sxy = y @ x
+
+    den = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(den > 0, (n * sxy - sx * sy) / np.where(den > 0, den, 1), 0.0)
+        intercept = np.where(n > 0, (sy - slope * sx) / n, np.nan)
+    slope = np.where(n > 0, slope, np.nan)
+
+    return intercept, slope
+
+def project(matrix, date, window=14):
+    """Project the enrollment and wait list of every section to a date
+
+    Enrollment and wait list are fitted as straight lines over the last
+    window snapshots. The projected enrollment is kept between 0 and the
+    section's maximum, and any enrollment projected beyond the maximum is
+    added to the projected wait list.
+
+    Args:
+        matrix: EnrollmentMatrix.
+        date: Date to project to, e.g. the census date.
+        window: Number of most recent snapshots used in the fit.
+
+    Returns:
+        DataFrame indexed by CRN with the Course, the latest Enrollment, Wait
+        and Max, the Projected enrollment and ProjectedWait, the Minimum
+        enrollment and Low, True for sections projected below their minimum.
+    """
+    import numpy as np
+    import pandas as pd
+
+    columns = slice(max(0, len(matrix.dates) - window), None)
+    days = ((matrix.dates - matrix.dates[0]) / pd.Timedelta(days=1)).to_numpy()
+    target = (pd.Timestamp(date) - matrix.dates[0]) / pd.Timedelta(days=1)
+    present = matrix.present[:, columns]
+
+    enrollment = latest(matrix, matrix.enrollment)
+    wait = latest(matrix, matrix.wait)
+    maxenrollment = latest(matrix, matrix.max)
+
+    intercept, slope = fit_lines(days[columns], matrix.enrollment[:, columns], present)
+    projected = intercept + slope * target
+    intercept, slope = fit_lines(days[columns], matrix.wait[:, columns], present)
+    projectedWait = np.maximum(intercept + slope * target, 0) + np.maximum(projected - maxenrollment, 0)
+    projected = np.clip(projected, 0, maxenrollment)
+
+    minimum = minimum_enrollment(matrix)
+
+    return pd.DataFrame({
+        "Course": matrix.sections.Course.to_numpy(),
+        "Enrollment": enrollment,
+        "Wait": wait,
+        "Max": maxenrollment,
+        "Projected": np.round(projected, 1),
+        "ProjectedWait": np.round(projectedWait, 1),
+        "Minimum": minimum,
+        "Low": projected < minimum,
+    }, index=pd.Index(matrix.crns, name="CRN"))
+
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+    import os
+    import time
+    import pandas as pd
+
+    # Set up command line parsing
+    parser = argparse.ArgumentParser(
+        description="Project the final enrollment of every section from the csv files in the current directory."
+    )
+    parser.add_argument("date", help="date to project to (YYYY-MM-DD), e.g. the census date")
+    parser.add_argument("-n", "--window", type=int, default=14,
+                        help="number of most recent snapshots used in the fit")
+    # not a csv file, which would be read as a snapshot on the next run
+    parser.add_argument("-o", "--output", default="projections.xlsx", help="output Excel file")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(),
+                        help="number of processes parsing csv files")
+    args = parser.parse_args()
+
+    # parse new csv files into the snapshot store shared with enrollmentTimeSeries
+    # and project from the same snapshots it graphs
+    current_path = os.getcwd()
+    files = glob.glob(current_path + "/*.csv")
+    digests = ingest(current_path + "/snapshots", sorted(files), readsnapshot, workers=args.workers)
+    digests = with_collected(current_path + "/snapshots", digests)
+    rawdata = load(current_path + "/snapshots", digests,
+                   ["CourseNumber", "CRN", "Status", "Campus", "Max", "Enrollment",
+                    "Wait", "Days", "Time", "Location", "Course", "Date"])
+    rawdata.Date = pd.to_datetime(rawdata.Date, format="%Y%m%d")
+
+    # remove all courses that have been canceled
+    CRNs = rawdata[rawdata["Status"] == "C"].CRN.unique()
+    data = rawdata[rawdata["CRN"].isin(CRNs) == False]
+
+    # time the matrices and the fit, everything after loading the store
+    start = time.perf_counter()
+    projections = project(enrollment_matrix(data), args.date, window=args.window)
+    elapsed = time.perf_counter() - start
+
+    projections.to_excel(args.output)
+    low = projections[projections.Low]
+    print("{:d} sections projected in {:.3f}s, {:d} below their minimum enrollment:".format(
+        len(projections), elapsed, len(low)))
+    if len(low):
+        print(low.sort_values(["Course", "Projected"]).to_string())
@@ -1,128 +1,399 @@
 #!/usr/bin/env python3
 
 from enrollmentUtils import *
+from snapshotStore import ingest, load, with_collected
+from collections import namedtuple
 
-def readcsv(filename):
-    import csv
+# this is our filter to remove extraneous lines since each course must be
+# assigned to a campus
+campus = {"M": "Main", "D": "DIME", "F":"Metro South", "I": "Online", "O": "Extended", "S": "Metro South"}
+
+# minimum enrollment for lower division
+l_minenrollment = 19
+
+# minimum enrollment for upper division
+u_minenrollment = 13
+
+# columns of a stored snapshot
+SNAPSHOT_COLUMNS = ["Subj", "CourseNumber", "CRN", "Sec", "Status", "Campus", "Max",
+                    "Enrollment", "Wait", "Days", "Time", "Location", "Instructor", "Course"]
+
+def reportdate(report):
     import datetime
 
-    # capture the date from the file header
-    with open(filename, "r") as currentfile:
-        i = 0
-        for line in currentfile:
-            # the date is in the fourth line, last column, and remove the trailing comma
-            if i == 4:
-                d = line.split()[-1][:-1]
-                break
-            else:
-                i += 1
+    # capture the date from the file header, the fourth line, last column
+    d = report.metadata['preamble'][4].split()[-1]
     d = datetime.datetime.strptime(d, "%d-%b-%Y")
-    datadate = datetime.datetime.strftime(d,"%Y%m%d")
+    return datetime.datetime.strftime(d,"%Y%m%d")
+
+def readcsv(filename):
+    # Open and process the csv file output
+    with open(filename) as csvfile:
+        report = read_report(csvfile, csv_export=True)
+
+    datadate = reportdate(report)
+
+    # convert time format from 12hr to 24hr and account for TBA times, and add
+    # date stamp column
+    newfile = to_records(report, convert_time=convertAMPMtime)
+    for newlist in newfile:
+        newlist.append(datadate)
+
+    return newfile
 
-    newfile = []
 
-    # Open and process text file output
+def readsnapshot(filename):
+    """Parse a csv file into the rows kept in the snapshot store
+
+    Args:
+        filename: Path of the SWRCGSR csv export.
+
+    Returns:
+        The date stamp of the file (YYYYMMDD) and a DataFrame of the courses
+        assigned to a campus with the SNAPSHOT_COLUMNS.
+    """
+    import pandas as pd
+
     with open(filename) as csvfile:
-        reader = csv.reader(csvfile)
-        # eliminate top rows without data
-        for _ in range(7):
-            next(reader)
-        for row in reader:
-            # trim extra spaces or pad to adjust to 140 characters
-            newrow = (
-                row[0][:140].ljust(140) if len(row[0][:140]) < 140 else row[0][:140]
-            )
+        report = read_report(csvfile, csv_export=True)
 
-            # break lines with data into a list of pieces
-            newlist = list(alternating_size_chunks(newrow, HEADER_ROW.values()))
+    campusCodes = list(campus.keys())
+    rawdata = []
+    for line in to_records(report, convert_time=convertAMPMtime):
+        if (line[5].strip() in campusCodes):
+            rawdata.append([line[0].strip(),
+                            line[1].strip(),
+                            int(line[2].strip() or 0),
+                            line[3].strip(),
+                            line[4].strip(),
+                            line[5].strip(),
+                            int(line[9].strip() or 0),
+                            int(line[10].strip() or 0),
+                            int(line[12].strip() or 0),
+                            line[13].strip(),
+                            line[14].strip(),
+                            line[15].strip(),
+                            line[19].strip(),
+                            line[0].strip() + " " + line[1].strip(),
+                           ])
+
+    # the date stamp is the same for every row, so it is kept once per snapshot
+    return reportdate(report), pd.DataFrame(rawdata, columns=SNAPSHOT_COLUMNS)
+
+
+EnrollmentMatrix = namedtuple("EnrollmentMatrix",
+                              ["dates", "crns", "sections", "present", "enrollment", "wait", "max",
+                               "crn_rows", "course_rows", "number_rows"])
+
+def enrollment_matrix(data):
+    """Pivot the snapshot rows into dense CRN by date matrices
+
+    Args:
+        data: DataFrame of snapshot rows with a datetime Date column.
+
+    Returns:
+        EnrollmentMatrix of
+            dates: DatetimeIndex of the snapshot dates, in order;
+            crns: CRNs of the matrix rows, in order of first appearance;
+            sections: DataFrame of each CRN's Course, CourseNumber, Days,
+                Time, Location and Campus from its earliest snapshot;
+            present: boolean matrix, True where a CRN is in a snapshot;
+            enrollment, wait, max: integer matrices, 0 where not present;
+            crn_rows: dictionary from CRN to matrix row;
+            course_rows, number_rows: dictionaries from Course and from
+                CourseNumber to the array of their matrix rows.
+    """
+    import numpy as np
+    import pandas as pd
 
-            # convert time format from 12hr to 24hr and account for TBA times
-            newlist[14] = convertAMPMtime(newlist[14])
+    date_codes, dates = pd.factorize(data["Date"], sort=True)
+    crn_codes, crns = pd.factorize(data["CRN"])
+    shape = (len(crns), len(dates))
 
-            # add date stamp column
-            newlist.append(datadate)
+    present = np.zeros(shape, dtype=bool)
+    present[crn_codes, date_codes] = True
+    counts = {}
+    for column in ["Enrollment", "Wait", "Max"]:
+        counts[column] = np.zeros(shape, dtype=np.int64)
+        np.add.at(counts[column], (crn_codes, date_codes), data[column].to_numpy())
 
-            # Add the entry to our output list
-            newfile.append(newlist)
+    # attributes of each CRN as of the first date it was seen
+    order = np.lexsort((np.arange(len(data)), date_codes))
+    first = order[~pd.Series(crn_codes[order]).duplicated().to_numpy()]
+    first = first[np.argsort(crn_codes[first])]
+    sections = data.iloc[first][["Course", "CourseNumber", "Days", "Time", "Location", "Campus"]]
+    sections.index = crns
 
-    # Remove final non-data lines
-    newfile = newfile[:-1]
+    rows = pd.Series(np.arange(len(crns)))
+    return EnrollmentMatrix(pd.DatetimeIndex(dates), crns, sections, present,
+                            counts["Enrollment"], counts["Wait"], counts["Max"],
+                            dict(zip(crns, range(len(crns)))),
+                            rows.groupby(sections["Course"].to_numpy(), sort=False).indices,
+                            rows.groupby(sections["CourseNumber"].to_numpy(), sort=False).indices)
 
-    return newfile
 
+# locations of online and unscheduled sections
+VIRTUAL_LOCATIONS = r"TBA|ONLI|ASYN|SYNC|MOST"
 
+GroupTotals = namedtuple("GroupTotals", ["present", "enrollment", "wait", "max", "members"])
 
-if __name__ == "__main__":
-    import os
+def group_ids(keys, groups):
+    """Compile a list of groups into the group of every key
+
+    Args:
+        keys: Keys of the matrix rows, CRNs or course numbers.
+        groups: List of lists of keys.
+
+    Returns:
+        Integer array with the index of the group of every key, -1 for keys
+        in no group.
+    """
+    import numpy as np
+
+    lookup = {key: g for g, group in enumerate(groups) for key in group}
+    return np.array([lookup.get(key, -1) for key in keys], dtype=np.int64)
+
+def group_totals(matrix, ids, n):
+    """Totals by date of every group of matrix rows
+
+    Args:
+        matrix: EnrollmentMatrix.
+        ids: Group index of every matrix row, as returned by group_ids.
+        n: Number of groups.
+
+    Returns:
+        GroupTotals of
+            present: boolean group by date matrix, True where any member is
+                in the snapshot;
+            enrollment, wait, max: integer group by date matrices of the
+                summed member rows;
+            members: dictionary from group index to its matrix rows.
+    """
     import numpy as np
-    import glob
-    import csv
+    import pandas as pd
+
+    grouped = ids >= 0
+    present = np.zeros((n, len(matrix.dates)), dtype=bool)
+    np.logical_or.at(present, ids[grouped], matrix.present[grouped])
+    totals = {}
+    for name in ["enrollment", "wait", "max"]:
+        totals[name] = np.zeros((n, len(matrix.dates)), dtype=np.int64)
+        np.add.at(totals[name], ids[grouped], getattr(matrix, name)[grouped])
+    rows = np.flatnonzero(grouped)
+    members = {g: rows[positions] for g, positions in pd.Series(rows).groupby(ids[rows]).indices.items()}
+
+    return GroupTotals(present, totals["enrollment"], totals["wait"], totals["max"], members)
+
+def detect_stacked(matrix):
+    """Group the CRNs that meet at the same days, time, and location
+
+    Args:
+        matrix: EnrollmentMatrix.
+
+    Returns:
+        List of lists of CRNs, one for every days, time, and location shared
+        by more than one CRN, in order of first appearance.
+    """
+    import pandas as pd
+
+    sections = matrix.sections
+    # sections without a room and a meeting time are never stacked
+    fixed = ((sections.Days != "")
+             & ~sections.Time.isin(["", "TBA"])
+             & (sections.Location != "")
+             & ~sections.Location.str.match(VIRTUAL_LOCATIONS)).to_numpy()
+    grouped = pd.Series(matrix.crns[fixed]).groupby(
+        [sections.Days.to_numpy()[fixed], sections.Time.to_numpy()[fixed], sections.Location.to_numpy()[fixed]],
+        sort=False)
+    return [group.tolist() for _, group in grouped if len(group) > 1]
+
+# bump to redraw every graph after changing how they are drawn
+RENDER_VERSION = 1
+
+def stack_colors(n):
+    """Colors of n bars stacked in one graph
+
+    Args:
+        n: Number of bars.
+
+    Returns:
+        List of n RGBA tuples from the Dark2 color map.
+    """
+    import numpy as np
+    from matplotlib import pyplot as plt
+
+    cmap = plt.get_cmap("Dark2")
+    return [tuple(color) for color in cmap(np.linspace(0,1.0,n)).tolist()]
+
+def figure_hash(figure):
+    """Digest of everything drawn in a graph
+
+    Args:
+        figure: Dictionary describing the graph, see render_figure.
+
+    Returns:
+        Hex digest string.
+    """
+    import hashlib
+    import json
+
+    payload = json.dumps([RENDER_VERSION, figure], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def render_figure(path, figure):
+    """Draw one enrollment graph and save it as a PDF
+
+    Args:
+        path: Directory of the graphs.
+        figure: Dictionary with the file name 'figname', the 'title', the
+            snapshot 'dates' (YYYY-MM-DD), the enrollment 'bars' stacked in
+            order and the 'wait' list bar on top (each a dictionary of
+            'values' and optional 'label' and 'color'), the upper y limit
+            'ylim', the dashed horizontal 'lines' as (value, color) pairs and
+            whether to draw a 'legend'.
+
+    Returns:
+        The file name of the graph.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
     import pandas as pd
     from matplotlib import pyplot as plt
     from matplotlib import dates as mdates
     from pandas.plotting import register_matplotlib_converters
     register_matplotlib_converters()
 
-    # minimum enrollment for lower division
-    l_minenrollment = 19
+    x_values = pd.to_datetime(figure["dates"]).tolist()
+    M = len(x_values)
+
+    # Create figure and plot space
+    fig, ax = plt.subplots(figsize=(6, 6))
+    ax.set_axisbelow(True)
+    ax.yaxis.grid(color='gray', linestyle='dashed')
+    formatter = mdates.DateFormatter("%m-%d")
+    ax.xaxis.set_major_formatter(formatter)
+
+    # create a bar plot for each series stacked on the previous one, with the
+    # wait list on top
+    b = M*[0]
+    for bar in figure["bars"] + [figure["wait"]]:
+        ax.bar(x_values,
+               bar["values"],
+               bottom = b,
+               label = bar.get("label"),
+               color = bar.get("color"),
+               linewidth = 1,
+               edgecolor = "white")
+        b = [sum(y) for y in zip(b, bar["values"])]
+
+    ax.set(xlabel="Date",
+           ylabel="Enrollment",
+           title=figure["title"])
+
+    plt.ylim(0, figure["ylim"])
+
+    # minimum enrollment and maximum enrollment based on room capacity
+    for value, color in figure["lines"]:
+        plt.plot([min(x_values), max(x_values)],[value, value],'--', color = color)
+
+    # include a legend of all the CRNs
+    if figure["legend"]:
+        plt.legend(loc="upper left")
+
+    # save the graph as a PDF
+    plt.savefig(path + "/" + figure["figname"])
+    plt.close(fig)
 
-    # minimum enrollment for upper division
-    u_minenrollment = 13
+    return figure["figname"]
+
+def render_figures(path, figures, workers=1):
+    """Draw the graphs whose data changed since the last run
+
+    The digest of every graph drawn is kept in a manifest in the graphs
+    directory; graphs with the same digest whose file still exists are
+    skipped.
+
+    Args:
+        path: Directory of the graphs.
+        figures: List of graph dictionaries, see render_figure.
+        workers: Number of processes drawing graphs.
+
+    Returns:
+        Number of graphs drawn and number skipped.
+    """
+    import json
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+
+    manifestname = path + "/manifest.json"
+    try:
+        with open(manifestname) as fp:
+            manifest = json.load(fp)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+
+    digests = {figure["figname"]: figure_hash(figure) for figure in figures}
+    pending = [figure for figure in figures
+               if manifest.get(figure["figname"]) != digests[figure["figname"]]
+               or not os.path.exists(path + "/" + figure["figname"])]
+
+    try:
+        if workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for figname in executor.map(partial(render_figure, path), pending, chunksize=8):
+                    manifest[figname] = digests[figname]
+        else:
+            for figure in pending:
+                manifest[render_figure(path, figure)] = digests[figure["figname"]]
+    finally:
+        # keep what was drawn even if a graph fails
+        with open(manifestname, "w") as fp:
+            json.dump(manifest, fp, indent=1, sort_keys=True)
+
+    return len(pending), len(figures) - len(pending)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import numpy as np
+    import glob
+    import csv
+    import pandas as pd
+    import matplotlib
+    # graphs are only written to files
+    matplotlib.use("Agg")
+
+    # Set up command line parsing
+    parser = argparse.ArgumentParser(
+        description="Graph the enrollment of every course from the csv files in the current directory."
+    )
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(),
+                        help="number of processes parsing csv files and drawing graphs")
+    parser.add_argument("-s", "--stacked", default=None,
+                        help="file of stacked courses and CRNs (default: stacked.txt)")
+    args = parser.parse_args()
 
     # read in all csv files in current directory
     current_path = os.getcwd()
     files=glob.glob(current_path + "/*.csv")
-    nf = len(files)
 
-    # this is our filter to remove extraneous lines since each course must be
-    # assigned to a campus
-    campus = {"M": "Main", "D": "DIME", "F":"Metro South", "I": "Online", "O": "Extended", "S": "Metro South"}
-    campusCodes = list(campus.keys())
-    rawdata = []
-    for filename in files:
-        current = readcsv(filename)
-        for line in current:
-            if (line[5].strip() in campusCodes):
-                rawdata.append([line[0].strip(),
-                                line[1].strip(),
-                                int(line[2].strip() or 0),
-                                line[3].strip(),
-                                line[4].strip(),
-                                line[5].strip(),
-                                int(line[9].strip() or 0),
-                                int(line[10].strip() or 0),
-                                int(line[12].strip() or 0),
-                                line[13].strip(),
-                                line[14].strip(),
-                                line[15].strip(),
-                                line[19].strip(),
-                                line[0].strip() + " " + line[1].strip(),
-                                line[-1]
-                               ])
-
-    # store the data as a dataframe
-    rawdata = pd.DataFrame(rawdata, columns = ["Subj",
-                                               "CourseNumber",
-                                               "CRN",
-                                               "Sec",
-                                               "Status",
-                                               "Campus",
-                                               "Max",
-                                               "Enrollment",
-                                               "Wait",
-                                               "Days",
-                                               "Time",
-                                               "Location",
-                                               "Instructor",
-                                               "Course",
-                                               "Date"])
+    # parse each csv file once into the snapshot store, then load only the
+    # columns needed for the graphs of the csv files in the directory and of
+    # the snapshots added by snapshotCollector on other dates
+    digests = ingest(current_path + "/snapshots", sorted(files), readsnapshot, workers=args.workers)
+    digests = with_collected(current_path + "/snapshots", digests)
+    rawdata = load(current_path + "/snapshots", digests,
+                   ["CourseNumber", "CRN", "Status", "Campus", "Max", "Enrollment",
+                    "Wait", "Days", "Time", "Location", "Course", "Date"])
 
     # convert date column to datetime format
     rawdata.Date = pd.to_datetime(rawdata.Date, format="%Y%m%d")
 
     # if there are duplicate dates, exit with an error.
-    if nf != len(rawdata.Date.unique()):
-        print("ERROR:  There are {:d} files present in {:s}, but only {:d} unique dates.  Remove any duplicate dated files.".format(nf, path, len(rawdata.Date.unique())))
+    if len(digests) != len(rawdata.Date.unique()):
+        print("ERROR:  There are {:d} snapshots in {:s}, but only {:d} unique dates.  Remove any duplicate dated files.".format(len(digests), current_path, len(rawdata.Date.unique())))
         sys.exit(0)
 
     # create graphs directory if it does not exist
@@ -137,65 +408,50 @@ if __name__ == "__main__":
     data = rawdata[rawdata["CRN"].isin(CRNs) == False]
 
 
-    # load stacked courses
-    assert os.path.exists(current_path + "/stacked.py"), "File does not exist: {:s}".format(current_path + "/stacked.py")
-    exec(open(current_path + "/stacked.py").read())
-
-    stackedCRNsFlat = []
-    for stack in stackedCRNs:
-        for course in stack:
-            stackedCRNsFlat.append(course)
-
-    stackedCoursesFlat = []
-    for stack in stackedCourses:
-        for course in stack:
-            stackedCoursesFlat.append(course)
+    # every series below is a row, or a sum of rows, of these matrices
+    matrix = enrollment_matrix(data)
+    figures = []
+
+    # load stacked courses, falling back on a stacked.py from older terms or
+    # on the sections that share days, time, and location
+    stackedname = args.stacked or current_path + "/stacked.txt"
+    if args.stacked or os.path.exists(stackedname):
+        assert os.path.exists(stackedname), "File does not exist: {:s}".format(stackedname)
+        stacked = stacked_parser(stackedname)
+        stackedCourses = stacked["courses"]
+        stackedCRNs = stacked["crns"]
+    elif os.path.exists(current_path + "/stacked.py"):
+        exec(open(current_path + "/stacked.py").read())
+    else:
+        print("No stacked.txt in {:s}, stacking CRNs at the same days, time, and location".format(current_path))
+        stackedCourses = []
+        stackedCRNs = detect_stacked(matrix)
+
+    # group totals by date, one reduction for all the groups
+    crnGroups = group_ids(matrix.crns, stackedCRNs)
+    crnTotals = group_totals(matrix, crnGroups, len(stackedCRNs))
+    courseGroups = group_ids(matrix.sections.CourseNumber, stackedCourses)
+    courseTotals = group_totals(matrix, courseGroups, len(stackedCourses))
 
     # Enrollment for each CRN by date for non-stacked CRNs
-    for CRN in data.CRN.unique():
+    for row, CRN in enumerate(matrix.crns):
 
-        current_data = data[data.CRN == CRN].sort_values(["Date"])
+        section = matrix.sections.iloc[row]
+        present = matrix.present[row]
 
         # collect course and max capacity
-        maxenrollment = current_data['Max'].max()
-        course = "{:s} ({:d})".format(current_data.Course.unique()[0], CRN)
-        DayTimeLoc = "{:s} {:s} {:s} ({:s})".format(current_data.Days.unique()[0],
-                                                            current_data.Time.unique()[0],
-                                                            current_data.Location.unique()[0],
-                                                            campus[current_data.Campus.unique()[0]])
+        maxenrollment = int(matrix.max[row, present].max())
+        course = "{:s} ({:d})".format(section.Course, CRN)
+        DayTimeLoc = "{:s} {:s} {:s} ({:s})".format(section.Days,
+                                                            section.Time,
+                                                            section.Location,
+                                                            campus[section.Campus])
         figtitle = "Enrollment for {:s}\n {:s}".format(course, DayTimeLoc)
 
-        if not CRN in stackedCRNsFlat:
-
-            x_values = current_data.Date.tolist()
-            M = len(x_values)
-            y_values = current_data.Enrollment.tolist()
-            w_values = current_data.Wait.tolist()
-
-            # Create figure and plot space
-            fig, ax = plt.subplots(figsize=(6, 6))
-            ax.set_axisbelow(True)
-            ax.yaxis.grid(color='gray', linestyle='dashed')
-            formatter = mdates.DateFormatter("%m-%d")
-            ax.xaxis.set_major_formatter(formatter)
-            ax.bar(x_values,
-                   y_values,
-                   linewidth = 1,
-                   edgecolor = "white")
-            ax.bar(x_values,
-                   w_values,
-                   bottom = y_values,
-                   color="gray",
-                   linewidth = 1,
-                   edgecolor = "white")
-            ax.set(xlabel="Date",
-                   ylabel="Enrollment",
-                   title=figtitle)
+        if crnGroups[row] < 0:
 
-
-            # set max on y to make graphs comparable if less that 45
-            # highest value needs to include the wait list
-            plt.ylim(0,int(max(45,max([sum(y) for y in zip(y_values, w_values)])*1.05)))
+            y_values = matrix.enrollment[row, present].tolist()
+            w_values = matrix.wait[row, present].tolist()
 
             # set minimum enrollment dependent on lower or upper division and maximum enrollment
             if int(course.split()[1][0]) >= 3:
@@ -203,95 +459,63 @@ if __name__ == "__main__":
             else:
                 m = l_minenrollment
             m = min(m, maxenrollment)
-            plt.plot([min(x_values), max(x_values)],[m, m],'--', color = "lightgreen")
-
-            # set maximum enrollment based on room capacity
-            plt.plot([min(x_values), max(x_values)],[maxenrollment, maxenrollment],'--', color = "lightcoral")
 
-            # create filename and save the graph as a PDF
-            figname = current_path + "/graphs/" + course + ".pdf"
-            plt.savefig(figname)
-            plt.close(fig)
+            figures.append({
+                "figname": course + ".pdf",
+                "title": figtitle,
+                "dates": matrix.dates[present].strftime("%Y-%m-%d").tolist(),
+                "bars": [{"values": y_values}],
+                "wait": {"values": w_values, "color": "gray"},
+                # set max on y to make graphs comparable if less that 45
+                # highest value needs to include the wait list
+                "ylim": int(max(45, max([sum(y) for y in zip(y_values, w_values)])*1.05)),
+                "lines": [(m, "lightgreen"), (maxenrollment, "lightcoral")],
+                "legend": False,
+            })
 
     # Combined enrollment for each CRN in stacked CRNs by date
-    for stack in stackedCRNs:
-
-        # filter data per stack
-        stackedData = data[data["CRN"].isin(stack)]
-
-        # get totals for each date
-        stackedDataTotals = data[data["CRN"].isin(stack)].groupby("Date", sort=False).sum()
+    for g, stack in enumerate(stackedCRNs):
 
-        # compute the total maximum enrollment for all course in stack
-        try:
-            maxenrollment = max(stackedDataTotals.Max.tolist())
-        except ValueError:
+        # matrix rows of the stack and the dates any of them were offered
+        rows = [matrix.crn_rows[CRN] for CRN in stack if CRN in matrix.crn_rows]
+        present = crnTotals.present[g]
+        if not present.any():
             print("Please remove the following stacked class:", stack)
+            continue
 
-        # Create figure and plot space
-        fig, ax = plt.subplots(figsize=(6, 6))
-        ax.set_axisbelow(True)
-        ax.yaxis.grid(color='gray', linestyle='dashed')
-        formatter = mdates.DateFormatter("%m-%d")
-        ax.xaxis.set_major_formatter(formatter)
+        # compute the total maximum enrollment for all course in stack
+        maxenrollment = int(crnTotals.max[g, present].max())
 
         # set the colors for the bars
-        cmap = plt.get_cmap("Dark2")
-        colors = cmap(np.linspace(0,1.0,len(stack)))
-
-        x_values = stackedDataTotals.index.tolist()
-        M = len(x_values)
+        colors = stack_colors(len(stack))
 
+        # create a bar for each CRN stacked on the previous one
         course = ""
+        bars = []
+        for j, row in enumerate(rows):
 
-        # create a bar plot for each CRN stacked on the previous one
-        b = M*[0]
-        for j, CRN in enumerate(stack):
-
-            current_data = stackedData[stackedData.CRN == CRN]
+            CRN = matrix.crns[row]
+            section = matrix.sections.iloc[row]
 
             # combine the names of the courses
-            course += "{:s} ({:d}), ".format(current_data.Course.unique()[0], CRN)
-
-            y_values = current_data.Enrollment.tolist()
-            ax.bar(x_values,
-                   y_values,
-                   bottom = b,
-                   label = CRN,
-                   color = colors[j],
-                   linewidth = 1,
-                   edgecolor = "white")
-            b = [sum(y) for y in zip(b, y_values)]
+            course += "{:s} ({:d}), ".format(section.Course, CRN)
+
+            bars.append({"values": matrix.enrollment[row, present].tolist(),
+                         "label": str(CRN),
+                         "color": colors[j]})
 
         # remove trailing comma and space
         course = course[:-2]
 
-        w_values = stackedDataTotals.Wait.tolist()
-
-        # add bar for wait list
-        ax.bar(x_values,
-               w_values,
-               bottom = b,
-               linewidth = 1,
-               label = "Wait List",
-               color = "#D3D3D3",
-               edgecolor = "white")
+        w_values = crnTotals.wait[g, present].tolist()
+        b = crnTotals.enrollment[g, present].tolist()
 
         # set a title for the figure
-        DayTimeLoc = "{:s} {:s} {:s} ({:s})".format(current_data.Days.unique()[0],
-                                                            current_data.Time.unique()[0],
-                                                            current_data.Location.unique()[0],
-                                                            campus[current_data.Campus.unique()[0]])
+        DayTimeLoc = "{:s} {:s} {:s} ({:s})".format(section.Days,
+                                                            section.Time,
+                                                            section.Location,
+                                                            campus[section.Campus])
         figtitle = "Enrollment for {:s}\n {:s}".format(course, DayTimeLoc)
-        ax.set(xlabel="Date",
-               ylabel="Enrollment",
-               title = figtitle)
-               # title="Enrollment for\n{:s}".format(course))
-
-
-        # set max on y to make graphs comparable if less that 45
-        # highest value needs to include the wait list
-        plt.ylim(0,int(max(45,max([sum(y) for y in zip(b, w_values)])*1.05)))
 
         # set minimum enrollment dependent on lower or upper division
         if int(course.split()[1][0]) >= 3:
@@ -299,25 +523,26 @@ if __name__ == "__main__":
         else:
             m = l_minenrollment
         m = min(m, maxenrollment)
-        plt.plot([min(x_values), max(x_values)],[m, m],'--', color = "lightgreen")
-
-        # set maximum enrollment based on room capacity
-        plt.plot([min(x_values), max(x_values)],[maxenrollment, maxenrollment],'--', color = "lightcoral")
 
-        # include a legend of all the CRNs
-        plt.legend(loc="upper left")
-
-        # create filename and save the graph as a PDF
-        figname = current_path + "/graphs/" + course + ".pdf"
-        plt.savefig(figname)
-        plt.close(fig)
+        figures.append({
+            "figname": course + ".pdf",
+            "title": figtitle,
+            "dates": matrix.dates[present].strftime("%Y-%m-%d").tolist(),
+            "bars": bars,
+            "wait": {"values": w_values, "label": "Wait List", "color": "#D3D3D3"},
+            # set max on y to make graphs comparable if less that 45
+            # highest value needs to include the wait list
+            "ylim": int(max(45, max([sum(y) for y in zip(b, w_values)])*1.05)),
+            "lines": [(m, "lightgreen"), (maxenrollment, "lightcoral")],
+            "legend": True,
+        })
 
 
-    for Course in data.Course.unique():
+    for Course in matrix.sections.Course.unique():
 
-        combinedData = data[data.Course == Course]
-        combinedDataTotals = combinedData.groupby("Date", sort=False).sum()
-        CRNs = combinedData.CRN.unique()
+        rows = matrix.course_rows[Course]
+        present = matrix.present[rows].any(axis=0)
+        CRNs = matrix.crns[rows]
 
         print(CRNs)
 
@@ -326,148 +551,80 @@ if __name__ == "__main__":
         if N > 1:
 
             # compute the total maximum enrollment for all course in stack
-            maxenrollment = max(combinedDataTotals.Max.tolist())
-
-            # Create figure and plot space
-            fig, ax = plt.subplots(figsize=(6, 6))
-            ax.set_axisbelow(True)
-            ax.yaxis.grid(color='gray', linestyle='dashed')
-            formatter = mdates.DateFormatter("%m-%d")
-            ax.xaxis.set_major_formatter(formatter)
+            maxenrollment = max(matrix.max[rows][:, present].sum(axis=0).tolist())
 
             # set the colors for the bars
-            cmap = plt.get_cmap("Dark2")
-            colors = cmap(np.linspace(0,1.0,N))
-
-            x_values = combinedDataTotals.index.tolist()
-            M = len(x_values)
-
-
-            # If a class is added and we don't have the data, how do we handle the extra dates that are blank?
-
-            # create a bar plot for each CRN stacked on the previous one
-            b = M*[0]
-            for j, CRN in enumerate(CRNs):
-                current_data = combinedData[combinedData.CRN == CRN]
-
-                y_values = current_data.Enrollment.tolist()
-                ax.bar(x_values,
-                       y_values,
-                       bottom = b,
-                       label = CRN,
-                       color = colors[j],
-                       linewidth = 1,
-                       edgecolor = "white")
-                b = [sum(y) for y in zip(b, y_values)]
-
-            w_values = combinedDataTotals.Wait.tolist()
-
-            # add bar for wait list
-            ax.bar(x_values,
-                   w_values,
-                   bottom = b,
-                   linewidth = 1,
-                   label = "Wait List",
-                   color = "#D3D3D3",
-                   edgecolor = "white")
-
-            # set a title for the figure
-            ax.set(xlabel="Date",
-                   ylabel="Enrollment",
-                   title="Enrollment for {:s}".format(Course))
-
-
-            # set max on y to make graphs comparable if less that 45
-            # highest value needs to include the wait list
-            plt.ylim(0,int(max(maxenrollment, max([sum(y) for y in zip(b, w_values)]))*1.05))
-
-            # set maximum enrollment based on room capacity
-            plt.plot([min(x_values), max(x_values)],[maxenrollment, maxenrollment],'--', color = "lightcoral")
-
-            # include a legend of all the CRNs
-            plt.legend(loc="upper left")
-
-            # create filename and save the graph as a PDF
-            figname = current_path + "/graphs/" + Course + ".pdf"
-            plt.savefig(figname)
-            plt.close(fig)
-
-    for stack in stackedCourses:
-
-        # filter data per stack
-        stackedData = data[data["CourseNumber"].isin(stack)]
-
-        # get totals for each date
-        stackedDataTotals = stackedData.groupby("Date", sort=False).sum()
+            colors = stack_colors(N)
+
+            # a CRN missing from some snapshots counts as 0 on those dates
+
+            # create a bar for each CRN stacked on the previous one
+            bars = [{"values": matrix.enrollment[row, present].tolist(),
+                     "label": str(CRN),
+                     "color": colors[j]}
+                    for j, (row, CRN) in enumerate(zip(rows, CRNs))]
+
+            w_values = matrix.wait[rows][:, present].sum(axis=0).tolist()
+            b = matrix.enrollment[rows][:, present].sum(axis=0).tolist()
+
+            figures.append({
+                "figname": Course + ".pdf",
+                "title": "Enrollment for {:s}".format(Course),
+                "dates": matrix.dates[present].strftime("%Y-%m-%d").tolist(),
+                "bars": bars,
+                "wait": {"values": w_values, "label": "Wait List", "color": "#D3D3D3"},
+                # highest value needs to include the wait list
+                "ylim": int(max(maxenrollment, max([sum(y) for y in zip(b, w_values)]))*1.05),
+                # set maximum enrollment based on room capacity
+                "lines": [(maxenrollment, "lightcoral")],
+                "legend": True,
+            })
+
+    for g, stack in enumerate(stackedCourses):
+
+        # matrix rows of the stack and the dates any of them were offered
+        rows = courseTotals.members.get(g, np.array([], dtype=int))
+        present = courseTotals.present[g]
+        if not present.any():
+            print("Please remove the following stacked course:", stack)
+            continue
 
         # combine the names of the courses
         course = ""
-        for item in stackedData.Course.unique():
+        for item in matrix.sections.Course.iloc[rows].unique():
             course += item + "/"
         # remove trailing characters
         course = course[:-1]
 
         # compute the total maximum enrollment for all course in stack
-        maxenrollment = max(stackedDataTotals.Max.tolist())
-
-        # Create figure and plot space
-        fig, ax = plt.subplots(figsize=(6, 6))
-        ax.set_axisbelow(True)
-        ax.yaxis.grid(color='gray', linestyle='dashed')
-        formatter = mdates.DateFormatter("%m-%d")
-        ax.xaxis.set_major_formatter(formatter)
+        maxenrollment = int(courseTotals.max[g, present].max())
 
         # set the colors for the bars
-        cmap = plt.get_cmap("Dark2")
-        colors = cmap(np.linspace(0,1.0,len(stack)))
-
-        x_values = stackedDataTotals.index.tolist()
-        M = len(x_values)
-
-        # create a bar plot for each CRN stacked on the previous one
-        b = M*[0]
-        for j, CourseNumber in enumerate(stack):
-
-            current_data = stackedData[stackedData["CourseNumber"] == CourseNumber].groupby("Date", sort=False).sum()
-
-            y_values = current_data.Enrollment.tolist()
-            ax.bar(x_values,
-                   y_values,
-                   bottom = b,
-                   label = CourseNumber,
-                   color = colors[j],
-                   linewidth = 1,
-                   edgecolor = "white")
-            b = [sum(y) for y in zip(b, y_values)]
-
-        w_values = stackedDataTotals.Wait.tolist()
-
-        # add bar for wait list
-        ax.bar(x_values,
-               w_values,
-               bottom = b,
-               linewidth = 1,
-               label = "Wait List",
-               color = "#D3D3D3",
-               edgecolor = "white")
-
-        # set a title for the figure
-        ax.set(xlabel="Date",
-               ylabel="Enrollment",
-               title="Enrollment for {:s}".format(course))
-
-
-        # set max on y to make graphs comparable if less that 45
-        # highest value needs to include the wait list
-        plt.ylim(0,int(max(maxenrollment, max([sum(y) for y in zip(b, w_values)]))*1.05))
-
-        # set maximum enrollment based on room capacity
-        plt.plot([min(x_values), max(x_values)],[maxenrollment, maxenrollment],'--', color = "lightcoral")
-
-        # include a legend of all the CRNs
-        plt.legend(loc="upper left")
+        colors = stack_colors(len(stack))
+
+        # create a bar for each course number stacked on the previous one
+        stackRows = [matrix.number_rows.get(CourseNumber, np.array([], dtype=int)) for CourseNumber in stack]
+        bars = [{"values": matrix.enrollment[stackRows[j]][:, present].sum(axis=0).tolist(),
+                 "label": CourseNumber,
+                 "color": colors[j]}
+                for j, CourseNumber in enumerate(stack)]
+
+        w_values = courseTotals.wait[g, present].tolist()
+        b = courseTotals.enrollment[g, present].tolist()
+
+        figures.append({
+            "figname": course.replace("/","_") + ".pdf",
+            "title": "Enrollment for {:s}".format(course),
+            "dates": matrix.dates[present].strftime("%Y-%m-%d").tolist(),
+            "bars": bars,
+            "wait": {"values": w_values, "label": "Wait List", "color": "#D3D3D3"},
+            # highest value needs to include the wait list
+            "ylim": int(max(maxenrollment, max([sum(y) for y in zip(b, w_values)]))*1.05),
+            # set maximum enrollment based on room capacity
+            "lines": [(maxenrollment, "lightcoral")],
+            "legend": True,
+        })
 
-        # create filename and save the graph as a PDF
-        figname = current_path + "/graphs/" + course.replace("/","_") + ".pdf"
-        plt.savefig(figname)
-        plt.close(fig)
+    # draw the figures whose data changed since the last run
+    rendered, skipped = render_figures(current_path + "/graphs", figures, workers=args.workers)
+    print("{:d} graphs rendered, {:d} unchanged".format(rendered, skipped))
@@ -1,39 +1,65 @@
 #!/usr/bin/env python3
 
 from enrollmentUtils import *
+import selenium
 from selenium import webdriver
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.service import Service
 # from selenium.common.exceptions import ElementNotVisibleException, NoSuchElementException
 from private import USER, PASSWORD, CHROMEPATH, DEPTCODE
-from time import sleep
-from os import path, remove, rename
+from bannerWait import (POLL, WrongPageException, wait_for_download, wait_for_element,
+                        wait_for_idle, wait_for_title)
+from os import link, makedirs, path, remove
+from concurrent.futures import ThreadPoolExecutor
 import argparse
 import datetime as dt
+import queue
+import re
 
-def main(term,
-         school,
-         department,
-         status,
-         subject,
-         campus,
-         session,
-         createmergefile,
-         scheduletype,
-         level):
+# what the waits look for on the Banner pages; adjust if Banner changes
+BUSY_SELECTOR = ".ui-widget-overlay, .loading"
+QUERY_SUBMITTED_XPATH = "//*[contains(text(), 'submitted')]"
+JOB_OUTPUT_XPATH = "//*[contains(text(), '.lis')]"
 
-# Initialize webdriver
+NAVIGATOR = "https://prod-ban-nav.msudenver.edu/applicationNavigator/seamless"
 
-# this is the chromedriver, not the chrome app
-    driver = webdriver.Chrome(CHROMEPATH)
+# run Chrome without a window, e.g. against a bannerStandIn server
+HEADLESS = False
+
+def open_session(downloaddir, timeout=60, poll=POLL):
+    """Start Chrome and log in to the Banner application navigator
+
+    Args:
+        downloaddir: Directory the browser downloads into.
+        timeout: Seconds to wait for each page.
+        poll: Seconds between checks while waiting.
+
+    Returns:
+        Logged in webdriver, at the application navigator.
+    """
+
+# Initialize webdriver, downloading into its own directory so sessions
+# running side by side do not overwrite each other's GJIREVO.csv
+
+    options = webdriver.ChromeOptions()
+    options.add_experimental_option("prefs", {"download.default_directory": downloaddir})
+    if HEADLESS:
+        options.add_argument("--headless=new")
+
+# this is the chromedriver, not the chrome app; selenium 4 takes it as a
+# service, and finds one itself when CHROMEPATH is empty
+    if int(selenium.__version__.split(".")[0]) < 4:
+        driver = webdriver.Chrome(CHROMEPATH, options=options)
+    else:
+        driver = webdriver.Chrome(service=Service(CHROMEPATH or None), options=options)
     actions = ActionChains(driver)
 
 # Load our site
 
-    driver.get("https://prod-ban-nav.msudenver.edu/applicationNavigator/seamless")
-    sleep(3)
-    if "Authentication" not in driver.title:
-        raise WrongPageException
+    driver.get(NAVIGATOR)
+    wait_for_title(driver, "Authentication", timeout, poll)
 
 # Authenticate and login
 
@@ -43,28 +69,54 @@ def main(term,
     actions.send_keys(PASSWORD)
     actions.send_keys(Keys.RETURN)
     actions.perform()
-    sleep(3)
-
 
-# Head to the enrollment report
-
-    if "Navigator" not in driver.title:
-        raise WrongPageException
-    assert "Navigator" in driver.title
+    wait_for_title(driver, "Navigator", timeout, poll)
+
+    return driver
+
+def run_query(driver,
+              term,
+              school,
+              department,
+              status,
+              subject,
+              campus,
+              session,
+              createmergefile,
+              scheduletype,
+              level,
+              downloadname=None,
+              timeout=60,
+              poll=POLL):
+    """Run SWRCGSR in a logged in session and export its output
+
+    Args:
+        driver: Webdriver returned by open_session.
+        term, school, department, status, subject, campus, session,
+        createmergefile, scheduletype, level: SWRCGSR parameters.
+        downloadname: Path the export is downloaded to, to wait for.
+        timeout: Seconds to wait for each page.
+        poll: Seconds between checks while waiting.
+
+    Returns:
+        Nothing; the session is back at the application navigator.
+    """
+    actions = ActionChains(driver)
 
 # select the SWRCGSR query and wait for it to load
     actions.reset_actions()
     actions.send_keys("SWRCGSR")
     actions.send_keys(Keys.RETURN)
     actions.perform()
-    sleep(12)
+    wait_for_title(driver, "SWRCGSR", timeout, poll)
+    wait_for_idle(driver, BUSY_SELECTOR, timeout, poll)
 
 # don't change anything on this page, just click "GO"
     actions.reset_actions()
     actions.key_down(Keys.ALT)
     actions.send_keys(Keys.PAGE_DOWN)
     actions.perform()
-    sleep(4)
+    wait_for_idle(driver, BUSY_SELECTOR, timeout, poll)
 
 # select printer and move to middle section
     actions.reset_actions()
@@ -125,11 +177,11 @@ def main(term,
     actions.pause(0.2)
     actions.perform()
 
-# save and wait for SQL query to complete
+# save and wait for SQL query to complete, shown by the message of the submitted job
     actions.reset_actions()
     actions.send_keys(Keys.F10)
     actions.perform()
-    sleep(1)
+    wait_for_idle(driver, BUSY_SELECTOR, timeout, poll, ready=(By.XPATH, QUERY_SUBMITTED_XPATH))
 
 # open the Related tab and select first item which should be GJIREVO
     actions.reset_actions()
@@ -143,16 +195,16 @@ def main(term,
     actions.send_keys(Keys.RETURN)
     actions.perform()
 
-
-# we cannot do this dynamically so hopefully this is long enough
-    sleep(45)
+# wait for the job to finish and list its output files
+    wait_for_title(driver, "GJIREVO", timeout, poll)
+    wait_for_element(driver, By.XPATH, JOB_OUTPUT_XPATH, 5 * timeout, poll)
 
 
 # wait until the file presents itself and then move to next input
     actions.reset_actions()
     actions.key_down(Keys.TAB)
     actions.perform()
-    sleep(1)
+    wait_for_idle(driver, BUSY_SELECTOR, timeout, poll)
 
 # find the correct .lis file, select it, and export it
     actions.reset_actions()
@@ -165,8 +217,170 @@ def main(term,
     actions.pause(3)
     actions.perform()
 
-    sleep(3)
-    driver.close()
+    # keep the browser open until the export is on disk
+    if downloadname is not None:
+        wait_for_download(downloadname, timeout, poll)
+
+# back to the navigator for the next query, the session stays logged in
+    driver.get(NAVIGATOR)
+    wait_for_title(driver, "Navigator", timeout, poll)
+
+def main(term,
+         school,
+         department,
+         status,
+         subject,
+         campus,
+         session,
+         createmergefile,
+         scheduletype,
+         level,
+         downloadname=None,
+         timeout=60,
+         poll=POLL):
+
+# a single query in a session of its own
+    downloaddir = path.dirname(downloadname) if downloadname else path.expanduser("~/Downloads")
+    driver = open_session(downloaddir, timeout, poll)
+    try:
+        run_query(driver, term, school, department, status, subject, campus, session,
+                  createmergefile, scheduletype, level, downloadname, timeout, poll)
+    finally:
+        driver.quit()
+
+def move_unique(filename, base):
+    """Move a file to base.csv, or base_2.csv, base_3.csv, ... if taken
+
+    Args:
+        filename: Path of the file to move.
+        base: Path of the new name without the .csv extension.
+
+    Returns:
+        The new path.
+    """
+
+    # link then remove, so an existing file is never replaced, even by
+    # another session moving a file at the same time
+    newfilename = base + ".csv"
+    count = 1
+    while True:
+        try:
+            link(filename, newfilename)
+            break
+        except FileExistsError:
+            count += 1
+            newfilename = "{:s}_{:d}.csv".format(base, count)
+    remove(filename)
+    return newfilename
+
+def rename_report(filename, filepath, department="%"):
+    """Move a downloaded report to a name built from its header
+
+    Args:
+        filename: Path of the downloaded GJIREVO.csv.
+        filepath: Directory the report is moved to.
+        department: Department code of the query, part of the name unless
+            it is "%" for all departments.
+
+    Returns:
+        The new path, <report>_<term>_<YYYYMMDD>.csv or
+        <report>_<term>_<department>_<YYYYMMDD>.csv, with _2, _3, ... added
+        for the later pulls of a day.
+    """
+
+    # check to see if the file was downloaded
+    assert path.exists(filename), "File does not exist: {:s}".format(filename)
+
+    # parse the filename from the information in the csv file
+    count = 0
+    with open(filename, "r") as fp:
+        for line in fp:
+            count += 1
+            if count < 8:
+                if count == 5:
+                    items = line.split()
+                    reportName = items[0].strip()
+                    reportDate = dt.datetime.strptime(items[6][:-1].strip(), "%d-%b-%Y")
+                if count == 7:
+                    items = line.split()
+                    reportTerm = items[1].strip()
+            else:
+                break
+
+    # queries of several departments for a term on a day need names of their own
+    if department != "%":
+        reportTerm += "_" + re.sub(r"[^A-Za-z0-9]+", "-", department).strip("-")
+
+    newfilename = "{:s}_{:s}_{:s}".format(reportName,
+                                          reportTerm,
+                                          dt.datetime.strftime(reportDate, "%Y%m%d"))
+
+    return move_unique(filename, filepath + newfilename)
+
+def retrieve(jobs, filepath, sessions=1, retries=2, timeout=60, poll=POLL):
+    """Run several SWRCGSR queries over a bounded pool of logged in sessions
+
+    Every session logs in once and runs queries until there are none left.
+    A failed query is retried, in a freshly logged in session, up to retries
+    more times.
+
+    Args:
+        jobs: List of dictionaries of run_query parameters.
+        filepath: Directory the reports are moved to.
+        sessions: Number of browsers running queries side by side.
+        retries: Number of times a failed query is run again.
+        timeout: Seconds to wait for each page.
+        poll: Seconds between checks while waiting.
+
+    Returns:
+        List with, for every job in order, the path of its report or the
+        exception of its last attempt.
+    """
+    pending = queue.Queue()
+    for i, job in enumerate(jobs):
+        pending.put((i, job, 0))
+    results = [None] * len(jobs)
+
+    def worker(n):
+        # every session downloads into a directory of its own
+        downloaddir = path.join(filepath, "session{:d}".format(n))
+        makedirs(downloaddir, exist_ok=True)
+        downloadname = path.join(downloaddir, "GJIREVO.csv")
+        driver = None
+        try:
+            while True:
+                try:
+                    i, job, attempt = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    if driver is None:
+                        driver = open_session(downloaddir, timeout, poll)
+                    # keep a download an earlier job could not rename
+                    if path.exists(downloadname):
+                        kept = move_unique(downloadname, path.join(downloaddir, "unrenamed"))
+                        print("Kept an earlier download as {:s}".format(kept))
+                    run_query(driver, downloadname=downloadname, timeout=timeout, poll=poll, **job)
+                    results[i] = rename_report(downloadname, filepath, job["department"])
+                    print("Report downloaded to {:s}".format(results[i]))
+                except Exception as e:
+                    # start over in a new session, the page state is unknown
+                    if driver is not None:
+                        driver.quit()
+                        driver = None
+                    if attempt < retries:
+                        print("Retrying term {:s} after: {}".format(job["term"], e))
+                        pending.put((i, job, attempt + 1))
+                    else:
+                        results[i] = e
+        finally:
+            if driver is not None:
+                driver.quit()
+
+    with ThreadPoolExecutor(max_workers=max(1, sessions)) as executor:
+        list(executor.map(worker, range(max(1, min(sessions, len(jobs))))))
+
+    return results
 
 if __name__ == "__main__":
 
@@ -183,12 +397,24 @@ if __name__ == "__main__":
     )
     parser.add_argument("-c", "--cancel", help="Include canceled classes", action="store_true")
     parser.add_argument("--excel", help="Provide formatted Excel output", action="store_true")
+    parser.add_argument("-t", "--timeout", type=float, default=60,
+                        help="seconds to wait for each Banner page before giving up")
+    parser.add_argument("-p", "--poll", type=float, default=POLL,
+                        help="seconds between checks while waiting for Banner")
+    parser.add_argument("-s", "--sessions", type=int, default=1,
+                        help="number of browsers running queries side by side")
+    parser.add_argument("-r", "--retries", type=int, default=2,
+                        help="number of times a failed query is run again")
+    parser.add_argument("-n", "--navigator", default=NAVIGATOR,
+                        help="URL of the application navigator, e.g. of a bannerStandIn server")
     args = parser.parse_args()
+    NAVIGATOR = args.navigator
 
     # info.txt file is a plain text file that provides the parameters for the
     # report. At a minimum it must include the term(s) but all other variables are
     # optional.  The form of the file is the <variable> = <value>.  Note that the
-    # term variable can be a list of comma separated term codes.
+    # term variable can be a list of comma separated term codes, and the
+    # department a list of space separated department codes.
     #
     # Example:
     #
@@ -209,54 +435,21 @@ if __name__ == "__main__":
     else:
         status = "A"
 
-    # since there can be more than one term, loop through all of them
-    for term in info["term"]:
-
-        # remove existing file
-        filename = "GJIREVO.csv"
-        if path.exists(filepath + filename):
-            remove(filepath + filename)
-
-        main(term.strip(),
-             info.get("school", "%"),
-             info.get("department", "%"),
-             status,
-             info.get("subject", "%"),
-             info.get("campus", "%"),
-             info.get("session", "%"),
-             info.get("createmergefile", "%"),
-             info.get("scheduletype", "%"),
-             info.get("level", "%"))
-
-        # check to see if the file was downloaded
-        assert path.exists(filepath + filename), "File does not exist: {:s}".format(filepath + filename)
-
-        # parse the filename from the information in the csv file
-        count = 0
-        with open(filepath + filename, "r") as fp:
-            for line in fp:
-                count += 1
-                if count < 8:
-                    if count == 5:
-                        items = line.split()
-                        reportName = items[0].strip()
-                        reportDate = dt.datetime.strptime(items[6][:-1].strip(), "%d-%b-%Y")
-                    if count == 7:
-                        items = line.split()
-                        reportTerm = items[1].strip()
-                else:
-                    break
-
-        newfilename = "{:s}_{:s}_{:s}.csv".format(reportName,
-                                                  reportTerm,
-                                                  dt.datetime.strftime(reportDate, "%Y%m%d"))
-
-        rename(filepath + filename, filepath + newfilename)
-        print()
-        print("Report downloaded to {:s}".format(filepath + newfilename))
+    # since there can be more than one term, and more than one department,
+    # queue a query for each of them
+    jobs = info_jobs(info, status)
+
+    # every browser logs in once and runs queries until all are done
+    results = retrieve(jobs, filepath, sessions=args.sessions, retries=args.retries,
+                       timeout=args.timeout, poll=args.poll)
+
+    for job, result in zip(jobs, results):
+        if isinstance(result, Exception):
+            print("Term {:s} ({:s}) failed: {}".format(job["term"], job["department"], result))
+            continue
 
         # Provide formatted Excel output
         if args.excel:
-            processEnrollment(filepath + newfilename)
-            print("Report converted to Excel as {:s}".format(filepath + newfilename[:-3] + "xlsx"))
-
+            from processEnrollment import processEnrollment
+            processEnrollment(result)
+            print("Report converted to Excel as {:s}".format(result[:-3] + "xlsx"))
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+# Pulls SWRCGSR reports on a schedule straight into the snapshot stores read
+# by enrollmentTimeSeries, one store per term, dropping duplicate reports.
+
+from enrollmentTimeSeries import readsnapshot
+from enrollmentUtils import *
+from snapshotStore import add
+
+def report_term(filename):
+    """Term code of a downloaded report
+
+    Args:
+        filename: Path of the SWRCGSR csv export.
+
+    Returns:
+        The term code from the seventh line of the header.
+    """
+    with open(filename, "r") as fp:
+        for count, line in enumerate(fp, 1):
+            if count == 7:
+                return line.split()[1].strip().rstrip(",")
+    raise ValueError("No term in the header of {:s}".format(filename))
+
+def collect(reports, root):
+    """Add downloaded reports to the store of their term and delete them
+
+    A report that cannot be read or stored is left where it is for
+    inspection and the error is printed.
+
+    Args:
+        reports: Paths of the downloaded reports.
+        root: Directory holding a directory per term, each with its own
+            snapshots store and graphs.
+
+    Returns:
+        List of (term, snapshot digest, status) for every report stored, the
+        status being "new", "identical" or "unchanged" as returned by
+        snapshotStore.add.
+    """
+    import os
+
+    collected = []
+    for report in reports:
+        try:
+            term = report_term(report)
+            digest, status = add(os.path.join(root, term, "snapshots"), report, readsnapshot)
+        except Exception as error:
+            print("Kept {:s}, which could not be stored: {}".format(report, error))
+            continue
+        os.remove(report)
+        collected.append((term, digest, status))
+    return collected
+
+def replay(source):
+    """Stand-in for Banner serving the exports in a directory, one per pull
+
+    Args:
+        source: Directory of SWRCGSR csv exports, served in name order.
+
+    Returns:
+        Function of the jobs and a spool directory, as banner_fetch, copying
+        the next export into the spool on every call.
+    """
+    import glob
+    import os
+    import shutil
+
+    exports = sorted(glob.glob(os.path.join(source, "*.csv")))
+
+    def fetch(jobs, spool):
+        if not exports:
+            return []
+        report = os.path.join(spool, os.path.basename(exports[0]))
+        shutil.copy(exports.pop(0), report)
+        return [report]
+
+    return fetch
+
+def banner_fetch(sessions=1, retries=2, timeout=60, poll=None):
+    """Pull reports from Banner with retrieveEnrollments
+
+    Args:
+        sessions: Number of browsers running queries side by side.
+        retries: Number of times a failed query is run again.
+        timeout: Seconds to wait for each page.
+        poll: Seconds between checks while waiting.
+
+    Returns:
+        Function of the jobs and a spool directory returning the paths of
+        the reports downloaded into the spool.
+    """
+    # selenium is only needed when pulling from Banner
+    from retrieveEnrollments import POLL, retrieve
+
+    def fetch(jobs, spool):
+        results = retrieve(jobs, spool, sessions=sessions, retries=retries,
+                           timeout=timeout, poll=poll or POLL)
+        for job, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                print("Term {:s} ({:s}) failed: {}".format(job["term"], job["department"], result))
+        return [result for result in results if not isinstance(result, Exception)]
+
+    return fetch
+
+
+if __name__ == "__main__":
+    import argparse
+    import datetime as dt
+    import os
+    import time
+
+    ################################################################################
+    # CHANGE THESE ACCORDINGLY
+    infopath = "/Users/hbouwmee/Documents/Associate Chair/Schedule/Time Series/info.txt"
+    rootpath = "/Users/hbouwmee/Documents/Associate Chair/Schedule/Time Series/"
+    ################################################################################
+
+    # Set up command line parsing
+    parser = argparse.ArgumentParser(
+        description="Collect SWRCGSR snapshots on a schedule into the time series stores."
+    )
+    parser.add_argument("-e", "--every", type=float, default=60,
+                        help="minutes between two pulls")
+    parser.add_argument("--once", help="Pull once and exit", action="store_true")
+    parser.add_argument("-c", "--cancel", help="Include canceled classes", action="store_true")
+    parser.add_argument("--replay", default=None,
+                        help="directory of csv exports served one per pull instead of Banner")
+    parser.add_argument("--root", default=rootpath,
+                        help="directory holding a directory per term")
+    parser.add_argument("-s", "--sessions", type=int, default=1,
+                        help="number of browsers running queries side by side")
+    parser.add_argument("-r", "--retries", type=int, default=2,
+                        help="number of times a failed query is run again")
+    parser.add_argument("-t", "--timeout", type=float, default=60,
+                        help="seconds to wait for each Banner page before giving up")
+    args = parser.parse_args()
+
+    if args.replay:
+        jobs = [{}]
+        fetch = replay(args.replay)
+    else:
+        assert os.path.exists(infopath), "File does not exist: {:s}".format(infopath)
+        jobs = info_jobs(text_parser(infopath), "%" if args.cancel else "A")
+        fetch = banner_fetch(args.sessions, args.retries, args.timeout)
+
+    # downloads land here and are removed once they are in a store; reports
+    # that could not be stored stay for inspection
+    spool = os.path.join(args.root, "spool")
+    os.makedirs(spool, exist_ok=True)
+
+    try:
+        while True:
+            started = time.monotonic()
+            # a failed pull is tried again on the next one
+            try:
+                reports = fetch(jobs, spool)
+            except Exception as error:
+                print("{:s}  pull failed: {}".format(dt.datetime.now().strftime("%Y-%m-%d %H:%M"), error))
+                reports = []
+            # a replayed directory runs out of exports
+            if args.replay and not reports:
+                break
+            for term, digest, status in collect(reports, args.root):
+                print("{:s}  {:s}  {:9s} {:s}".format(dt.datetime.now().strftime("%Y-%m-%d %H:%M"),
+                                                      term, status, digest[:12]))
+
+            if args.once:
+                break
+            time.sleep(max(0, 60 * args.every - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+
+# Columnar store of parsed enrollment snapshots.
+#
+# Each raw SWRCGSR export is parsed once and kept as one .npy file per column
+# in its own directory, so later runs memory map just the columns they need.
+# A manifest records which raw files have been ingested and the date of each
+# snapshot; snapshots whose rows did not change share their column files.
+
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+# bump to rebuild every snapshot after the parser changes its output
+STORE_VERSION = 1
+
+MANIFEST = "manifest.json"
+
+
+def _file_digest(filename):
+    digest = hashlib.sha256()
+    with open(filename, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _column_array(values):
+    # fixed width arrays so every column can be memory mapped
+    values = np.asarray(values)
+    if values.dtype == object:
+        values = values.astype(str)
+    return values
+
+
+def _data_digest(columns):
+    # digest of the parsed rows, equal for reports that differ only in header
+    digest = hashlib.sha256()
+    for column in sorted(columns):
+        values = np.ascontiguousarray(columns[column])
+        digest.update("{:s}:{:s}:{:d}:".format(column, values.dtype.str, len(values)).encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def _parse_columns(parse, filename):
+    # run in the worker processes: arrays pickle faster than a DataFrame
+    date, df = parse(filename)
+    return date, {column: _column_array(df[column].to_numpy()) for column in df.columns}
+
+
+def read_manifest(store_dir):
+    """Read the manifest of a snapshot store.
+
+    Args:
+        store_dir:
+            directory of the store.
+
+    Returns:
+        Dictionary with the store 'version', the ingested 'files' keyed by
+        absolute path and the 'snapshots' keyed by content digest.
+    """
+    empty = {"version": STORE_VERSION, "files": {}, "snapshots": {}}
+    try:
+        with open(os.path.join(store_dir, MANIFEST)) as fp:
+            manifest = json.load(fp)
+    except FileNotFoundError:
+        return empty
+    if manifest.get("version") != STORE_VERSION:
+        return empty
+    return manifest
+
+
+def write_manifest(store_dir, manifest):
+    """Atomically replace the manifest of a snapshot store.
+
+    Args:
+        store_dir:
+            directory of the store.
+        manifest:
+            dictionary as returned by read_manifest.
+
+    Returns:
+        Nothing.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=store_dir, suffix=".tmp")
+    with os.fdopen(fd, "w") as fp:
+        json.dump(manifest, fp, indent=1, sort_keys=True)
+    os.replace(tmp_path, os.path.join(store_dir, MANIFEST))
+
+
+def ingest(store_dir, files, parse, workers=1):
+    """Parse the raw files that are not in the store yet.
+
+    A file is skipped without being read when its size and modification time
+    match the manifest, and reused without being parsed when a file with the
+    same contents was ingested before. The remaining files are parsed
+    concurrently and saved in the order they were given.
+
+    Args:
+        store_dir:
+            directory of the store, created when missing.
+        files:
+            paths of the raw exports.
+        parse:
+            module level function of a path returning the snapshot date
+            (YYYYMMDD string) and a DataFrame of the snapshot rows.
+        workers:
+            number of parsing processes; 1 parses in this process.
+
+    Returns:
+        List of the snapshot digests of files, in the same order.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = read_manifest(store_dir)
+
+    digests = []
+    stats = {}
+    pending = {}
+    for filename in files:
+        filename = os.path.abspath(filename)
+        stat = os.stat(filename)
+        seen = manifest["files"].get(filename)
+        if seen and seen["size"] == stat.st_size and seen["mtime_ns"] == stat.st_mtime_ns \
+                and seen["digest"] in manifest["snapshots"]:
+            digests.append(seen["digest"])
+            continue
+
+        digest = _file_digest(filename)
+        if digest not in manifest["snapshots"]:
+            pending.setdefault(digest, filename)
+        stats[filename] = (stat, digest)
+        digests.append(digest)
+
+    if pending:
+        parse_columns = partial(_parse_columns, parse)
+        if workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+                parsed = executor.map(parse_columns, pending.values())
+                _save(store_dir, manifest, pending, parsed)
+        else:
+            _save(store_dir, manifest, pending, map(parse_columns, pending.values()))
+
+    for filename, (stat, digest) in stats.items():
+        manifest["files"][filename] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}
+    if stats:
+        write_manifest(store_dir, manifest)
+
+    return digests
+
+
+def _save(store_dir, manifest, pending, parsed):
+    # results arrive in submission order, so the store is deterministic
+    for digest, (date, columns) in zip(pending, parsed):
+        _save_snapshot(store_dir, manifest, digest, date, columns)
+        # record progress so an interrupted ingest keeps what it finished
+        write_manifest(store_dir, manifest)
+
+
+def _save_snapshot(store_dir, manifest, digest, date, columns):
+    snapshot_dir = os.path.join(store_dir, digest)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    for column, values in columns.items():
+        np.save(os.path.join(snapshot_dir, column + ".npy"), values)
+    rows = len(next(iter(columns.values()))) if columns else 0
+    manifest["snapshots"][digest] = {"date": date, "rows": rows, "columns": list(columns),
+                                     "data": _data_digest(columns), "added": _next_added(manifest)}
+
+
+def _next_added(manifest):
+    # insertion counter ordering snapshots of the same date
+    return 1 + max((s.get("added", 0) for s in manifest["snapshots"].values()), default=0)
+
+
+def _remove_snapshot(store_dir, manifest, digest):
+    # the column files may be shared with snapshots of identical data
+    location = manifest["snapshots"].pop(digest).get("path", digest)
+    if not any(s.get("path", d) == location for d, s in manifest["snapshots"].items()):
+        for name in os.listdir(os.path.join(store_dir, location)):
+            os.remove(os.path.join(store_dir, location, name))
+        os.rmdir(os.path.join(store_dir, location))
+    for filename in [f for f, seen in manifest["files"].items() if seen["digest"] == digest]:
+        del manifest["files"][filename]
+
+
+def snapshots(store_dir):
+    """Digests of all the snapshots in a store.
+
+    Args:
+        store_dir:
+            directory of the store.
+
+    Returns:
+        List of snapshot digests, by date and then in the order they were
+        added.
+    """
+    manifest = read_manifest(store_dir)
+    return sorted(manifest["snapshots"],
+                  key=lambda d: (manifest["snapshots"][d]["date"], manifest["snapshots"][d].get("added", 0)))
+
+
+def with_collected(store_dir, digests):
+    """Ingested snapshots together with those added by snapshotCollector.
+
+    A snapshot added with add has no raw file. It is kept when no ingested
+    snapshot has its date, so a csv export of the same day wins. Snapshots of
+    raw files that were since deleted are left out.
+
+    Args:
+        store_dir:
+            directory of the store.
+        digests:
+            snapshot digests as returned by ingest.
+
+    Returns:
+        List of snapshot digests, by date and then in the order they were
+        added.
+    """
+    manifest = read_manifest(store_dir)
+    ingested = {seen["digest"] for seen in manifest["files"].values()}
+    dates = {manifest["snapshots"][digest]["date"] for digest in digests}
+    collected = [digest for digest, entry in manifest["snapshots"].items()
+                 if digest not in ingested and entry["date"] not in dates]
+    return sorted(digests + collected,
+                  key=lambda d: (manifest["snapshots"][d]["date"], manifest["snapshots"][d].get("added", 0)))
+
+
+def add(store_dir, filename, parse):
+    """Add a single raw export to the store, dropping duplicates.
+
+    A report identical byte for byte to a stored one is dropped. A report
+    whose rows are identical to the most recent snapshot is dropped when it
+    is from the same date, and otherwise kept as a snapshot sharing the
+    column files of the earlier one. The store keeps one snapshot per date,
+    so a changed report replaces an earlier one of the same date.
+
+    Args:
+        store_dir:
+            directory of the store, created when missing.
+        filename:
+            path of the raw export; the file is not recorded in the manifest.
+        parse:
+            function of a path returning the snapshot date (YYYYMMDD string)
+            and a DataFrame of the snapshot rows.
+
+    Returns:
+        The snapshot digest and whether the report was "new", "identical" to
+        a stored report or "unchanged" since the most recent snapshot.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = read_manifest(store_dir)
+
+    digest = _file_digest(filename)
+    if digest in manifest["snapshots"]:
+        return digest, "identical"
+
+    date, columns = _parse_columns(parse, filename)
+    stored = snapshots(store_dir)
+    latest = manifest["snapshots"][stored[-1]] if stored else None
+
+    if latest is not None and latest.get("data") == _data_digest(columns):
+        if latest["date"] == date:
+            return stored[-1], "unchanged"
+        manifest["snapshots"][digest] = dict(latest, date=date, path=latest.get("path", stored[-1]),
+                                             added=_next_added(manifest))
+        status = "unchanged"
+    else:
+        _save_snapshot(store_dir, manifest, digest, date, columns)
+        status = "new"
+
+    for other in [d for d, s in manifest["snapshots"].items() if s["date"] == date and d != digest]:
+        _remove_snapshot(store_dir, manifest, other)
+
+    write_manifest(store_dir, manifest)
+    return digest, status
+
+
+def load(store_dir, digests, columns, date_column="Date"):
+    """Concatenate stored snapshots, reading only the requested columns.
+
+    Args:
+        store_dir:
+            directory of the store.
+        digests:
+            snapshot digests as returned by ingest.
+        columns:
+            names of the columns to load.
+        date_column:
+            name of the column filled with each snapshot's date, or None.
+
+    Returns:
+        DataFrame of all snapshots with the given columns.
+    """
+    manifest = read_manifest(store_dir)
+    entries = [manifest["snapshots"][digest] for digest in digests]
+
+    # concatenate each column once over all snapshots; snapshots with the
+    # same data as an earlier one share its column files
+    data = {}
+    for column in columns:
+        if column == date_column:
+            parts = [np.full(entry["rows"], entry["date"]) for entry in entries]
+        else:
+            parts = [np.load(os.path.join(store_dir, entry.get("path", digest), column + ".npy"), mmap_mode="r")
+                     for digest, entry in zip(digests, entries)]
+        data[column] = np.concatenate(parts) if parts else []
+
+    return pd.DataFrame(data, columns=columns)
@@ -1,5 +0,0 @@
-# these are courses that fall under the same course
-stackedCourses = []
-
-# these are courses that are at the same dat, time, and location
-stackedCRNs = [[41227, 41233], [41232, 41235]]
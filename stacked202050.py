@@ -1,33 +0,0 @@
-stackedCourses = [ ["1080", "1081"], ["1110", "1101"], ["1112", "1115"], ["1310", "1311"]]
-
-stackedCRNs = [[50130, 55217],
-               [50131, 55218],
-               [50132, 55219],
-               [50134, 55220],
-               [50514, 55221],
-               [50847, 55222],
-               [51164, 55223],
-               [53606, 55224],
-               [50136, 54239, 54240],
-               [50137, 54241, 54243],
-               [50138, 54237, 54238],
-               [50139, 54244, 54245],
-               [50140, 54246, 54247],
-               [50141, 54248, 54249],
-               [50142, 54771, 55287],
-               [50143, 55288, 55289],
-               [50329, 55290, 55291],
-               [50878, 55260],
-               [51123, 55261],
-               [50156, 55268],
-               [50158, 55269],
-               [50159, 55272, 55273],
-               [50160, 55274, 55275],
-               [50161, 55276],
-               [50358, 55277, 55278],
-               [51166, 55279, 55280],
-               [51265, 55281, 55282],
-               [51720, 55283],
-               [50548, 51020],
-               [50532, 51339]
-              ]
@@ -0,0 +1,26 @@
+# Make the top-level scripts and the dashboard modules importable by the tests.
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'dashboard')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture
+def chrome(tmp_path):
+    """Headless Chrome downloading into tmp_path; skips without selenium or Chrome."""
+    webdriver = pytest.importorskip('selenium.webdriver')
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_experimental_option('prefs', {'download.default_directory': str(tmp_path)})
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception as e:
+        pytest.skip('Chrome is not available: {}'.format(e))
+    yield driver
+    driver.quit()
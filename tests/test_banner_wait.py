@@ -0,0 +1,68 @@
+import os
+import pathlib
+import threading
+import time
+
+import pytest
+
+from bannerWait import (WrongPageException, record_waits, wait_for_download, wait_for_element,
+                        wait_for_idle, wait_for_title, wait_until)
+
+FIXTURE = pathlib.Path(__file__).parent / 'fixtures' / 'banner_query.html'
+SUBMITTED = ('xpath', "//*[contains(text(), 'submitted')]")
+
+
+def test_wait_until_returns_the_value_and_records_the_wait():
+    calls = []
+    waits = []
+    record_waits(waits)
+    try:
+        assert wait_until(lambda: calls.append(1) or len(calls) >= 3 and 'done', 5, 0.01, 'three calls') == 'done'
+    finally:
+        record_waits(None)
+    assert len(calls) == 3
+    assert [message for message, _ in waits] == ['three calls']
+
+
+def test_wait_until_times_out():
+    with pytest.raises(WrongPageException, match='never'):
+        wait_until(lambda: False, 0.05, 0.01, 'never')
+
+
+def test_wait_for_idle_needs_something_to_wait_for():
+    with pytest.raises(ValueError):
+        wait_for_idle(None)
+
+
+def test_wait_for_download_waits_for_the_partial_file(tmp_path):
+    filename = str(tmp_path / 'GJIREVO.csv')
+
+    def download():
+        with open(filename + '.crdownload', 'w') as fp:
+            fp.write('partial')
+        time.sleep(0.3)
+        os.replace(filename + '.crdownload', filename)
+
+    thread = threading.Thread(target=download)
+    thread.start()
+    try:
+        assert wait_for_download(filename, 5, 0.05) == filename
+        assert not os.path.exists(filename + '.crdownload')
+    finally:
+        thread.join()
+
+
+def test_wait_for_idle_waits_for_the_query_result(chrome):
+    chrome.get(FIXTURE.as_uri())
+    assert 'SWRCGSR' in wait_for_title(chrome, 'SWRCGSR', 5, 0.05)
+
+    # the document is complete right away, the result only after a second
+    wait_for_idle(chrome, '.loading', 5, 0.05, ready=SUBMITTED)
+    assert wait_for_element(chrome, 'id', 'message', 1, 0.05).text == 'Job 1 submitted'
+    assert not chrome.find_element('css selector', '.loading').is_displayed()
+
+
+def test_wait_for_idle_fails_without_the_result(chrome):
+    chrome.get(FIXTURE.as_uri())
+    with pytest.raises(WrongPageException):
+        wait_for_idle(chrome, '.loading', 0.5, 0.05, ready=('id', 'no-such-result'))
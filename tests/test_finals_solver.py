@@ -0,0 +1,59 @@
+# Finals week dates and the sections the finals solver cannot place.
+
+from datetime import datetime
+
+import pandas as pd
+
+from finals_solver import finals_week, propose_finals
+
+GRID = pd.DataFrame({'Credit': ['3'], 'Class_Start': ['09:30'], 'Meetings': ['2'], 'Class_Days': ['M W'],
+                     'Final_Day': ['M'], 'Final_Time': ['09:30-11:30']})
+
+
+def enrollment(*days, number='2410'):
+    return pd.DataFrame({
+        'CRN': [str(40001 + i) for i in range(len(days))], 'Subject': 'MTH', 'Number': number,
+        'S': 'A', 'Campus': 'M', 'Credit': 3, 'Enrolled': 20, 'Days': list(days),
+        'Time': ['09:30-10:45'] * len(days), 'Loc': ['AES {:d}'.format(200 + i) for i in range(len(days))],
+        'Instructor': ['Inst{:d}'.format(i) for i in range(len(days))], 'Begin/End': '08/19-12/14'})
+
+
+def test_finals_week_is_the_next_end_of_term_after_the_report():
+    df = enrollment('M W')
+    assert finals_week(df, datetime(2024, 10, 15))['M'] == '12/09/2024'
+    assert finals_week(df, datetime(2024, 12, 14))['S'] == '12/14/2024'
+    assert finals_week(df, datetime(2024, 12, 20))['M'] == '12/08/2025'
+
+
+def test_sunday_sections_are_reported_not_placed():
+    df = enrollment('M W', 'U')
+    rooms = pd.DataFrame({'Room': ['AES 200', 'AES 201'], 'Cap': [30, 30]})
+    finals, unresolved = propose_finals(df, rooms, GRID, finals_week(df, datetime(2024, 10, 15)), seconds=0.1)
+    assert finals['CRN'].tolist() == ['40001']
+    assert finals['Date'].tolist() == ['12/09/2024']
+    assert unresolved == ['40002']
+
+
+def test_without_rooms_finals_stay_in_their_own_room():
+    df = enrollment('M W')
+    dates = finals_week(df, datetime(2024, 10, 15))
+    for rooms in (pd.DataFrame([]), pd.DataFrame({'Room': [''], 'Cap': ['']})):
+        finals, unresolved = propose_finals(df, rooms, GRID, dates, seconds=0.1)
+        assert finals['Loc'].tolist() == ['AES 200']
+        assert unresolved == ['40001']
+
+
+def test_saturday_only_when_every_stacked_class_is_algebra():
+    df = pd.concat([enrollment('M W', number='1109'), enrollment('M W', number='1310')], ignore_index=True)
+    df['CRN'] = ['40001', '40002']
+    df['Loc'] = 'AES 200'
+    rooms = pd.DataFrame({'Room': ['AES 200'], 'Cap': [60]})
+    saturday = {'S': '12/14/2024'}
+
+    finals, unresolved = propose_finals(df.iloc[:1], rooms, GRID, saturday, seconds=0.1)
+    assert finals['Days'].tolist() == ['S']
+    assert unresolved == []
+
+    finals, unresolved = propose_finals(df, rooms, GRID, saturday, seconds=0.1)
+    assert finals.empty
+    assert sorted(unresolved) == ['40001', '40002']
@@ -0,0 +1,28 @@
+# Every dashboard app finds the entries the others cached for the same parser.
+
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+APP = '''
+import {imports}
+from parse_cache import cache_key
+from utilities import tidy_txt
+print(cache_key(b'SWRCGSR report', tidy_txt))
+'''
+
+
+def app_key(tmp_path, name, imports):
+    script = tmp_path / (name + '.py')
+    script.write_text(APP.format(imports=imports))
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, 'dashboard'))
+    return subprocess.run([sys.executable, str(script)], env=env, check=True,
+                          capture_output=True, text=True).stdout.strip()
+
+
+def test_two_apps_share_the_key_of_a_parser(tmp_path):
+    first = app_key(tmp_path, 'first_app', 'utilities')
+    second = app_key(tmp_path, 'second_app', 'utils, snapshot_delta, room_capacity')
+    assert first and first == second
@@ -0,0 +1,73 @@
+# Smoke tests of the Banner stand-in and of retrieveEnrollments run against it,
+# and of the names retrieved reports get.
+
+import http.cookiejar
+import importlib
+import json
+import pathlib
+import sys
+import time
+import types
+import urllib.request
+
+import pytest
+
+from bannerStandIn import NAVIGATOR_PATH, Latency, serve
+from enrollmentUtils import info_jobs
+
+REPORTS = pathlib.Path(__file__).parent / 'fixtures' / 'reports'
+FAST = Latency(page=0, login=0, query=0.1, job=0.5, download=0.1)
+
+
+@pytest.fixture
+def retrieveEnrollments(monkeypatch):
+    pytest.importorskip('selenium')
+    monkeypatch.setitem(sys.modules, 'private',
+                        types.SimpleNamespace(USER='user', PASSWORD='password', CHROMEPATH='', DEPTCODE='M&CS'))
+    monkeypatch.delitem(sys.modules, 'retrieveEnrollments', raising=False)
+    return importlib.import_module('retrieveEnrollments')
+
+
+@pytest.fixture
+def standin():
+    server = serve(str(REPORTS), FAST)
+    yield server
+    server.shutdown()
+
+
+def test_standin_serves_the_export_of_a_submitted_query(standin):
+    root = standin.navigator[:-len(NAVIGATOR_PATH)]
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    assert b'Application Navigator' in opener.open(root + '/login', data=b'username=u&password=p').read()
+
+    submitted = opener.open(urllib.request.Request(root + '/SWRCGSR/submit', data=json.dumps({'term': '202420'}).encode()))
+    job = json.load(submitted)['job']
+    deadline = time.monotonic() + 5
+    while json.load(opener.open(root + '/GJIREVO/status?job={:d}'.format(job)))['file'] is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert opener.open(root + '/GJIREVO/download?job={:d}'.format(job)).read() == (REPORTS / '202420.csv').read_bytes()
+
+
+def test_later_pulls_of_a_day_keep_their_own_report(retrieveEnrollments, tmp_path):
+    names = []
+    for _ in range(3):
+        download = tmp_path / 'GJIREVO.csv'
+        download.write_bytes((REPORTS / '202420.csv').read_bytes())
+        names.append(retrieveEnrollments.rename_report(str(download), str(tmp_path) + '/', 'M&CS'))
+    assert [pathlib.Path(name).name for name in names] == [
+        'SWRCGSR_202420_M-CS_20240102.csv', 'SWRCGSR_202420_M-CS_20240102_2.csv',
+        'SWRCGSR_202420_M-CS_20240102_3.csv']
+    assert not (tmp_path / 'GJIREVO.csv').exists()
+
+
+def test_retrieve_one_job_from_the_standin(chrome, retrieveEnrollments, standin, tmp_path, monkeypatch):
+    # the chrome fixture only skips without Chrome; retrieve opens its own sessions
+    monkeypatch.setattr(retrieveEnrollments, 'NAVIGATOR', standin.navigator)
+    monkeypatch.setattr(retrieveEnrollments, 'HEADLESS', True)
+
+    jobs = info_jobs({'term': ['202420'], 'department': 'M&CS'}, 'A')
+    result, = retrieveEnrollments.retrieve(jobs, str(tmp_path) + '/', retries=0, timeout=20)
+    assert not isinstance(result, Exception), result
+    assert '_M-CS' in result
+    assert pathlib.Path(result).read_bytes() == (REPORTS / '202420.csv').read_bytes()
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from snapshot_delta import apply_delta, diff_snapshots, section_table
+
+
+def snapshot(rows):
+    return pd.DataFrame(rows, columns=['CRN', 'S', 'Days', 'Time', 'Loc', 'Instructor',
+                                       'Enrl', 'WLst', 'Max Enrl'])
+
+
+OLD = snapshot([
+    ['10001', 'A', 'MW', '09:00-09:50', 'AD 100', 'Smith', 20, 0, 30],
+    ['10002', 'C', 'TR', '10:00-11:15', 'AD 200', 'Jones', 0, 0, 30],
+    ['10003', 'A', 'MWF', '12:00-12:50', 'AD 300', 'Brown', 25, 2, 25],
+])
+
+NEW = snapshot([
+    ['10001', 'C', 'MW', '09:00-09:50', 'AD 100', 'Smith', 20, 0, 30],
+    ['10002', 'A', 'TR', '10:00-11:15', 'AD 200', 'Jones', 5, 0, 30],
+    ['10003', 'A', 'MWF', '12:00-12:50', 'AD 300', 'Brown', 25, 3, 25],
+    ['10004', 'A', 'TR', '13:00-14:15', 'AD 400', 'Green', 10, 0, 30],
+])
+
+
+def test_reinstated_section_is_a_status_change():
+    delta = diff_snapshots(OLD, NEW)
+
+    assert list(delta.cancelled) == ['10001']
+    assert list(delta.added.index) == ['10004']
+    status = delta.changed[delta.changed['Field'] == 'S']
+    assert status[['CRN', 'Old', 'New']].values.tolist() == [['10002', 'C', 'A']]
+
+
+def test_apply_delta_round_trip():
+    delta = diff_snapshots(OLD, NEW)
+    rebuilt = apply_delta(section_table(OLD), delta)
+
+    expected = section_table(NEW)
+    expected = expected[expected['S'] != 'C']
+    pd.testing.assert_frame_equal(rebuilt.loc[expected.index], expected, check_dtype=False)
+    assert sorted(rebuilt.index) == sorted(expected.index)
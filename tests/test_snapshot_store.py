@@ -0,0 +1,48 @@
+# Which snapshots enrollmentTimeSeries graphs, and reports snapshotCollector keeps.
+
+import pandas as pd
+
+from snapshotCollector import collect
+from snapshotStore import add, ingest, load, with_collected
+
+
+def parse(filename):
+    # date on the first line, then one CRN per line
+    with open(filename) as fp:
+        date, *crns = fp.read().split()
+    return date, pd.DataFrame({'CRN': crns})
+
+
+def export(path, date, *crns):
+    path.write_text('\n'.join((date,) + crns))
+    return str(path)
+
+
+def test_deleted_duplicate_date_is_not_graphed(tmp_path):
+    store = str(tmp_path / 'snapshots')
+    first = export(tmp_path / 'a.csv', '20240102', '101')
+    duplicate = export(tmp_path / 'b.csv', '20240102', '102')
+    assert len(with_collected(store, ingest(store, [first, duplicate], parse))) == 2
+
+    (tmp_path / 'b.csv').unlink()
+    digests = with_collected(store, ingest(store, [first], parse))
+    assert list(load(store, digests, ['CRN', 'Date']).itertuples(index=False)) == [('101', '20240102')]
+
+
+def test_collected_snapshots_fill_other_dates(tmp_path):
+    store = str(tmp_path / 'snapshots')
+    daily = export(tmp_path / 'a.csv', '20240102', '101')
+    add(store, export(tmp_path / 'pull1', '20240101', '100'), parse)
+    add(store, export(tmp_path / 'pull2', '20240102', '999'), parse)
+    add(store, export(tmp_path / 'pull3', '20240103', '103'), parse)
+
+    digests = with_collected(store, ingest(store, [daily], parse))
+    assert list(load(store, digests, ['CRN', 'Date']).itertuples(index=False)) == [
+        ('100', '20240101'), ('101', '20240102'), ('103', '20240103')]
+
+
+def test_collect_keeps_unreadable_report(tmp_path, capsys):
+    report = export(tmp_path / 'report.csv', 'not a report')
+    assert collect([report], str(tmp_path)) == []
+    assert (tmp_path / 'report.csv').exists()
+    assert 'Kept' in capsys.readouterr().out